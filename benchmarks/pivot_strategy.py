@@ -0,0 +1,49 @@
+"""
+Report entry growth and timing of pivot strategies.
+
+    python benchmarks/pivot_strategy.py
+"""
+
+from time import perf_counter
+
+import numpy as np
+
+from hsnf import row_style_hermite_normal_form, smith_normal_form
+from hsnf.utils import PIVOT_STRATEGIES
+
+
+def max_abs_entry(*matrices) -> int:
+    return max(int(np.max(np.abs(mat))) for mat in matrices)
+
+
+def benchmark(name, func, matrices):
+    print(f"# {name}")
+    print(f"{'workload':>24} {'strategy':>10} {'median':>14} {'max':>22} {'time [ms]':>10}")
+    for workload, X in matrices.items():
+        for strategy in PIVOT_STRATEGIES:
+            growths = []
+            start = perf_counter()
+            for M in X:
+                growths.append(max_abs_entry(*func(M, pivot_strategy=strategy)))
+            elapsed = (perf_counter() - start) / len(X) * 1e3
+            print(
+                f"{workload:>24} {strategy:>10} {int(np.median(growths)):>14} {max(growths):>22} {elapsed:>10.2f}"
+            )
+    print()
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    matrices = {
+        "dense 5x5 [-5, 5]": rng.integers(-5, 6, size=(50, 5, 5)),
+        "dense 6x4 [-5, 5]": rng.integers(-5, 6, size=(50, 6, 4)),
+        "dense 8x8 [-1, 1]": rng.integers(-1, 2, size=(50, 8, 8)),
+        "sparse 10x10 [-3, 3]": rng.integers(-3, 4, size=(50, 10, 10))
+        * (rng.random(size=(50, 10, 10)) < 0.2),
+    }
+    benchmark("Smith normal form: max |entry| of (D, L, R)", smith_normal_form, matrices)
+    benchmark(
+        "Row-style Hermite normal form: max |entry| of (H, L)",
+        row_style_hermite_normal_form,
+        matrices,
+    )
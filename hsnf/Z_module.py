@@ -3,10 +3,26 @@
 from __future__ import annotations
 
 import warnings
+from functools import partial
 
 import numpy as np
-
-from hsnf.utils import NDArrayInt, get_nonzero_min_abs_full, get_nonzero_min_abs_row
+import scipy.sparse
+
+from hsnf.block import block_row_style_hermite_normal_form, block_smith_normal_form
+from hsnf.cache import cached_decomposition
+from hsnf.lll import lll_reduction, size_reduction
+from hsnf.multimodular import multimodular_invariant_factors
+from hsnf.sparse import SparseZmoduleHomomorphism, sparse_smith_normal_form
+from hsnf.structure import hermite_normal_form_fast_path, smith_normal_form_fast_path
+from hsnf.transform import UnimodularTransform
+from hsnf.utils import (
+    PIVOT_STRATEGIES,
+    NDArrayInt,
+    get_nonzero_min_abs_cross,
+    get_nonzero_min_abs_row,
+    get_pivot_full,
+    get_pivot_row,
+)
 
 
 class ZmoduleHomomorphism:
@@ -17,10 +33,10 @@ class ZmoduleHomomorphism:
     ----------
     A: array, (m, n)
         matrix representation of homomorhism: Z^m -> Z^n
-    basis_from: array, (m, )
+    basis_from: array, (m, m) or UnimodularTransform
         basis of Z^m
-    basis_to: array, (n, )
-        basis of Z^n
+    basis_to: array, (n, n) or UnimodularTransform
+        basis of Z^n. If UnimodularTransform, it records transpose of basis_to.
     """
 
     def __init__(self, A, basis_from, basis_to):
@@ -30,6 +46,9 @@ class ZmoduleHomomorphism:
         self._A = A
         self._basis_from = basis_from
         self._basis_to = basis_to
+        self._pivot_strategy = "min_abs"
+        # record elementary operations instead of updating dense bases
+        self._lazy = isinstance(basis_from, UnimodularTransform)
 
     @property
     def num_row(self):
@@ -40,33 +59,51 @@ class ZmoduleHomomorphism:
         return self._A.shape[1]
 
     def _swap_from(self, axis1, axis2):
-        self._basis_from[[axis1, axis2]] = self._basis_from[[axis2, axis1]]
+        if self._lazy:
+            self._basis_from.swap(axis1, axis2)
+        else:
+            self._basis_from[[axis1, axis2]] = self._basis_from[[axis2, axis1]]
         self._A[[axis1, axis2]] = self._A[[axis2, axis1]]
 
     def _swap_to(self, axis1, axis2):
-        self._basis_to[:, [axis1, axis2]] = self._basis_to[:, [axis2, axis1]]
+        if self._lazy:
+            self._basis_to.swap(axis1, axis2)
+        else:
+            self._basis_to[:, [axis1, axis2]] = self._basis_to[:, [axis2, axis1]]
         self._A[:, [axis1, axis2]] = self._A[:, [axis2, axis1]]
 
     def _change_sign_from(self, axis):
-        self._basis_from[axis] *= -1
+        if self._lazy:
+            self._basis_from.negate(axis)
+        else:
+            self._basis_from[axis] *= -1
         self._A[axis, :] *= -1
 
     def _change_sign_to(self, axis):
-        self._basis_to[:, axis] *= -1
+        if self._lazy:
+            self._basis_to.negate(axis)
+        else:
+            self._basis_to[:, axis] *= -1
         self._A[:, axis] *= -1
 
     def _add_from(self, axis1, axis2, k):
         """
         add k times axis2 to axis1
         """
-        self._basis_from[axis1] += self._basis_from[axis2] * k
+        if self._lazy:
+            self._basis_from.add(axis1, axis2, int(k))
+        else:
+            self._basis_from[axis1] += self._basis_from[axis2] * k
         self._A[axis1, :] += self._A[axis2, :] * k
 
     def _add_to(self, axis1, axis2, k):
         """
         add k times axis2 to axis1
         """
-        self._basis_to[:, axis1] += self._basis_to[:, axis2] * k
+        if self._lazy:
+            self._basis_to.add(axis1, axis2, int(k))
+        else:
+            self._basis_to[:, axis1] += self._basis_to[:, axis2] * k
         self._A[:, axis1] += self._A[:, axis2] * k
 
     def _is_lone(self, s):
@@ -90,7 +127,11 @@ class ZmoduleHomomorphism:
                     return i, j
         return None
 
-    def _snf(self, s):
+    def _set_pivot_strategy(self, pivot_strategy: str):
+        _check_pivot_strategy(pivot_strategy)
+        self._pivot_strategy = pivot_strategy
+
+    def _snf(self, s, repivot=False):
         """
         determine SNF up to the s-th row and column elements
         """
@@ -98,7 +139,11 @@ class ZmoduleHomomorphism:
             return self._A, self._basis_from, self._basis_to
 
         # choose a pivot
-        row, col = get_nonzero_min_abs_full(self._A, s)
+        if repivot and self._pivot_strategy != "min_abs":
+            # remainders left in the s-th row and column are smaller than the previous pivot
+            row, col = get_nonzero_min_abs_cross(self._A, s)
+        else:
+            row, col = get_pivot_full(self._A, s, self._pivot_strategy)
         if col is None:
             # if there does not remain non-zero elements, this procesure ends.
             return self._A, self._basis_from, self._basis_to
@@ -123,42 +168,70 @@ class ZmoduleHomomorphism:
             if res:
                 i, j = res
                 self._add_from(s, i, 1)
-                return self._snf(s)
+                return self._snf(s, repivot=True)
             elif self._A[s, s] < 0:
                 self._change_sign_from(s)
             return self._snf(s + 1)
         else:
-            return self._snf(s)
-
-    def smith_normal_form(self):
+            return self._snf(s, repivot=True)
+
+    def smith_normal_form(
+        self,
+        pivot_strategy: str = "min_abs",
+        reduce_transforms: bool = False,
+        overwrite: bool = False,
+    ):
         """
         calculate Smith normal form
 
         see the following awesome post for a description of this algorithm:
             http://www.dlfer.xyz/post/2016-10-27-smith-normal-form/
 
+        Parameters
+        ----------
+        pivot_strategy: str
+            strategy to choose a pivot, see :func:`hsnf.utils.get_pivot_full`
+        reduce_transforms: bool
+            if true, reduce L and R by LLL, see :func:`reduce_kernel_rows`
+        overwrite: bool
+            if true, decompose A, basis_from, and basis_to in place without copying them.
+            D, L, and R share memory with them and this homomorphism should not be reused.
+
         Returns
         -------
         D: array, (m, n)
-        L: array, (m, m)
-        R: array, (n, n)
+        L: array or UnimodularTransform, (m, m)
+        R: array or UnimodularTransform, (n, n)
             D = np.dot(L, np.dot(M, R))
             L, R are unimodular.
         """
-        A = self._A.copy()
-        basis_from = self._basis_from.copy()
-        basis_to = self._basis_to.copy()
+        self._set_pivot_strategy(pivot_strategy)
+        if reduce_transforms and self._lazy:
+            raise ValueError("reduce_transforms is not supported with lazy transforms.")
+        if overwrite:
+            D, L, R = self._snf(s=0)
+        else:
+            A = self._A.copy()
+            basis_from = self._basis_from.copy()
+            basis_to = self._basis_to.copy()
 
-        D, L, R = self._snf(s=0)
+            D, L, R = self._snf(s=0)
 
-        # revert A, basis_from, and basis_to
-        self._A = A
-        self._basis_from = basis_from
-        self._basis_to = basis_to
+            # revert A, basis_from, and basis_to
+            self._A = A
+            self._basis_from = basis_from
+            self._basis_to = basis_to
+
+        if reduce_transforms:
+            rank = int(np.count_nonzero(np.diagonal(D)))
+            L[...] = reduce_kernel_rows(L, rank)
+            R[...] = reduce_kernel_rows(R.T, rank).T
 
+        if self._lazy:
+            R = R.T
         return D, L, R
 
-    def _hnf_row(self, si, sj):
+    def _hnf_row(self, si, sj, repivot=False):
         """
         determine row-style HNF up to the si-th row and the sj-th column elements
         """
@@ -166,7 +239,11 @@ class ZmoduleHomomorphism:
             return self._A, self._basis_from
 
         # choose a pivot
-        row, _ = get_nonzero_min_abs_row(self._A, si, sj)
+        if repivot:
+            # remainders left in the sj-th column are smaller than the previous pivot
+            row, _ = get_nonzero_min_abs_row(self._A, si, sj)
+        else:
+            row, _ = get_pivot_row(self._A, si, sj, self._pivot_strategy)
 
         if row is None:
             # if there does not remain non-zero elements, go to a next column
@@ -192,38 +269,69 @@ class ZmoduleHomomorphism:
 
             return self._hnf_row(si + 1, sj + 1)
         else:
-            return self._hnf_row(si, sj)
-
-    def hermite_normal_form(self):
+            return self._hnf_row(si, sj, repivot=True)
+
+    def hermite_normal_form(
+        self,
+        pivot_strategy: str = "min_abs",
+        reduce_transforms: bool = False,
+        overwrite: bool = False,
+    ):
         """
         calculate row-style Hermite normal form
 
+        Parameters
+        ----------
+        pivot_strategy: str
+            strategy to choose a pivot, see :func:`hsnf.utils.get_pivot_row`
+        reduce_transforms: bool
+            if true, reduce L by LLL, see :func:`reduce_kernel_rows`
+        overwrite: bool
+            if true, decompose A and basis_from in place without copying them.
+            H and L share memory with them and this homomorphism should not be reused.
+
         Returns
         -------
         H: array, (m, n)
             Hermite normal form of M, upper-triangular integer matrix
-        L: array, (m, m)
+        L: array or UnimodularTransform, (m, m)
             unimodular matrix s.t. H = np.dot(L, M)
         """
-        A = self._A.copy()
-        basis_from = self._basis_from.copy()
-        basis_to = self._basis_to.copy()
+        self._set_pivot_strategy(pivot_strategy)
+        if reduce_transforms and self._lazy:
+            raise ValueError("reduce_transforms is not supported with lazy transforms.")
+        if overwrite:
+            H, L = self._hnf_row(si=0, sj=0)
+        else:
+            # basis_to is not changed in row-style HNF
+            A = self._A.copy()
+            basis_from = self._basis_from.copy()
 
-        H, L = self._hnf_row(si=0, sj=0)
+            H, L = self._hnf_row(si=0, sj=0)
 
-        # revert A, basis_from, and basis_to
-        self._A = A
-        self._basis_from = basis_from
-        self._basis_to = basis_to
+            # revert A and basis_from
+            self._A = A
+            self._basis_from = basis_from
+
+        if reduce_transforms:
+            rank = int(np.count_nonzero(np.any(H != 0, axis=1)))
+            L[...] = reduce_kernel_rows(L, rank)
 
         return H, L
 
     @classmethod
-    def _standard_basis(cls, n):
-        return np.eye(n, dtype=int)
+    def _standard_basis(cls, n, out=None):
+        if out is None:
+            return np.eye(n, dtype=int)
+        _check_buffer(out, (n, n))
+        out[...] = 0
+        np.fill_diagonal(out, 1)
+        return out
 
     @classmethod
-    def with_standard_basis(cls, A):
+    def with_standard_basis(
+        cls, A, overwrite_a: bool = False, out=None, lazy_transforms: bool = False
+    ):
         """
         create homomorhism with regard A as a matrix representation with standard basis
 
@@ -231,27 +339,151 @@ class ZmoduleHomomorphism:
         ----------
         A: array, (m, n)
             matrix representation of homomorhism: Z^m -> Z^n
+        overwrite_a: bool
+            if true and A is a writable integer array, A itself is used as a working array without copy
+        out: tuple of (array or None), optional
+            buffers for A, basis_from, and basis_to with shapes (m, n), (m, m), and (n, n).
+            A is copied into the first buffer.
+        lazy_transforms: bool
+            if true, bases are recorded as UnimodularTransform and buffers for them should be None
         """
-        A = np.array(A, dtype=int)
+        if scipy.sparse.issparse(A):
+            A = A.toarray()
+        A_out, basis_from_out, basis_to_out = (None, None, None) if out is None else out
+
+        if A_out is not None:
+            _check_buffer(A_out, np.shape(A))
+            A_out[...] = A
+            A = A_out
+        elif not (
+            overwrite_a and isinstance(A, np.ndarray) and A.dtype == np.int_ and A.flags.writeable
+        ):
+            A = np.array(A, dtype=int)
         if A.ndim != 2:
             raise ValueError("matrix representation must be 2d")
 
         m, n = A.shape
-        basis_from = cls._standard_basis(m)
-        basis_to = cls._standard_basis(n)
+        if lazy_transforms:
+            if basis_from_out is not None or basis_to_out is not None:
+                raise ValueError(
+                    "Output buffers of transformations are not used with lazy transforms."
+                )
+            return cls(A, UnimodularTransform(m), UnimodularTransform(n))
+        basis_from = cls._standard_basis(m, basis_from_out)
+        basis_to = cls._standard_basis(n, basis_to_out)
 
         return cls(A, basis_from, basis_to)
 
 
-def smith_normal_form(M: NDArrayInt) -> tuple[NDArrayInt, NDArrayInt, NDArrayInt]:
+def _check_pivot_strategy(pivot_strategy: str):
+    if pivot_strategy not in PIVOT_STRATEGIES:
+        raise ValueError(f"Unknown pivot strategy: {pivot_strategy}")
+
+
+def _check_buffer(out, shape):
+    if not isinstance(out, np.ndarray) or out.dtype != np.int_:
+        raise ValueError("Output buffer should be an integer array with default dtype.")
+    if out.shape != tuple(shape):
+        raise ValueError(f"Output buffer should have shape {tuple(shape)}, but got {out.shape}.")
+
+
+def _check_lazy_transforms(lazy_transforms: bool, block_decomposition: bool):
+    if lazy_transforms and block_decomposition:
+        raise ValueError("block_decomposition is not supported with lazy transforms.")
+
+
+def _store(results: tuple, out: tuple | None) -> tuple:
+    """
+    Copy results into caller-supplied buffers if given
+    """
+    if out is None:
+        return results
+    stored = []
+    for res, buf in zip(results, out):
+        if buf is None or res is buf:
+            stored.append(res)
+        else:
+            _check_buffer(buf, res.shape)
+            buf[...] = res
+            stored.append(buf)
+    return tuple(stored)
+
+
+def reduce_kernel_rows(T: NDArrayInt, rank: int) -> NDArrayInt:
+    """
+    Shorten rows of unimodular transformation `T` without changing ``T @ M``,
+    where ``T[rank:] @ M = 0``.
+
+    The kernel rows ``T[rank:]`` are LLL-reduced and the other rows are size-reduced against them.
+
+    Parameters
+    ----------
+    T: array, (m, m)
+        Unimodular matrix
+    rank: int
+        Number of leading rows of ``T`` which are not in the kernel
+
+    Returns
+    -------
+    T_reduced: array, (m, m)
+        Unimodular matrix
+    """
+    if rank == T.shape[0]:
+        return T
+    kernel, _ = lll_reduction(T[rank:])
+    image, _ = size_reduction(T[:rank], kernel)
+    return np.concatenate([image, kernel], axis=0)
+
+
+def smith_normal_form(
+    M: NDArrayInt,
+    pivot_strategy: str = "min_abs",
+    reduce_transforms: bool = False,
+    overwrite_a: bool = False,
+    out: tuple | None = None,
+    block_decomposition: bool = False,
+    max_workers: int = 1,
+    lazy_transforms: bool = False,
+) -> tuple[NDArrayInt, NDArrayInt, NDArrayInt]:
     """
     Calculate Smith normal form of integer matrix `M`.
     Returned matrices `(D, L, R)` satisfy ``D = np.dot(L, np.dot(M, R))``.
 
+    If `M` is a scipy sparse matrix, it is decomposed by :func:`hsnf.sparse.sparse_smith_normal_form`
+    and `(D, L, R)` are returned as sparse matrices.
+    Other options than the defaults are not supported for sparse `M` and raise ValueError.
+    Diagonal and monomial (e.g. signed permutation) matrices skip elimination, see :func:`hsnf.structure.detect_structure`.
+    If a persistent cache is enabled by :func:`hsnf.cache.enable_cache`, results are looked up there first.
+
     Parameters
     ----------
     M: array, (m, n)
         Integer matrix
+    pivot_strategy: str
+        Strategy to choose a pivot in elimination. Other strategies than the default may suppress growth of entries.
+
+        - ``"min_abs"``: entry with the minimum absolute value
+        - ``"min_count"``: entry in the row (or column) with the fewest nonzero entries
+        - ``"min_norm"``: entry with the minimum absolute value in rows (and columns) with the smallest norms, following Havas and Majewski
+    reduce_transforms: bool
+        If true, shorten `L` and `R` by LLL-reducing their rows and columns in the kernels of `M`.
+        ``D = L @ M @ R`` still holds.
+    overwrite_a: bool
+        If true, `M` is decomposed in place when it is a writable integer array with the default dtype,
+        and the returned `D` shares memory with `M` unless `M` is handled by a fast path, block decomposition, or cache.
+    out: tuple of (array or None), optional
+        Caller-supplied buffers for `(D, L, R)`. Buffers should have the default integer dtype.
+        Results are written into them and the buffers themselves are returned.
+    block_decomposition: bool
+        If true, split `M` into independent blocks by :func:`hsnf.block.connected_blocks`,
+        decompose each block, and merge their diagonals by gcd/lcm operations.
+        Effective for block-diagonal matrices up to permutations of rows and columns.
+    max_workers: int
+        Number of worker processes to decompose blocks with ``block_decomposition=True``
+    lazy_transforms: bool
+        If true, return `L` and `R` as :class:`hsnf.transform.UnimodularTransform`, logs of elementary operations
+        which are applied to vectors and inverted exactly without dense matrices.
+        Fast paths and the cache are skipped, and `reduce_transforms` and `block_decomposition` are not supported.
 
     Returns
     -------
@@ -262,19 +494,159 @@ def smith_normal_form(M: NDArrayInt) -> tuple[NDArrayInt, NDArrayInt, NDArrayInt
     R: array, (n, n)
         Unimodular matrix
     """
-    zmh = ZmoduleHomomorphism.with_standard_basis(M)
-    return zmh.smith_normal_form()
+    _check_pivot_strategy(pivot_strategy)
+    if scipy.sparse.issparse(M):
+        options = {
+            "pivot_strategy": pivot_strategy != "min_abs",
+            "reduce_transforms": reduce_transforms,
+            "overwrite_a": overwrite_a,
+            "out": out is not None,
+            "block_decomposition": block_decomposition,
+            "max_workers": max_workers != 1,
+            "lazy_transforms": lazy_transforms,
+        }
+        unsupported = [name for name, given in options.items() if given]
+        if unsupported:
+            raise ValueError(f"Unsupported options for sparse matrix: {', '.join(unsupported)}")
+        return sparse_smith_normal_form(M)
+    compute = partial(
+        _smith_normal_form,
+        M,
+        pivot_strategy,
+        reduce_transforms,
+        overwrite_a,
+        out,
+        block_decomposition,
+        max_workers,
+        lazy_transforms,
+    )
+    if lazy_transforms:
+        # Logs of operations are not cached
+        return compute()
+    results = cached_decomposition(
+        "smith_normal_form",
+        M,
+        compute,
+        pivot_strategy=pivot_strategy,
+        reduce_transforms=reduce_transforms,
+        block_decomposition=block_decomposition,
+    )
+    return _store(results, out)
+
+
+def _smith_normal_form(
+    M,
+    pivot_strategy,
+    reduce_transforms,
+    overwrite_a,
+    out,
+    block_decomposition,
+    max_workers,
+    lazy_transforms,
+):
+    _check_lazy_transforms(lazy_transforms, block_decomposition)
+    fast = None if lazy_transforms else smith_normal_form_fast_path(M)
+    if fast is None and block_decomposition:
+        decompose = partial(smith_normal_form, pivot_strategy=pivot_strategy)
+        fast = block_smith_normal_form(M, decompose, max_workers=max_workers)
+    if fast is not None:
+        D, L, R = fast
+        if reduce_transforms:
+            rank = int(np.count_nonzero(np.diagonal(D)))
+            L = reduce_kernel_rows(L, rank)
+            R = reduce_kernel_rows(R.T, rank).T
+        return D, L, R
+
+    zmh = ZmoduleHomomorphism.with_standard_basis(
+        M, overwrite_a=overwrite_a, out=out, lazy_transforms=lazy_transforms
+    )
+    return zmh.smith_normal_form(
+        pivot_strategy=pivot_strategy, reduce_transforms=reduce_transforms, overwrite=True
+    )
+
+
+def invariant_factors(
+    M: NDArrayInt, algorithm: str = "elimination", max_workers: int = 1
+) -> list[int]:
+    """
+    Calculate nonzero invariant factors of integer matrix `M`.
+    Dense transformation matrices are never formed.
 
+    Parameters
+    ----------
+    M: array or sparse matrix, (m, n)
+        Integer matrix
+    algorithm: str
+        - ``"elimination"``: diagonalize `M` by integer elimination. Sparse matrices are eliminated without transformations,
+          and dense matrices only record transformations as logs of elementary operations (``lazy_transforms=True``).
+        - ``"multimodular"``: eliminate `M` modulo word-size primes, reconstruct a determinant by Chinese remainder theorem,
+          and diagonalize `M` modulo the determinant, see :func:`hsnf.multimodular.multimodular_invariant_factors`.
+          Intermediate entries never grow beyond the determinant.
+    max_workers: int
+        Number of worker processes for ``algorithm="multimodular"``
 
-def row_style_hermite_normal_form(M: NDArrayInt) -> tuple[NDArrayInt, NDArrayInt]:
+    Returns
+    -------
+    diag: list of int
+        diag[i] divides diag[i + 1]
+    """
+    if algorithm == "multimodular":
+        if scipy.sparse.issparse(M):
+            M = scipy.sparse.csr_matrix(M).toarray()
+        return multimodular_invariant_factors(M, max_workers=max_workers)
+    elif algorithm != "elimination":
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    if scipy.sparse.issparse(M):
+        return SparseZmoduleHomomorphism(M, transforms=False).invariant_factors()
+    D, _, _ = smith_normal_form(M, lazy_transforms=True)
+    return [int(d) for d in np.diagonal(D) if d != 0]
+
+
+def row_style_hermite_normal_form(
+    M: NDArrayInt,
+    pivot_strategy: str = "min_abs",
+    reduce_transforms: bool = False,
+    overwrite_a: bool = False,
+    out: tuple | None = None,
+    block_decomposition: bool = False,
+    max_workers: int = 1,
+    lazy_transforms: bool = False,
+) -> tuple[NDArrayInt, NDArrayInt]:
     """
     Calculate row-style Hermite normal form of `M`.
     Returned matrices `(H, L)` satisfy ``H = np.dot(L, M)``.
+    Matrices already in Hermite normal form and upper triangular matrices skip elimination.
+    If a persistent cache is enabled by :func:`hsnf.cache.enable_cache`, results are looked up there first.
 
     Parameters
     ----------
     M: array, (m, n)
         Integer matrix
+    pivot_strategy: str
+        Strategy to choose a pivot in elimination. Other strategies than the default may suppress growth of entries.
+
+        - ``"min_abs"``: entry with the minimum absolute value
+        - ``"min_count"``: entry in the row (or column) with the fewest nonzero entries
+        - ``"min_norm"``: entry with the minimum absolute value in rows (and columns) with the smallest norms, following Havas and Majewski
+    reduce_transforms: bool
+        If true, shorten `L` by LLL-reducing its rows in the left kernel of `M`.
+        ``H = L @ M`` still holds.
+    overwrite_a: bool
+        If true, `M` is decomposed in place when it is a writable integer array with the default dtype,
+        and the returned `H` shares memory with `M` unless `M` is handled by a fast path, block decomposition, or cache.
+    out: tuple of (array or None), optional
+        Caller-supplied buffers for `(H, L)`. Buffers should have the default integer dtype.
+        Results are written into them and the buffers themselves are returned.
+    block_decomposition: bool
+        If true, split `M` into independent blocks by :func:`hsnf.block.connected_blocks`
+        and decompose each block. Hermite normal forms of blocks are merged by sorting their rows.
+    max_workers: int
+        Number of worker processes to decompose blocks with ``block_decomposition=True``
+    lazy_transforms: bool
+        If true, return `L` as :class:`hsnf.transform.UnimodularTransform`, a log of elementary operations
+        which is applied to vectors and inverted exactly without a dense matrix.
+        Fast paths and the cache are skipped, and `reduce_transforms` and `block_decomposition` are not supported.
 
     Returns
     -------
@@ -283,19 +655,106 @@ def row_style_hermite_normal_form(M: NDArrayInt) -> tuple[NDArrayInt, NDArrayInt
     L: array, (m, m)
         Unimodular matrix
     """
-    zmh = ZmoduleHomomorphism.with_standard_basis(M)
-    return zmh.hermite_normal_form()
-
+    _check_pivot_strategy(pivot_strategy)
+    compute = partial(
+        _row_style_hermite_normal_form,
+        M,
+        pivot_strategy,
+        reduce_transforms,
+        overwrite_a,
+        out,
+        block_decomposition,
+        max_workers,
+        lazy_transforms,
+    )
+    if lazy_transforms:
+        # Logs of operations are not cached
+        return compute()
+    results = cached_decomposition(
+        "row_style_hermite_normal_form",
+        M,
+        compute,
+        pivot_strategy=pivot_strategy,
+        reduce_transforms=reduce_transforms,
+        block_decomposition=block_decomposition,
+    )
+    return _store(results, out)
+
+
+def _row_style_hermite_normal_form(
+    M,
+    pivot_strategy,
+    reduce_transforms,
+    overwrite_a,
+    out,
+    block_decomposition,
+    max_workers,
+    lazy_transforms,
+):
+    _check_lazy_transforms(lazy_transforms, block_decomposition)
+    fast = None if lazy_transforms else hermite_normal_form_fast_path(M)
+    if fast is None and block_decomposition:
+        decompose = partial(row_style_hermite_normal_form, pivot_strategy=pivot_strategy)
+        fast = block_row_style_hermite_normal_form(M, decompose, max_workers=max_workers)
+    if fast is not None:
+        H, L = fast
+        if reduce_transforms:
+            L = reduce_kernel_rows(L, int(np.count_nonzero(np.any(H != 0, axis=1))))
+        return H, L
 
-def column_style_hermite_normal_form(M: NDArrayInt) -> tuple[NDArrayInt, NDArrayInt]:
+    H_out, L_out = (None, None) if out is None else out
+    zmh = ZmoduleHomomorphism.with_standard_basis(
+        M, overwrite_a=overwrite_a, out=(H_out, L_out, None), lazy_transforms=lazy_transforms
+    )
+    return zmh.hermite_normal_form(
+        pivot_strategy=pivot_strategy, reduce_transforms=reduce_transforms, overwrite=True
+    )
+
+
+def column_style_hermite_normal_form(
+    M: NDArrayInt,
+    pivot_strategy: str = "min_abs",
+    reduce_transforms: bool = False,
+    overwrite_a: bool = False,
+    out: tuple | None = None,
+    block_decomposition: bool = False,
+    max_workers: int = 1,
+    lazy_transforms: bool = False,
+) -> tuple[NDArrayInt, NDArrayInt]:
     """
     Calculate column-style Hermite normal form of `M`
     Returned matrices `(H, R)` satisfy ``H = np.dot(M, R)``
+    Matrices already in Hermite normal form and lower triangular matrices skip elimination.
+    If a persistent cache is enabled by :func:`hsnf.cache.enable_cache`, results are looked up there first.
 
     Parameters
     ----------
     M: array, (m, n)
         Integer matrix
+    pivot_strategy: str
+        Strategy to choose a pivot in elimination. Other strategies than the default may suppress growth of entries.
+
+        - ``"min_abs"``: entry with the minimum absolute value
+        - ``"min_count"``: entry in the row (or column) with the fewest nonzero entries
+        - ``"min_norm"``: entry with the minimum absolute value in rows (and columns) with the smallest norms, following Havas and Majewski
+    reduce_transforms: bool
+        If true, shorten `R` by LLL-reducing its columns in the kernel of `M`.
+        ``H = M @ R`` still holds.
+    overwrite_a: bool
+        If true, `M` is decomposed in place when it is a writable integer array with the default dtype,
+        and the returned `H` shares memory with `M` unless `M` is handled by a fast path, block decomposition, or cache.
+    out: tuple of (array or None), optional
+        Caller-supplied buffers for `(H, R)`. Buffers should have the default integer dtype.
+        Results are written into them and the buffers themselves are returned.
+    block_decomposition: bool
+        If true, split `M` into independent blocks by :func:`hsnf.block.connected_blocks`
+        and decompose each block. Hermite normal forms of blocks are merged by sorting their rows.
+    max_workers: int
+        Number of worker processes to decompose blocks with ``block_decomposition=True``
+    lazy_transforms: bool
+        If true, return `R` as :class:`hsnf.transform.UnimodularTransform`, a log of elementary operations
+        which is applied to vectors and inverted exactly without a dense matrix.
+        Fast paths and the cache are skipped, and `reduce_transforms` and `block_decomposition` are not supported.
 
     Returns
     -------
@@ -304,8 +763,70 @@ def column_style_hermite_normal_form(M: NDArrayInt) -> tuple[NDArrayInt, NDArray
     R: array, (n, n)
         Unimodular matrix
     """
-    zmh = ZmoduleHomomorphism.with_standard_basis(M.T)
-    H_T, R_T = zmh.hermite_normal_form()
+    _check_pivot_strategy(pivot_strategy)
+    compute = partial(
+        _column_style_hermite_normal_form,
+        M,
+        pivot_strategy,
+        reduce_transforms,
+        overwrite_a,
+        out,
+        block_decomposition,
+        max_workers,
+        lazy_transforms,
+    )
+    if lazy_transforms:
+        # Logs of operations are not cached
+        return compute()
+    results = cached_decomposition(
+        "column_style_hermite_normal_form",
+        M,
+        compute,
+        pivot_strategy=pivot_strategy,
+        reduce_transforms=reduce_transforms,
+        block_decomposition=block_decomposition,
+    )
+    return _store(results, out)
+
+
+def _column_style_hermite_normal_form(
+    M,
+    pivot_strategy,
+    reduce_transforms,
+    overwrite_a,
+    out,
+    block_decomposition,
+    max_workers,
+    lazy_transforms,
+):
+    _check_lazy_transforms(lazy_transforms, block_decomposition)
+    fast = None if lazy_transforms else hermite_normal_form_fast_path(np.transpose(M))
+    if fast is None and block_decomposition:
+        decompose = partial(row_style_hermite_normal_form, pivot_strategy=pivot_strategy)
+        fast = block_row_style_hermite_normal_form(
+            np.transpose(M), decompose, max_workers=max_workers
+        )
+    if fast is not None:
+        H_T, R_T = fast
+        if reduce_transforms:
+            R_T = reduce_kernel_rows(R_T, int(np.count_nonzero(np.any(H_T != 0, axis=1))))
+        return H_T.T, R_T.T
+
+    # Work on transposed views so that M and buffers are overwritten in place
+    H_out, R_out = (None, None) if out is None else out
+    zmh = ZmoduleHomomorphism.with_standard_basis(
+        np.transpose(M),
+        overwrite_a=overwrite_a,
+        out=(
+            None if H_out is None else H_out.T,
+            None if R_out is None else R_out.T,
+            None,
+        ),
+        lazy_transforms=lazy_transforms,
+    )
+    H_T, R_T = zmh.hermite_normal_form(
+        pivot_strategy=pivot_strategy, reduce_transforms=reduce_transforms, overwrite=True
+    )
     H = H_T.T
     R = R_T.T
     return H, R
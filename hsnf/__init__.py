@@ -2,6 +2,7 @@ from importlib.metadata import PackageNotFoundError, version
 
 from hsnf.Z_module import (  # noqa: F401
     column_style_hermite_normal_form,
+    invariant_factors,
     row_style_hermite_normal_form,
     smith_normal_form,
 )
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import numpy as np
+
+from hsnf.utils import NDArrayInt
+
+
+def _as_batch(X) -> NDArrayInt:
+    X = np.array(X, dtype=int)
+    if X.ndim != 3:
+        raise ValueError("batch of matrices must be 3d")
+    return X
+
+
+def _batch_eye(num_batch: int, n: int) -> NDArrayInt:
+    return np.repeat(np.eye(n, dtype=int)[None, :, :], num_batch, axis=0)
+
+
+def _swap_rows(A, index, axis1, axis2):
+    tmp = A[index, axis1].copy()
+    A[index, axis1] = A[index, axis2]
+    A[index, axis2] = tmp
+
+
+def _swap_columns(A, index, axis1, axis2):
+    tmp = A[index, :, axis1].copy()
+    A[index, :, axis1] = A[index, :, axis2]
+    A[index, :, axis2] = tmp
+
+
+def _first_argmin(key, mask):
+    """
+    return the first index of minimum key along the last axis within mask, and whether mask has any True
+    """
+    found = np.any(mask, axis=-1)
+    key = np.where(mask, key, np.iinfo(key.dtype).max)
+    return np.argmin(key, axis=-1), found
+
+
+# Signed integer dtypes from the smallest
+_INTEGER_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def smallest_integer_dtype(X: NDArrayInt) -> np.dtype:
+    """
+    Return the smallest signed integer dtype which holds all entries of `X` exactly
+    """
+    X = np.asarray(X)
+    if X.size == 0:
+        return np.dtype(np.int8)
+    lo, hi = int(X.min()), int(X.max())
+    for dtype in _INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    raise OverflowError("Entries do not fit in int64.")
+
+
+def _compact(results: tuple) -> tuple:
+    return tuple(res.astype(smallest_integer_dtype(res)) for res in results)
+
+
+def pack_diagonal(D: NDArrayInt) -> NDArrayInt:
+    """
+    Keep only diagonals of a stack of diagonal matrices, such as Smith normal forms
+
+    Parameters
+    ----------
+    D: array, (k, m, n)
+
+    Returns
+    -------
+    diagonals: array, (k, min(m, n))
+    """
+    return np.ascontiguousarray(np.diagonal(D, axis1=1, axis2=2))
+
+
+def unpack_diagonal(diagonals: NDArrayInt, shape: tuple[int, int]) -> NDArrayInt:
+    """
+    Inverse of :func:`pack_diagonal`
+
+    Parameters
+    ----------
+    diagonals: array, (k, min(m, n))
+    shape: (m, n)
+
+    Returns
+    -------
+    D: array, (k, m, n)
+    """
+    m, n = shape
+    D = np.zeros((len(diagonals), m, n), dtype=diagonals.dtype)
+    r = np.arange(min(m, n))
+    D[:, r, r] = diagonals
+    return D
+
+
+def pack_triangle(H: NDArrayInt, lower: bool = False) -> NDArrayInt:
+    """
+    Keep only upper (or lower) triangles of a stack of matrices, such as row-style (column-style) Hermite normal forms
+
+    Parameters
+    ----------
+    H: array, (k, m, n)
+    lower: bool
+        If true, keep lower triangles
+
+    Returns
+    -------
+    triangles: array, (k, t)
+        Entries in row-major order of ``np.triu_indices(m, 0, n)`` (``np.tril_indices`` if `lower`)
+    """
+    _, m, n = H.shape
+    rows, cols = np.tril_indices(m, 0, n) if lower else np.triu_indices(m, 0, n)
+    return np.ascontiguousarray(H[:, rows, cols])
+
+
+def unpack_triangle(
+    triangles: NDArrayInt, shape: tuple[int, int], lower: bool = False
+) -> NDArrayInt:
+    """
+    Inverse of :func:`pack_triangle`
+
+    Parameters
+    ----------
+    triangles: array, (k, t)
+    shape: (m, n)
+    lower: bool
+
+    Returns
+    -------
+    H: array, (k, m, n)
+    """
+    m, n = shape
+    rows, cols = np.tril_indices(m, 0, n) if lower else np.triu_indices(m, 0, n)
+    H = np.zeros((len(triangles), m, n), dtype=triangles.dtype)
+    H[:, rows, cols] = triangles
+    return H
+
+
+def batch_smith_normal_form(
+    X: NDArrayInt, compact: bool = False
+) -> tuple[NDArrayInt, NDArrayInt, NDArrayInt]:
+    """
+    Calculate Smith normal forms of a stack of integer matrices ``X[i]``.
+    Returned matrices satisfy ``D[i] = L[i] @ X[i] @ R[i]``.
+
+    All matrices are eliminated simultaneously with vectorized operations,
+    and the results are identical to those of :func:`hsnf.smith_normal_form` with the default options
+    except transformations of structured matrices taken by its fast paths.
+
+    Parameters
+    ----------
+    X: array, (k, m, n)
+        Stack of integer matrices
+    compact: bool
+        If true, each returned array is cast to the smallest integer dtype holding all of its entries,
+        see :func:`smallest_integer_dtype`
+
+    Returns
+    -------
+    D: array, (k, m, n)
+    L: array, (k, m, m)
+    R: array, (k, n, n)
+    """
+    A = _as_batch(X)
+    num_batch, m, n = A.shape
+    L = _batch_eye(num_batch, m)
+    R = _batch_eye(num_batch, n)
+
+    rows = np.arange(m)
+    cols = np.arange(n)
+    s = np.zeros(num_batch, dtype=int)
+    active = np.full(num_batch, min(m, n) > 0)
+
+    while np.any(active):
+        index = np.flatnonzero(active)
+        ss = s[index]
+        sub = A[index]
+
+        # choose a pivot
+        in_sub = (rows[None, :, None] >= ss[:, None, None]) & (
+            cols[None, None, :] >= ss[:, None, None]
+        )
+        flat, found = _first_argmin(
+            np.abs(sub).reshape(len(index), m * n),
+            (in_sub & (sub != 0)).reshape(len(index), m * n),
+        )
+        active[index[~found]] = False
+        index, ss, flat = index[found], ss[found], flat[found]
+        if index.size == 0:
+            break
+        row, col = np.divmod(flat, n)
+        _swap_rows(A, index, ss, row)
+        _swap_rows(L, index, ss, row)
+        _swap_columns(A, index, ss, col)
+        _swap_columns(R, index, ss, col)
+
+        # eliminate the s-th column entries
+        pivot = A[index, ss, ss]
+        k = A[index, :, ss] // pivot[:, None]
+        k[rows[None, :] <= ss[:, None]] = 0
+        A[index] -= k[:, :, None] * A[index, ss][:, None, :]
+        L[index] -= k[:, :, None] * L[index, ss][:, None, :]
+
+        # eliminate the s-th row entries
+        k = A[index, ss, :] // pivot[:, None]
+        k[cols[None, :] <= ss[:, None]] = 0
+        A[index] -= A[index, :, ss][:, :, None] * k[:, None, :]
+        R[index] -= R[index, :, ss][:, :, None] * k[:, None, :]
+
+        # if there does not remain non-zero element in s-th row and column, find a next entry
+        sub = A[index]
+        arange = np.arange(len(index))
+        lone = ~np.any((cols[None, :] > ss[:, None]) & (sub[arange, ss] != 0), axis=1)
+        lone &= ~np.any((rows[None, :] > ss[:, None]) & (sub[arange, :, ss] != 0), axis=1)
+        index, ss, sub = index[lone], ss[lone], sub[lone]
+        pivot = sub[np.arange(len(index)), ss, ss]
+        lower = (rows[None, :, None] > ss[:, None, None]) & (
+            cols[None, None, :] > ss[:, None, None]
+        )
+        indivisible = (lower & (sub % pivot[:, None, None] != 0)).reshape(len(index), m * n)
+        has_next = np.any(indivisible, axis=1)
+        i, _ = np.divmod(np.argmax(indivisible, axis=1), n)
+
+        nxt = index[has_next]
+        A[nxt, ss[has_next]] += A[nxt, i[has_next]]
+        L[nxt, ss[has_next]] += L[nxt, i[has_next]]
+
+        fin = index[~has_next]
+        negative = A[fin, ss[~has_next], ss[~has_next]] < 0
+        A[fin[negative], ss[~has_next][negative]] *= -1
+        L[fin[negative], ss[~has_next][negative]] *= -1
+        s[fin] += 1
+        active[fin[s[fin] == min(m, n)]] = False
+
+    if compact:
+        return _compact((A, L, R))
+    return A, L, R
+
+
+def batch_row_style_hermite_normal_form(
+    X: NDArrayInt, compact: bool = False
+) -> tuple[NDArrayInt, NDArrayInt]:
+    """
+    Calculate row-style Hermite normal forms of a stack of integer matrices ``X[i]``.
+    Returned matrices satisfy ``H[i] = L[i] @ X[i]``.
+
+    All matrices are eliminated simultaneously with vectorized operations,
+    and the results are identical to those of :func:`hsnf.row_style_hermite_normal_form` with the default options
+    except transformations of structured matrices taken by its fast paths.
+
+    Parameters
+    ----------
+    X: array, (k, m, n)
+        Stack of integer matrices
+    compact: bool
+        If true, each returned array is cast to the smallest integer dtype holding all of its entries,
+        see :func:`smallest_integer_dtype`
+
+    Returns
+    -------
+    H: array, (k, m, n)
+    L: array, (k, m, m)
+    """
+    A = _as_batch(X)
+    num_batch, m, n = A.shape
+    L = _batch_eye(num_batch, m)
+
+    rows = np.arange(m)
+    si = np.zeros(num_batch, dtype=int)
+    sj = np.zeros(num_batch, dtype=int)
+    active = np.full(num_batch, (m > 0) and (n > 0))
+
+    while np.any(active):
+        index = np.flatnonzero(active)
+        ii, jj = si[index], sj[index]
+
+        # choose a pivot
+        column = A[index, :, jj]
+        row, found = _first_argmin(np.abs(column), (rows[None, :] >= ii[:, None]) & (column != 0))
+
+        # if there does not remain non-zero elements, go to a next column
+        skip = index[~found]
+        sj[skip] += 1
+        active[skip[sj[skip] == n]] = False
+
+        index, ii, jj, row = index[found], ii[found], jj[found], row[found]
+        if index.size == 0:
+            continue
+        _swap_rows(A, index, ii, row)
+        _swap_rows(L, index, ii, row)
+
+        # eliminate the s-th column entries
+        pivot = A[index, ii, jj]
+        k = A[index, :, jj] // pivot[:, None]
+        k[rows[None, :] <= ii[:, None]] = 0
+        A[index] -= k[:, :, None] * A[index, ii][:, None, :]
+        L[index] -= k[:, :, None] * L[index, ii][:, None, :]
+
+        # if there does not remain non-zero element in s-th row, find a next entry
+        below = (rows[None, :] > ii[:, None]) & (A[index, :, jj] != 0)
+        fin = ~np.any(below, axis=1)
+        index, ii, jj = index[fin], ii[fin], jj[fin]
+
+        negative = A[index, ii, jj] < 0
+        A[index[negative], ii[negative]] *= -1
+        L[index[negative], ii[negative]] *= -1
+
+        pivot = A[index, ii, jj]
+        k = A[index, :, jj] // pivot[:, None]
+        k[rows[None, :] >= ii[:, None]] = 0
+        A[index] -= k[:, :, None] * A[index, ii][:, None, :]
+        L[index] -= k[:, :, None] * L[index, ii][:, None, :]
+
+        si[index] += 1
+        sj[index] += 1
+        active[index[(si[index] == m) | (sj[index] == n)]] = False
+
+    if compact:
+        return _compact((A, L))
+    return A, L
+
+
+def batch_column_style_hermite_normal_form(
+    X: NDArrayInt, compact: bool = False
+) -> tuple[NDArrayInt, NDArrayInt]:
+    """
+    Calculate column-style Hermite normal forms of a stack of integer matrices ``X[i]``.
+    Returned matrices satisfy ``H[i] = X[i] @ R[i]``.
+
+    The results are identical to those of :func:`hsnf.column_style_hermite_normal_form` with the default options
+    except transformations of structured matrices taken by its fast paths.
+
+    Parameters
+    ----------
+    X: array, (k, m, n)
+        Stack of integer matrices
+    compact: bool
+        If true, each returned array is cast to the smallest integer dtype holding all of its entries,
+        see :func:`smallest_integer_dtype`
+
+    Returns
+    -------
+    H: array, (k, m, n)
+    R: array, (k, n, n)
+    """
+    X = _as_batch(X)
+    H_T, R_T = batch_row_style_hermite_normal_form(np.transpose(X, (0, 2, 1)))
+    H = np.ascontiguousarray(np.transpose(H_T, (0, 2, 1)))
+    R = np.ascontiguousarray(np.transpose(R_T, (0, 2, 1)))
+    if compact:
+        return _compact((H, R))
+    return H, R
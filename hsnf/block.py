@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import scipy.sparse
+from scipy.sparse.csgraph import connected_components
+
+from hsnf.structure import monomial_smith_normal_form
+from hsnf.utils import NDArrayInt, parallel_map
+
+
+def connected_blocks(M: NDArrayInt) -> list[tuple[NDArrayInt, NDArrayInt]]:
+    """
+    Find independent blocks of `M` as connected components of the bipartite graph of rows and columns,
+    where the i-th row and j-th column are adjacent if ``M[i, j] != 0``.
+
+    Parameters
+    ----------
+    M: array, (m, n)
+
+    Returns
+    -------
+    blocks: list of (rows, cols)
+        ``M[np.ix_(rows, cols)]`` is the block, and ``rows`` and ``cols`` are sorted.
+        A zero row (column) forms a block with no columns (rows).
+    """
+    A = np.asarray(M)
+    if A.ndim != 2:
+        raise ValueError("matrix representation must be 2d")
+    m, n = A.shape
+    rows, cols = np.nonzero(A)
+    graph = scipy.sparse.coo_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, m + cols)), shape=(m + n, m + n)
+    )
+    num_blocks, labels = connected_components(graph, directed=False)
+
+    order = np.argsort(labels, kind="stable")
+    groups = np.split(order, np.cumsum(np.bincount(labels, minlength=num_blocks))[:-1])
+    return [(nodes[nodes < m], nodes[nodes >= m] - m) for nodes in groups]
+
+
+def _decompose_blocks(A, decompose: Callable, max_workers: int):
+    blocks = connected_blocks(A)
+    nontrivial = [(rows, cols) for rows, cols in blocks if len(rows) > 0 and len(cols) > 0]
+    results = parallel_map(
+        decompose, [A[np.ix_(rows, cols)] for rows, cols in nontrivial], max_workers
+    )
+    zero_rows = np.concatenate([np.zeros(0, dtype=int)] + [r for r, c in blocks if len(c) == 0])
+    zero_cols = np.concatenate([np.zeros(0, dtype=int)] + [c for r, c in blocks if len(r) == 0])
+    return nontrivial, results, zero_rows, zero_cols
+
+
+def block_smith_normal_form(
+    M: NDArrayInt, decompose: Callable, max_workers: int = 1
+) -> tuple[NDArrayInt, NDArrayInt, NDArrayInt]:
+    """
+    Calculate Smith normal form of `M` block by block.
+
+    Each block from :func:`connected_blocks` is decomposed by `decompose` independently,
+    and the diagonal entries of all blocks are merged into one divisibility chain by gcd/lcm operations.
+
+    Parameters
+    ----------
+    M: array, (m, n)
+    decompose: callable
+        Function returning `(D, L, R)` of a block, such as :func:`hsnf.smith_normal_form`.
+        It should be picklable if ``max_workers > 1``.
+    max_workers: int
+        Number of worker processes to decompose blocks
+
+    Returns
+    -------
+    D: array, (m, n)
+    L: array, (m, m)
+    R: array, (n, n)
+    """
+    A = np.asarray(M)
+    m, n = A.shape
+    nontrivial, results, zero_rows, zero_cols = _decompose_blocks(A, decompose, max_workers)
+
+    # L1 @ M @ R1 is block-diagonal with diagonal blocks
+    N = np.zeros((m, n), dtype=int)
+    L1 = np.zeros((m, m), dtype=int)
+    R1 = np.zeros((n, n), dtype=int)
+    row_offset, col_offset = 0, 0
+    for (rows, cols), (Db, Lb, Rb) in zip(nontrivial, results):
+        new_rows = np.arange(row_offset, row_offset + len(rows))
+        new_cols = np.arange(col_offset, col_offset + len(cols))
+        N[np.ix_(new_rows, new_cols)] = Db
+        L1[np.ix_(new_rows, rows)] = Lb
+        R1[np.ix_(cols, new_cols)] = Rb
+        row_offset += len(rows)
+        col_offset += len(cols)
+    L1[np.arange(row_offset, m), zero_rows] = 1
+    R1[zero_cols, np.arange(col_offset, n)] = 1
+
+    return monomial_smith_normal_form(N, L1, R1)
+
+
+def block_row_style_hermite_normal_form(
+    M: NDArrayInt, decompose: Callable, max_workers: int = 1
+) -> tuple[NDArrayInt, NDArrayInt]:
+    """
+    Calculate row-style Hermite normal form of `M` block by block.
+
+    Nonzero rows of the Hermite normal forms of blocks from :func:`connected_blocks` have disjoint supports,
+    so they are only sorted by their pivot columns.
+
+    Parameters
+    ----------
+    M: array, (m, n)
+    decompose: callable
+        Function returning `(H, L)` of a block, such as :func:`hsnf.row_style_hermite_normal_form`.
+        It should be picklable if ``max_workers > 1``.
+    max_workers: int
+        Number of worker processes to decompose blocks
+
+    Returns
+    -------
+    H: array, (m, n)
+    L: array, (m, m)
+    """
+    A = np.asarray(M)
+    m, n = A.shape
+    nontrivial, results, zero_rows, _ = _decompose_blocks(A, decompose, max_workers)
+
+    H_rows, L_rows, pivots, kernel_rows = [], [], [], []
+    for (rows, cols), (Hb, Lb) in zip(nontrivial, results):
+        nonzero = np.any(Hb != 0, axis=1)
+        H_full = np.zeros((np.count_nonzero(nonzero), n), dtype=int)
+        H_full[:, cols] = Hb[nonzero]
+        L_full = np.zeros((len(rows), m), dtype=int)
+        L_full[:, rows] = Lb
+        H_rows.append(H_full)
+        L_rows.append(L_full[nonzero])
+        pivots.append(cols[np.argmax(Hb[nonzero] != 0, axis=1)])
+        kernel_rows.append(L_full[~nonzero])
+    kernel_rows.append(np.eye(m, dtype=int)[zero_rows])
+
+    H = np.zeros((m, n), dtype=int)
+    L = np.zeros((m, m), dtype=int)
+    if H_rows:
+        order = np.argsort(np.concatenate(pivots))
+        rank = len(order)
+        H[:rank] = np.concatenate(H_rows)[order]
+        L[:rank] = np.concatenate(L_rows)[order]
+    else:
+        rank = 0
+    L[rank:] = np.concatenate(kernel_rows)
+    return H, L
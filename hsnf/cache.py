@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from hsnf.utils import NDArrayInt
+
+# Bump when stored results of the same input may change
+CACHE_FORMAT_VERSION = 1
+
+# Directory of the cache used when `enable_cache` is not called
+CACHE_DIR_ENV = "HSNF_CACHE_DIR"
+
+# Writes between rescans of the directory to account for entries written or removed by other processes
+_RESCAN_INTERVAL = 256
+
+# Eviction on writes removes entries down to this fraction of `max_bytes`,
+# so that the directory is not rescanned on every write near the limit
+_EVICTION_RATIO = 0.9
+
+try:
+    _HSNF_VERSION = version("hsnf")
+except PackageNotFoundError:
+    _HSNF_VERSION = "unknown"
+
+
+class DecompositionCache:
+    """
+    Persistent content-addressed cache of decompositions in a local directory.
+
+    Each entry is a ``.npz`` file named by a SHA-256 hash of the kind of decomposition, its parameters,
+    the library version, and the dtype, shape and bytes of the input matrix.
+    Entries are written to temporary files and atomically renamed, so several processes can share a directory
+    without locks: readers see either a complete entry or nothing.
+    When the total size exceeds `max_bytes`, least recently used entries are removed.
+    The total size is tracked in memory per write, and the directory is only scanned on eviction
+    or every few hundred writes to catch up with other processes.
+
+    Parameters
+    ----------
+    directory: str or Path
+        Created if it does not exist
+    max_bytes: int
+        Upper bound of the total size of entries
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = 2**30):
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        # Total size of entries as seen by this process, scanned on the first write
+        self._tracked_bytes: int | None = None
+        self._writes_since_scan = 0
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def key(self, kind: str, M: NDArrayInt, **params) -> str | None:
+        """
+        Return a hash identifying decomposition `kind` of `M` with `params`,
+        or None if `M` cannot be hashed by its bytes
+        """
+        A = np.ascontiguousarray(M)
+        if A.dtype.kind not in "biuf":
+            return None
+        h = hashlib.sha256()
+        header = (CACHE_FORMAT_VERSION, _HSNF_VERSION, kind, sorted(params.items()))
+        h.update(repr(header).encode())
+        h.update(A.dtype.str.encode())
+        h.update(repr(A.shape).encode())
+        h.update(A.tobytes())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._directory / key[:2] / f"{key}.npz"
+
+    def get(self, key: str) -> tuple[NDArrayInt, ...] | None:
+        """
+        Return stored arrays of `key`, or None if missing
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = tuple(data[f"arr_{i}"] for i in range(len(data.files)))
+            # Mark as recently used
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            # Missing, or removed by another process in the meantime
+            return None
+        return arrays
+
+    def put(self, key: str, arrays: tuple[NDArrayInt, ...]):
+        """
+        Store `arrays` for `key` and evict old entries if the cache is full
+        """
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, *arrays)
+            written = os.path.getsize(tmp)
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        self._writes_since_scan += 1
+        if self._tracked_bytes is None or self._writes_since_scan >= _RESCAN_INTERVAL:
+            self._tracked_bytes = self.size
+        else:
+            self._tracked_bytes += written - replaced
+        if self._tracked_bytes > self._max_bytes:
+            self.evict(max_bytes=int(self._max_bytes * _EVICTION_RATIO))
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self._directory.glob("*/*.npz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of entries in bytes
+        """
+        total = sum(size for _, size, _ in self._entries())
+        self._tracked_bytes = total
+        self._writes_since_scan = 0
+        return total
+
+    def evict(self, max_bytes: int | None = None):
+        """
+        Remove least recently used entries until their total size is at most `max_bytes`
+        """
+        if max_bytes is None:
+            max_bytes = self._max_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                # Already removed by another process
+                pass
+            total -= size
+        self._tracked_bytes = total
+        self._writes_since_scan = 0
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        self.evict(max_bytes=0)
+
+
+_cache: DecompositionCache | None = None
+
+
+def enable_cache(directory: str | Path, max_bytes: int = 2**30) -> DecompositionCache:
+    """
+    Enable a persistent cache of decompositions in `directory`.
+
+    Once enabled, :func:`hsnf.smith_normal_form`, :func:`hsnf.row_style_hermite_normal_form`,
+    :func:`hsnf.column_style_hermite_normal_form`, and lattice helpers built on them
+    look up the cache before computing.
+    Worker processes started afterwards may instead set the environment variable ``HSNF_CACHE_DIR``.
+
+    Parameters
+    ----------
+    directory: str or Path
+    max_bytes: int
+        Upper bound of the total size of entries
+
+    Returns
+    -------
+    cache: DecompositionCache
+    """
+    global _cache
+    _cache = DecompositionCache(directory, max_bytes=max_bytes)
+    return _cache
+
+
+def disable_cache():
+    """
+    Disable the cache enabled by :func:`enable_cache`. Stored entries are kept.
+    """
+    global _cache
+    _cache = None
+
+
+def get_cache() -> DecompositionCache | None:
+    """
+    Return the enabled cache. If not enabled, use the directory of ``HSNF_CACHE_DIR`` if set.
+    """
+    if _cache is None and os.environ.get(CACHE_DIR_ENV):
+        return enable_cache(os.environ[CACHE_DIR_ENV])
+    return _cache
+
+
+def cached_decomposition(
+    kind: str, M: NDArrayInt, compute: Callable[[], tuple], **params
+) -> tuple:
+    """
+    Return ``compute()``, looking up the enabled cache by `kind`, `M` and `params` first
+    """
+    cache = get_cache()
+    if cache is None:
+        return compute()
+    # Hash before computing, because `compute` may overwrite `M`
+    key = cache.key(kind, M, **params)
+    if key is None:
+        return compute()
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+    results = compute()
+    cache.put(key, results)
+    return results
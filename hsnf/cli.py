@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import numpy as np
+
+from hsnf import (
+    column_style_hermite_normal_form,
+    row_style_hermite_normal_form,
+    smith_normal_form,
+)
+from hsnf.integer_system import solve_integer_linear_system
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+
+def _solve(A, b):
+    res = solve_integer_linear_system(A, b)
+    if res is None:
+        return None, None
+    return res
+
+
+# command -> (function, names of returned values)
+COMMANDS = {
+    "smith": (smith_normal_form, ("D", "L", "R")),
+    "hnf-row": (row_style_hermite_normal_form, ("H", "L")),
+    "hnf-col": (column_style_hermite_normal_form, ("H", "R")),
+    "solve": (_solve, ("basis", "x_special")),
+}
+
+
+def _run_chunk(command: str, inputs: list[tuple]) -> tuple[list[tuple], list[float]]:
+    """
+    Process inputs in a worker and return results and latencies in seconds
+    """
+    func, _ = COMMANDS[command]
+    results: list[tuple] = []
+    latencies: list[float] = []
+    for args in inputs:
+        start = perf_counter()
+        results.append(func(*args))
+        latencies.append(perf_counter() - start)
+    return results, latencies
+
+
+def read_inputs(path, command: str, rhs=None) -> list[tuple]:
+    """
+    Read matrices from .npy, .npz, or JSON-lines file.
+
+    - .npy: array with shape (k, m, n) or (m, n). Right-hand sides of ``solve`` are read from `rhs`.
+    - .npz: array ``M`` (or the only array), or arrays ``A`` and ``b`` for ``solve``
+    - .jsonl: each line is a matrix, ``{"M": matrix}``, or ``{"A": matrix, "b": vector}`` for ``solve``
+    """
+    path = Path(path)
+    solve = command == "solve"
+    if path.suffix == ".npy":
+        X = np.load(path)
+        if X.ndim == 2:
+            X = X[None]
+        if not solve:
+            return [(M,) for M in X]
+        if rhs is None:
+            raise ValueError("Right-hand sides should be given by --rhs for .npy input.")
+        B = np.load(rhs)
+        if B.ndim == 1:
+            B = B[None]
+        return list(zip(X, B))
+    elif path.suffix == ".npz":
+        with np.load(path) as data:
+            if solve:
+                return list(zip(data["A"], data["b"]))
+            if "M" in data.files:
+                return [(M,) for M in data["M"]]
+            if len(data.files) != 1:
+                raise ValueError("Input .npz file should contain array 'M'.")
+            return [(M,) for M in data[data.files[0]]]
+    elif path.suffix in (".jsonl", ".json"):
+        inputs: list[tuple] = []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                obj = json.loads(line)
+                if solve:
+                    inputs.append((np.array(obj["A"], dtype=int), np.array(obj["b"], dtype=int)))
+                elif isinstance(obj, dict):
+                    inputs.append((np.array(obj["M"], dtype=int),))
+                else:
+                    inputs.append((np.array(obj, dtype=int),))
+        return inputs
+    else:
+        raise ValueError(f"Unsupported input format: {path.suffix}")
+
+
+def _is_ragged(command: str, results: list[tuple]) -> bool:
+    """
+    Return true if returned values of different records have different shapes
+    """
+    if command == "solve":
+        widths = {len(x) for _, x in results if x is not None}
+        return len(widths) > 1
+    return any(
+        len({np.shape(res[i]) for res in results}) > 1
+        for i in range(len(results[0]) if results else 0)
+    )
+
+
+def _split_results(command: str, results: list[tuple]) -> dict[str, Any]:
+    """
+    Return values of each record with keys ``{name}_{index}``. Values missing by None are skipped.
+    """
+    _, names = COMMANDS[command]
+    arrays = {}
+    for i, res in enumerate(results):
+        for name, val in zip(names, res):
+            if val is not None:
+                arrays[f"{name}_{i}"] = np.asarray(val)
+    return arrays
+
+
+def _stack_results(command: str, results: list[tuple]) -> dict[str, Any]:
+    _, names = COMMANDS[command]
+    if command != "solve":
+        return {name: np.stack([res[i] for res in results]) for i, name in enumerate(names)}
+
+    # Pad general solutions with zero vectors and special solutions with NaN
+    n = max((len(x) for _, x in results if x is not None), default=0)
+    num_basis = np.array([0 if basis is None else len(basis) for basis, _ in results], dtype=int)
+    basis = np.zeros((len(results), int(np.max(num_basis, initial=0)), n), dtype=int)
+    x_special = np.full((len(results), n), np.nan)
+    for i, (b, x) in enumerate(results):
+        if x is None:
+            continue
+        basis[i, : len(b)] = b
+        x_special[i] = x
+    return {"basis": basis, "num_basis": num_basis, "x_special": x_special}
+
+
+def write_outputs(path, command: str, results: list[tuple]):
+    """
+    Write results in .npy, .npz, or JSON-lines file.
+
+    - .npy: each returned value is stacked and saved as ``{stem}_{name}.npy``
+    - .npz: each returned value is stacked and saved with its name.
+      If inputs have different shapes, values of the i-th record are saved as ``{name}_{i}`` instead.
+    - .jsonl: each line is a dictionary of returned values
+    """
+    path = Path(path)
+    _, names = COMMANDS[command]
+    ragged = _is_ragged(command, results)
+    if path.suffix in (".jsonl", ".json"):
+        with open(path, "w") as f:
+            for res in results:
+                obj = {
+                    name: None if val is None else np.asarray(val).tolist()
+                    for name, val in zip(names, res)
+                }
+                f.write(json.dumps(obj) + "\n")
+    elif path.suffix == ".npz":
+        arrays = _split_results(command, results) if ragged else _stack_results(command, results)
+        np.savez(path, **arrays)
+    elif path.suffix == ".npy":
+        if ragged:
+            raise ValueError(
+                "Results of matrices with different shapes cannot be stacked in .npy files. "
+                "Use .npz or .jsonl output."
+            )
+        for name, arr in _stack_results(command, results).items():
+            np.save(path.with_name(f"{path.stem}_{name}.npy"), arr)
+    else:
+        raise ValueError(f"Unsupported output format: {path.suffix}")
+
+
+def _peak_rss_mib(who: str) -> float:
+    if resource is None:
+        return float("nan")
+    rusage = resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN
+    rss = resource.getrusage(rusage).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    if sys.platform == "darwin":
+        return rss / 1024**2
+    return rss / 1024
+
+
+def run(
+    command: str,
+    inputs: list[tuple],
+    max_workers: int = 1,
+    chunk_size: int = 256,
+):
+    """
+    Process inputs with `max_workers` worker processes
+
+    Returns
+    -------
+    results: list
+        Returned values for each input in the same order
+    stats: dict
+        Throughput, latencies per matrix, and peak RSS
+    """
+    chunks = [inputs[i : i + chunk_size] for i in range(0, len(inputs), chunk_size)]
+    start = perf_counter()
+    outputs: list[tuple[list[tuple], list[float]]]
+    if max_workers == 1:
+        outputs = [_run_chunk(command, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outputs = list(executor.map(_run_chunk, [command] * len(chunks), chunks))
+    elapsed = perf_counter() - start
+
+    results = [res for chunk_results, _ in outputs for res in chunk_results]
+    latencies = np.array([lat for _, chunk_latencies in outputs for lat in chunk_latencies])
+    stats = {
+        "num_matrices": len(inputs),
+        "elapsed": elapsed,
+        "throughput": len(inputs) / elapsed if elapsed > 0 else float("inf"),
+        "latency_p50": float(np.percentile(latencies, 50)) if len(latencies) else float("nan"),
+        "latency_p99": float(np.percentile(latencies, 99)) if len(latencies) else float("nan"),
+        "peak_rss_mib": _peak_rss_mib("self"),
+        "peak_rss_workers_mib": _peak_rss_mib("children"),
+    }
+    return results, stats
+
+
+def _format_stats(stats, max_workers: int) -> str:
+    return "\n".join(
+        [
+            f"processed {stats['num_matrices']} matrices in {stats['elapsed']:.3f} s "
+            f"({stats['throughput']:.1f} matrices/s) with {max_workers} worker(s)",
+            f"latency per matrix: p50 {stats['latency_p50'] * 1e3:.3f} ms, "
+            f"p99 {stats['latency_p99'] * 1e3:.3f} ms",
+            f"peak RSS: main {stats['peak_rss_mib']:.1f} MiB, "
+            f"workers {stats['peak_rss_workers_mib']:.1f} MiB",
+        ]
+    )
+
+
+def main(argv=None):
+    """
+    Entry point of ``hsnf`` command
+
+    .. code-block:: console
+
+        $ hsnf {smith,hnf-row,hnf-col,solve} INPUT -o OUTPUT [--rhs RHS] [-j WORKERS] [--chunk-size CHUNK_SIZE] [-q]
+
+    Input and output formats are chosen from file extensions (.npy, .npz, or .jsonl).
+    For .npy output, each returned value is written to ``{stem}_{name}.npy``.
+    """
+    parser = argparse.ArgumentParser(
+        prog="hsnf", description="Batch runner of Smith and Hermite normal forms"
+    )
+    parser.add_argument("command", choices=list(COMMANDS), help="decomposition or solver to run")
+    parser.add_argument("input", help="input file (.npy, .npz, or .jsonl)")
+    parser.add_argument(
+        "-o", "--output", required=True, help="output file (.npy, .npz, or .jsonl)"
+    )
+    parser.add_argument("--rhs", help="right-hand sides for solve with .npy input")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes"
+    )
+    parser.add_argument("--chunk-size", type=int, default=256, help="matrices per task")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report statistics")
+    args = parser.parse_args(argv)
+
+    inputs = read_inputs(args.input, args.command, rhs=args.rhs)
+    results, stats = run(
+        args.command, inputs, max_workers=args.workers, chunk_size=args.chunk_size
+    )
+    write_outputs(args.output, args.command, results)
+
+    if not args.quiet:
+        print(_format_stats(stats, args.workers), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
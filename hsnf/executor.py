@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from contextlib import suppress
+from time import perf_counter
+
+import numpy as np
+
+from hsnf.batch import (
+    batch_column_style_hermite_normal_form,
+    batch_row_style_hermite_normal_form,
+    batch_smith_normal_form,
+)
+from hsnf.utils import NDArrayInt
+
+# kind of decomposition -> batched function
+BATCH_FUNCTIONS = {
+    "smith": batch_smith_normal_form,
+    "hnf-row": batch_row_style_hermite_normal_form,
+    "hnf-col": batch_column_style_hermite_normal_form,
+}
+
+# Sentinel to stop the worker thread
+_SHUTDOWN = object()
+
+
+class BatchingExecutor:
+    """
+    Thread-safe executor which combines many small decomposition requests into vectorized batches.
+
+    Requests are queued and collected by a worker thread until `max_batch_size` requests arrive
+    or `max_latency` seconds pass since the first one. Requests of the same kind and shape
+    are decomposed together by :mod:`hsnf.batch`, whose results are identical to single-matrix functions
+    except transformations of structured matrices taken by their fast paths.
+
+    Parameters
+    ----------
+    max_batch_size: int
+        Maximum number of requests collected into one batch
+    max_latency: float
+        Maximum seconds to wait for more requests after the first one of a batch
+    """
+
+    def __init__(self, max_batch_size: int = 256, max_latency: float = 0.005):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size should be positive.")
+        self._max_batch_size = max_batch_size
+        self._max_latency = max_latency
+
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._num_requests = 0
+        self._num_batches = 0
+        self._largest_batch = 0
+        self._latencies: deque = deque(maxlen=1024)
+
+        self._worker = threading.Thread(target=self._run, name="hsnf-batching", daemon=True)
+        self._worker.start()
+
+    def submit(self, M: NDArrayInt, kind: str = "smith") -> Future:
+        """
+        Queue a decomposition of `M` and return a future of its results
+
+        Parameters
+        ----------
+        M: array, (m, n)
+            Integer matrix
+        kind: str
+            ``"smith"``, ``"hnf-row"``, or ``"hnf-col"``
+
+        Returns
+        -------
+        future: concurrent.futures.Future
+            Resolved to `(D, L, R)`, `(H, L)`, or `(H, R)`
+        """
+        if kind not in BATCH_FUNCTIONS:
+            raise ValueError(f"Unknown kind: {kind}")
+        A = np.array(M, dtype=int)
+        if A.ndim != 2:
+            raise ValueError("matrix representation must be 2d")
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed executor.")
+            self._queue.put((kind, A, future, perf_counter()))
+        return future
+
+    async def submit_async(self, M: NDArrayInt, kind: str = "smith"):
+        """
+        Awaitable version of :meth:`submit`, returning results directly
+        """
+        return await asyncio.wrap_future(self.submit(M, kind))
+
+    def metrics(self) -> dict:
+        """
+        Return a snapshot of metrics
+
+        Returns
+        -------
+        metrics: dict
+            - ``"queue_depth"``: number of requests waiting for a batch
+            - ``"num_requests"``: number of completed requests
+            - ``"num_batches"``: number of batched calls
+            - ``"mean_batch_size"``, ``"max_batch_size"``: sizes of batched calls
+            - ``"latency_mean"``, ``"latency_p95"``, ``"latency_max"``: seconds from submission to completion
+              over the latest 1024 requests
+        """
+        with self._lock:
+            latencies = np.array(self._latencies)
+            num_requests, num_batches = self._num_requests, self._num_batches
+            largest_batch = self._largest_batch
+        has_latency = latencies.size > 0
+        return {
+            "queue_depth": self._queue.qsize(),
+            "num_requests": num_requests,
+            "num_batches": num_batches,
+            "mean_batch_size": num_requests / num_batches if num_batches else 0.0,
+            "max_batch_size": largest_batch,
+            "latency_mean": float(np.mean(latencies)) if has_latency else 0.0,
+            "latency_p95": float(np.percentile(latencies, 95)) if has_latency else 0.0,
+            "latency_max": float(np.max(latencies)) if has_latency else 0.0,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting requests. Queued requests are still processed.
+        """
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_SHUTDOWN)
+        if wait:
+            self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown(wait=True)
+
+    def _collect(self) -> tuple[list, bool]:
+        """
+        Block until the first request arrives, and collect requests within the latency budget
+        """
+        first = self._queue.get()
+        if first is _SHUTDOWN:
+            return [], True
+        requests = [first]
+        deadline = perf_counter() + self._max_latency
+        while len(requests) < self._max_batch_size:
+            timeout = deadline - perf_counter()
+            try:
+                item = (
+                    self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is _SHUTDOWN:
+                return requests, True
+            requests.append(item)
+        return requests, False
+
+    def _process(self, requests: list):
+        groups: dict = {}
+        for request in requests:
+            kind, A, _, _ = request
+            groups.setdefault((kind, A.shape), []).append(request)
+
+        for (kind, _), group in groups.items():
+            # Skip requests cancelled while queued
+            group = [request for request in group if request[2].set_running_or_notify_cancel()]
+            if not group:
+                continue
+            futures = [future for _, _, future, _ in group]
+            # Failures of one group, including its bookkeeping, never affect other groups
+            try:
+                results = BATCH_FUNCTIONS[kind](np.stack([A for _, A, _, _ in group]))
+                finished = perf_counter()
+                # Update metrics before resolving futures, so that they include this batch once results are seen
+                with self._lock:
+                    self._num_requests += len(group)
+                    self._num_batches += 1
+                    self._largest_batch = max(self._largest_batch, len(group))
+                    self._latencies.extend(finished - submitted for _, _, _, submitted in group)
+                for i, future in enumerate(futures):
+                    future.set_result(tuple(res[i] for res in results))
+            except Exception as e:
+                for future in futures:
+                    with suppress(InvalidStateError):
+                        future.set_exception(e)
+
+    def _run(self):
+        while True:
+            requests, stop = self._collect()
+            if requests:
+                self._process(requests)
+            if stop:
+                break
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import numpy as np
+
+from hsnf import column_style_hermite_normal_form
+from hsnf.utils import NDArrayInt
+
+
+def _as_stack(M) -> tuple[np.ndarray, bool]:
+    """
+    return a stack of integer matrices with shape (k, m, n) and whether `M` is a single matrix
+    """
+    X = np.asarray(M)
+    single = X.ndim == 2
+    if single:
+        X = X[None, :, :]
+    if X.ndim != 3:
+        raise ValueError("Matrix should be 2d or a stack of 2d matrices.")
+    return X, single
+
+
+def _bareiss_dtype(X: np.ndarray):
+    """
+    Choose int64 if products of two minors of `X` are bounded by Hadamard's inequality, otherwise Python int
+    """
+    if X.size == 0:
+        return np.int_
+    norms = np.linalg.norm(X.astype(float), axis=2)
+    log2_bound = np.max(np.sum(np.log2(np.maximum(norms, 1.0)), axis=1))
+    if 2 * log2_bound + 2 < 62:
+        return np.int_
+    return object
+
+
+def _bareiss(X: np.ndarray):
+    """
+    Fraction-free Gaussian elimination of a stack of matrices ``X[i]``.
+
+    Returns
+    -------
+    A: array, (k, m, n)
+        Row echelon forms. The t-th pivot is the determinant of the leading (t + 1) pivot rows and columns.
+    rank: array, (k, )
+    sign: array, (k, )
+        Sign of row permutations
+    perm: array, (k, m)
+        ``A[i, t]`` is derived from ``X[i, perm[i, t]]``, and ``X[i, perm[i, :rank[i]]]`` are linearly independent.
+    """
+    dtype = _bareiss_dtype(X)
+    A = np.array(X, dtype=dtype)
+    num_batch, m, n = A.shape
+
+    rows = np.arange(m)
+    perm = np.repeat(rows[None, :], num_batch, axis=0)
+    rank = np.zeros(num_batch, dtype=int)
+    sign = np.ones(num_batch, dtype=int)
+    prev = np.ones(num_batch, dtype=dtype)
+
+    for j in range(n):
+        # choose the first nonzero pivot in the j-th column
+        mask = (rows[None, :] >= rank[:, None]) & (A[:, :, j] != 0)
+        index = np.flatnonzero(np.any(mask, axis=1))
+        if index.size == 0:
+            continue
+        rr = rank[index]
+        p = np.argmax(mask[index], axis=1)
+
+        swapped = p != rr
+        sign[index[swapped]] *= -1
+        for arr in (A, perm):
+            tmp = arr[index, rr].copy()
+            arr[index, rr] = arr[index, p]
+            arr[index, p] = tmp
+
+        # A[i, k] <- (A[r, j] * A[i, k] - A[i, j] * A[r, k]) / (previous pivot) for i > r
+        sub = A[index]
+        pivot = sub[np.arange(index.size), rr, j]
+        pivot_row = sub[np.arange(index.size), rr, :]
+        updated = (
+            pivot[:, None, None] * sub - sub[:, :, j][:, :, None] * pivot_row[:, None, :]
+        ) // prev[index][:, None, None]
+        below = rows[None, :] > rr[:, None]
+        A[index] = np.where(below[:, :, None], updated, sub)
+
+        prev[index] = pivot
+        rank[index] += 1
+
+    return A, rank, sign, perm
+
+
+def integer_rank(M: NDArrayInt):
+    """
+    Calculate rank of integer matrix `M` by fraction-free Gaussian elimination.
+
+    Parameters
+    ----------
+    M: array, (m, n) or (k, m, n)
+        Integer matrix or stack of integer matrices
+
+    Returns
+    -------
+    rank: int or array, (k, )
+    """
+    X, single = _as_stack(M)
+    _, rank, _, _ = _bareiss(X)
+    if single:
+        return int(rank[0])
+    return rank
+
+
+def integer_determinant(M: NDArrayInt):
+    """
+    Calculate determinant of square integer matrix `M` exactly by Bareiss algorithm.
+
+    Intermediate entries are minors of `M`.
+    They are computed in int64 if allowed by Hadamard's bound, otherwise in Python integers.
+
+    Parameters
+    ----------
+    M: array, (n, n) or (k, n, n)
+        Square integer matrix or stack of square integer matrices
+
+    Returns
+    -------
+    det: int or array, (k, )
+    """
+    X, single = _as_stack(M)
+    num_batch, m, n = X.shape
+    if m != n:
+        raise ValueError("Matrix should be square.")
+
+    if n == 0:
+        det = np.ones(num_batch, dtype=int)
+    else:
+        A, rank, sign, _ = _bareiss(X)
+        det = np.where(rank == n, sign * A[:, n - 1, n - 1], 0)
+
+    if single:
+        return int(det[0])
+    return det
+
+
+def integer_adjugate(M: NDArrayInt):
+    """
+    Calculate adjugate matrix :math:`\\mathrm{adj}(\\mathbf{M}) = \\det(\\mathbf{M}) \\mathbf{M}^{-1}` of nonsingular integer matrix `M` exactly.
+
+    Fraction-free Gauss-Jordan elimination of ``[M | I]`` is performed with Python integers,
+    where every intermediate entry is a minor of ``[M | I]``.
+
+    Parameters
+    ----------
+    M: array, (n, n)
+        Nonsingular square integer matrix
+
+    Returns
+    -------
+    adj: array of Python int, (n, n)
+    det: int
+        Determinant of `M`
+    """
+    M = np.asarray(M)
+    if M.ndim != 2 or M.shape[0] != M.shape[1]:
+        raise ValueError("Matrix should be square.")
+    n = M.shape[0]
+    A = [[int(v) for v in row] + [int(i == j) for j in range(n)] for i, row in enumerate(M)]
+
+    sign, prev = 1, 1
+    for k in range(n):
+        p = next((i for i in range(k, n) if A[i][k] != 0), None)
+        if p is None:
+            raise ValueError("Matrix should be nonsingular.")
+        if p != k:
+            A[k], A[p] = A[p], A[k]
+            sign = -sign
+        pivot_row = A[k]
+        for i in range(n):
+            if i != k:
+                a = A[i][k]
+                A[i] = [(pivot_row[k] * x - a * y) // prev for x, y in zip(A[i], pivot_row)]
+        prev = pivot_row[k]
+
+    # The left half is prev * I and the right half is prev * M^-1, where det(M) = sign * prev
+    adj = np.empty((n, n), dtype=object)
+    for i in range(n):
+        adj[i] = [sign * v for v in A[i][n:]]
+    return adj, sign * prev
+
+
+def integer_kernel(M: NDArrayInt):
+    """
+    Calculate a basis of the integer kernel :math:`\\{ \\mathbf{x} \\in \\mathbb{Z}^{n} \\mid \\mathbf{Mx} = \\mathbf{0} \\}`.
+
+    Linearly independent rows of `M` are chosen by fraction-free Gaussian elimination,
+    and the kernel is read off from column-style Hermite normal form of only those rows.
+
+    Parameters
+    ----------
+    M: array, (m, n) or (k, m, n)
+        Integer matrix or stack of integer matrices
+
+    Returns
+    -------
+    basis: array, (n - rank, n), or list of them for a stack
+        ``basis[i, :]`` is the i-th basis vector of the kernel
+    """
+    X, single = _as_stack(M)
+    _, rank, _, perm = _bareiss(X)
+    n = X.shape[2]
+
+    bases = []
+    for Mi, ri, pi in zip(X, rank, perm):
+        if ri == 0:
+            bases.append(np.eye(n, dtype=int))
+            continue
+        independent = np.array(Mi[np.sort(pi[:ri])], dtype=int)
+        _, R = column_style_hermite_normal_form(independent)  # H = independent @ R
+        bases.append(np.ascontiguousarray(R[:, ri:].T))
+
+    if single:
+        return bases[0]
+    return bases
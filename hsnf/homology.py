@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from hsnf.sparse import SparseZmoduleHomomorphism
+
+
+def integer_homology(boundaries) -> tuple[list[int], list[list[int]]]:
+    r"""
+    Calculate integral homology groups of a chain complex
+
+    .. math::
+        0 \leftarrow C_{0} \xleftarrow{\partial_{1}} C_{1} \xleftarrow{\partial_{2}} \cdots \xleftarrow{\partial_{d}} C_{d} \leftarrow 0.
+
+    The k-th homology group is :math:`H_{k} \simeq \mathbb{Z}^{\beta_{k}} \oplus \bigoplus_{i} \mathbb{Z}/t_{k,i}\mathbb{Z}`.
+
+    Only invariant factors of the boundary matrices are computed and no transformation matrix is formed.
+    Before that, pivots with absolute value one are eliminated from each boundary matrix,
+    and the corresponding columns of the lower boundary matrix and rows of the upper boundary matrix are cleared.
+    This reduction keeps the homology groups and shrinks typical complexes considerably.
+
+    Parameters
+    ----------
+    boundaries: list of array or sparse matrix
+        ``boundaries[k]`` is a matrix representation of :math:`\partial_{k+1}: C_{k+1} \to C_{k}` with shape :math:`(\dim C_{k}, \dim C_{k+1})`.
+
+    Returns
+    -------
+    betti_numbers: list of int, (d + 1, )
+        ``betti_numbers[k]`` is the rank of :math:`H_{k}`
+    torsion: list of list of int, (d + 1, )
+        ``torsion[k]`` is torsion coefficients of :math:`H_{k}`, which are larger than one
+    """
+    if len(boundaries) == 0:
+        raise ValueError("At least one boundary matrix is required.")
+    for k in range(len(boundaries) - 1):
+        if boundaries[k].shape[1] != boundaries[k + 1].shape[0]:
+            raise ValueError(f"Shapes of boundary matrices {k} and {k + 1} are inconsistent.")
+
+    dims = [boundaries[0].shape[0]] + [boundary.shape[1] for boundary in boundaries]
+    zmhs = [SparseZmoduleHomomorphism(boundary, transforms=False) for boundary in boundaries]
+
+    # Eliminate unit pivots of d_{k+1}: a pair of a k-cell and (k+1)-cell is removed from the complex.
+    # The k-cell is a column of d_{k} and the (k+1)-cell is a row of d_{k+2}.
+    num_units = []
+    for k, zmh in enumerate(zmhs):
+        pivots = zmh._diagonalize(unit=True)
+        num_units.append(len(pivots))
+        for row, col, _ in pivots:
+            if k > 0:
+                zmhs[k - 1]._delete_column(row)
+            if k + 1 < len(zmhs):
+                zmhs[k + 1]._delete_row(col)
+
+    ranks = [0]
+    torsion = []
+    for zmh, num_unit in zip(zmhs, num_units):
+        diag = zmh.invariant_factors()
+        ranks.append(num_unit + len(diag))
+        torsion.append([d for d in diag if d > 1])
+    ranks.append(0)
+    torsion.append([])
+
+    betti_numbers = [dims[k] - ranks[k] - ranks[k + 1] for k in range(len(dims))]
+    return betti_numbers, torsion
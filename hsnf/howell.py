@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from math import gcd
+
+import numpy as np
+
+from hsnf.utils import NDArrayInt, extgcd
+
+
+def _modular_dtype(q: int):
+    """
+    Sums of two products of residues stay within int64 if q <= 2^31
+    """
+    return np.int64 if q <= 2**31 else object
+
+
+def _normalizing_unit(a: int, q: int) -> int:
+    """
+    Return a unit u modulo q s.t. ``u * a = gcd(a, q) (mod q)``
+    """
+    g = gcd(a, q)
+    q_g = q // g
+    u = pow(a // g, -1, q_g) if q_g > 1 else 1
+    # Lift the inverse modulo q/g to a unit modulo q
+    while gcd(u, q) != 1:
+        u += q_g
+    return u
+
+
+def howell_form(A: NDArrayInt, q: int) -> NDArrayInt:
+    """
+    Calculate Howell form of `A` over Z/qZ, a canonical echelon form of the row span of `A` modulo `q`.
+
+    Its rows span the same submodule of (Z/qZ)^n as rows of `A`, pivots divide `q`, entries above pivots are reduced,
+    and rows whose first k entries vanish span all vectors in the submodule whose first k entries vanish.
+    All arithmetic is reduced modulo `q`, so that entries never exceed `q`.
+
+    Parameters
+    ----------
+    A: array, (m, n)
+        Integer matrix
+    q: int
+        Modulo, at least two
+
+    Returns
+    -------
+    H: array, (r, n)
+        Nonzero rows of Howell form with entries in [0, q). r <= n.
+    """
+    if q < 2:
+        raise ValueError(f"Modulo should be at least two, but got {q}")
+    A = np.asarray(A)
+    if A.ndim != 2:
+        raise ValueError("matrix representation must be 2d")
+    n = A.shape[1]
+    dtype = _modular_dtype(q)
+
+    # Rows not used as pivots yet, whose entries before the current column are zero
+    pending = [row for row in np.mod(A.astype(object), q).astype(dtype) if np.any(row)]
+    pivots: list[NDArrayInt] = []
+    for j in range(n):
+        # Gather the gcd of the j-th column into one row by 2x2 unimodular row operations
+        pivot = None
+        rest = []
+        for row in pending:
+            if row[j] == 0:
+                rest.append(row)
+                continue
+            if pivot is None:
+                pivot = row
+                continue
+            a, b = int(pivot[j]), int(row[j])
+            g, x, y = extgcd(a, b)
+            pivot, row = (x * pivot + y * row) % q, ((a // g) * row - (b // g) * pivot) % q
+            if np.any(row):
+                rest.append(row)
+
+        if pivot is None:
+            pending = rest
+            continue
+
+        # Normalize the pivot to a divisor of q
+        pivot = pivot * _normalizing_unit(int(pivot[j]), q) % q
+        h = int(pivot[j])
+
+        # Howell property: the multiple of the pivot row vanishing in the j-th column is kept in the span
+        annihilated = (q // h) * pivot % q
+        if np.any(annihilated):
+            rest.append(annihilated)
+
+        # Reduce entries above the pivot
+        for i, upper in enumerate(pivots):
+            k = int(upper[j]) // h
+            if k != 0:
+                pivots[i] = (upper - k * pivot) % q
+
+        pivots.append(pivot)
+        pending = rest
+
+    if not pivots:
+        return np.zeros((0, n), dtype=dtype)
+    return np.array(pivots, dtype=dtype)
+
+
+def solve_howell(A: NDArrayInt, b: NDArrayInt, q: int):
+    """
+    Solve ``A @ x = b (mod q)`` with Howell form of ``[A^T | I]`` over Z/qZ.
+
+    Rows of the Howell form whose first m entries vanish give the kernel directly,
+    and reducing ``[b^T | 0]`` by the other rows gives a special solution.
+
+    Parameters
+    ----------
+    A: array, (m, n)
+    b: array, (m, )
+    q: int
+
+    Returns
+    -------
+    basis: array, (r, n)
+        Rows generate all solutions of ``A @ x = 0 (mod q)`` over Z/qZ
+    x_special: array, (n, )
+        Special solution, or None if no solution exists
+    """
+    A = np.asarray(A)
+    m, n = A.shape
+    W = np.concatenate([np.transpose(A), np.eye(n, dtype=int)], axis=1)
+    H = howell_form(W, q)
+    pivot_cols = np.argmax(H != 0, axis=1)
+
+    basis = H[pivot_cols >= m, m:]
+
+    v = np.zeros(m + n, dtype=H.dtype)
+    v[:m] = np.mod(np.asarray(b).astype(object), q).astype(H.dtype)
+    for row, j in zip(H, pivot_cols):
+        if j >= m:
+            break
+        h = int(row[j])
+        if int(v[j]) % h != 0:
+            return basis, None
+        v = (v - (int(v[j]) // h) * row) % q
+    if np.any(v[:m]):
+        return basis, None
+
+    # [b^T | 0] - x^T [A^T | I] = 0
+    x_special = (-v[m:]) % q
+    return basis, x_special
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import numpy as np
+from scipy.linalg import block_diag
+
+from hsnf.transform import ADD, SWAP, UnimodularTransform
+from hsnf.utils import NDArrayInt
+from hsnf.Z_module import ZmoduleHomomorphism
+
+
+def _reused_smith_pivots(N, D, rank: int) -> int:
+    """
+    Count diagonal entries of `N` which are already pivots of `D` with zeros in their rows and columns
+    """
+    reused = 0
+    for s in range(rank):
+        lone = np.count_nonzero(N[s]) == 1 and np.count_nonzero(N[:, s]) == 1
+        if lone and N[s, s] == D[s, s]:
+            reused += 1
+    return reused
+
+
+def _reused_hermite_pivots(N, H, rank: int) -> int:
+    """
+    Count rows of `N` which already have pivots of `H` at the same positions
+    """
+    pivots = np.argmax(H[:rank] != 0, axis=1)
+    reused = 0
+    for s, j in enumerate(pivots):
+        if not np.any(N[s, :j]) and N[s, j] == H[s, j]:
+            reused += 1
+    return reused
+
+
+def _num_effective_operations(T: UnimodularTransform) -> int:
+    """
+    Count recorded operations except swaps of a row with itself and additions of zero times a row
+    """
+    kind, i, j, k = T.operations.T
+    trivial = ((kind == SWAP) & (i == j)) | ((kind == ADD) & (k == 0))
+    return int(np.count_nonzero(~trivial))
+
+
+def _check_transform(T, size: int, name: str):
+    if np.shape(T) != (size, size):
+        raise ValueError(f"{name} should have shape {(size, size)}, but got {np.shape(T)}.")
+
+
+def warm_smith_normal_form(
+    M: NDArrayInt, L0: NDArrayInt, R0: NDArrayInt, pivot_strategy: str = "min_abs"
+) -> tuple[NDArrayInt, NDArrayInt, NDArrayInt, dict]:
+    """
+    Calculate Smith normal form of `M` starting from unimodular transformations of a similar matrix.
+
+    Elimination runs on ``L0 @ M @ R0``, which is nearly diagonal if `L0` and `R0` are taken from
+    the Smith normal form of a matrix close to `M`. Returned matrices satisfy ``D = L @ M @ R``.
+
+    Parameters
+    ----------
+    M: array, (m, n)
+        Integer matrix
+    L0: array, (m, m)
+        Unimodular matrix, such as `L` of a previous decomposition
+    R0: array, (n, n)
+        Unimodular matrix, such as `R` of a previous decomposition
+    pivot_strategy: str
+        See :func:`hsnf.smith_normal_form`
+
+    Returns
+    -------
+    D: array, (m, n)
+    L: array, (m, m)
+    R: array, (n, n)
+    stats: dict
+        - ``"num_operations"``: number of nontrivial elementary operations performed
+        - ``"reused_pivots"``: number of pivots of `D` already found in ``L0 @ M @ R0``
+        - ``"rank"``: rank of `M`
+    """
+    M = np.asarray(M)
+    m, n = M.shape
+    _check_transform(L0, m, "L0")
+    _check_transform(R0, n, "R0")
+    return _update_smith_normal_form(L0 @ M @ R0, np.asarray(L0), np.asarray(R0), pivot_strategy)
+
+
+def warm_row_style_hermite_normal_form(
+    M: NDArrayInt, L0: NDArrayInt, pivot_strategy: str = "min_abs"
+) -> tuple[NDArrayInt, NDArrayInt, dict]:
+    """
+    Calculate row-style Hermite normal form of `M` starting from a unimodular transformation of a similar matrix.
+
+    Elimination runs on ``L0 @ M``, which is nearly in Hermite normal form if `L0` is taken from
+    the Hermite normal form of a matrix close to `M`. Returned matrices satisfy ``H = L @ M``.
+
+    Parameters
+    ----------
+    M: array, (m, n)
+        Integer matrix
+    L0: array, (m, m)
+        Unimodular matrix, such as `L` of a previous decomposition
+    pivot_strategy: str
+        See :func:`hsnf.row_style_hermite_normal_form`
+
+    Returns
+    -------
+    H: array, (m, n)
+    L: array, (m, m)
+    stats: dict
+        Same as :func:`warm_smith_normal_form`
+    """
+    M = np.asarray(M)
+    _check_transform(L0, M.shape[0], "L0")
+    return _update_row_style_hermite_normal_form(L0 @ M, np.asarray(L0), pivot_strategy)
+
+
+def append_smith_normal_form(
+    D: NDArrayInt,
+    L: NDArrayInt,
+    R: NDArrayInt,
+    rows: NDArrayInt | None = None,
+    columns: NDArrayInt | None = None,
+    pivot_strategy: str = "min_abs",
+) -> tuple[NDArrayInt, NDArrayInt, NDArrayInt, dict]:
+    """
+    Update Smith normal form ``D = L @ M @ R`` after appending rows and columns to `M`.
+
+    The original `M` is not needed: ``[M | columns]`` is transformed into ``[D | L @ columns]``
+    and appended rows into ``rows @ R``, so that only the appended part is eliminated against `D`.
+
+    Parameters
+    ----------
+    D: array, (m, n)
+    L: array, (m, m)
+    R: array, (n, n)
+    rows: array, (k, n + l), optional
+        Rows appended after `columns`
+    columns: array, (m, l), optional
+        Columns appended to `M`
+    pivot_strategy: str
+        See :func:`hsnf.smith_normal_form`
+
+    Returns
+    -------
+    D: array, (m + k, n + l)
+    L: array, (m + k, m + k)
+    R: array, (n + l, n + l)
+    stats: dict
+        Same as :func:`warm_smith_normal_form`
+    """
+    N, L0, R0 = np.asarray(D), np.asarray(L), np.asarray(R)
+    if columns is not None:
+        N = np.concatenate([N, L0 @ columns], axis=1)
+        R0 = block_diag(R0, np.eye(np.shape(columns)[1], dtype=int))
+    if rows is not None:
+        N = np.concatenate([N, np.asarray(rows) @ R0], axis=0)
+        L0 = block_diag(L0, np.eye(np.shape(rows)[0], dtype=int))
+    return _update_smith_normal_form(N, L0, R0, pivot_strategy)
+
+
+def append_row_style_hermite_normal_form(
+    H: NDArrayInt,
+    L: NDArrayInt,
+    rows: NDArrayInt | None = None,
+    columns: NDArrayInt | None = None,
+    pivot_strategy: str = "min_abs",
+) -> tuple[NDArrayInt, NDArrayInt, dict]:
+    """
+    Update row-style Hermite normal form ``H = L @ M`` after appending rows and columns to `M`.
+
+    The original `M` is not needed: ``[M | columns]`` is transformed into ``[H | L @ columns]``,
+    so that existing pivots are kept and only the appended part is eliminated.
+
+    Parameters
+    ----------
+    H: array, (m, n)
+    L: array, (m, m)
+    rows: array, (k, n + l), optional
+        Rows appended after `columns`
+    columns: array, (m, l), optional
+        Columns appended to `M`
+    pivot_strategy: str
+        See :func:`hsnf.row_style_hermite_normal_form`
+
+    Returns
+    -------
+    H: array, (m + k, n + l)
+    L: array, (m + k, m + k)
+    stats: dict
+        Same as :func:`warm_smith_normal_form`
+    """
+    N, L0 = np.asarray(H), np.asarray(L)
+    if columns is not None:
+        N = np.concatenate([N, L0 @ columns], axis=1)
+    if rows is not None:
+        N = np.concatenate([N, rows], axis=0)
+        L0 = block_diag(L0, np.eye(np.shape(rows)[0], dtype=int))
+    return _update_row_style_hermite_normal_form(N, L0, pivot_strategy)
+
+
+def _update_smith_normal_form(N, L0, R0, pivot_strategy: str):
+    """
+    Smith normal form of ``N = L0 @ M @ R0`` recorded as logs, and composed with `L0` and `R0`
+    """
+    zmh = ZmoduleHomomorphism.with_standard_basis(N, lazy_transforms=True)
+    D, L_update, R_update = zmh.smith_normal_form(pivot_strategy=pivot_strategy, overwrite=True)
+    rank = int(np.count_nonzero(np.diagonal(D)))
+    stats = {
+        "num_operations": _num_effective_operations(L_update)
+        + _num_effective_operations(R_update),
+        "reused_pivots": _reused_smith_pivots(N, D, rank),
+        "rank": rank,
+    }
+    return D, L_update @ L0, R0 @ R_update, stats
+
+
+def _update_row_style_hermite_normal_form(N, L0, pivot_strategy: str):
+    """
+    Hermite normal form of ``N = L0 @ M`` recorded as a log, and composed with `L0`
+    """
+    zmh = ZmoduleHomomorphism.with_standard_basis(N, lazy_transforms=True)
+    H, L_update = zmh.hermite_normal_form(pivot_strategy=pivot_strategy, overwrite=True)
+    rank = int(np.count_nonzero(np.any(H != 0, axis=1)))
+    stats = {
+        "num_operations": _num_effective_operations(L_update),
+        "reused_pivots": _reused_hermite_pivots(N, H, rank),
+        "rank": rank,
+    }
+    return H, L_update @ L0, stats
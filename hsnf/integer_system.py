@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from functools import reduce
+from math import gcd
+
 import numpy as np
 from scipy.linalg import solve_triangular
 
@@ -8,7 +11,7 @@ from hsnf import (
     row_style_hermite_normal_form,
     smith_normal_form,
 )
-from hsnf.lattice import compute_dual
+from hsnf.howell import solve_howell
 from hsnf.utils import (
     NDArrayInt,
     crt_on_list,
@@ -63,6 +66,95 @@ def solve_integer_linear_system(A: NDArrayInt, b: NDArrayInt):
     return basis, x_special
 
 
+def enumerate_solutions_in_box(
+    basis: NDArrayInt,
+    x_special: NDArrayInt,
+    lower: NDArrayInt,
+    upper: NDArrayInt,
+    chunk_size: int = 1024,
+):
+    r"""
+    Enumerate integer solutions :math:`\mathbf{x}_{\mathrm{special}} + \sum_{i} a_{i} \cdot \mathrm{basis[i]}`
+    with :math:`\mathrm{lower} \leq \mathbf{x} \leq \mathrm{upper}`, such as those from :func:`solve_integer_linear_system`.
+
+    The basis is brought to row-style Hermite normal form, so that the i-th pivot coordinate depends only on
+    :math:`a_{0}, \dots, a_{i}`. Exact ranges of coefficients are computed level by level for chunks of partial solutions,
+    and partial solutions are discarded as soon as their determined coordinates leave the box.
+
+    Parameters
+    ----------
+    basis: array, (k, n)
+    x_special: array, (n, )
+    lower: int or array, (n, )
+        Inclusive lower bounds
+    upper: int or array, (n, )
+        Inclusive upper bounds
+    chunk_size: int
+        Maximum number of solutions in a chunk
+
+    Yields
+    ------
+    solutions: array, (chunk, n)
+        Solutions in lexicographic order of coefficients for the Hermite normal form of `basis`
+    """
+    x0 = np.around(np.asarray(x_special)).astype(int)
+    n = x0.shape[0]
+    lower = np.broadcast_to(np.asarray(lower, dtype=int), (n,))
+    upper = np.broadcast_to(np.asarray(upper, dtype=int), (n,))
+
+    basis = np.asarray(basis, dtype=int).reshape(-1, n)
+    if basis.shape[0] > 0:
+        H, _ = row_style_hermite_normal_form(basis)
+        H = H[np.any(H != 0, axis=1)]
+    else:
+        H = basis
+    k = H.shape[0]
+    pivots = np.argmax(H != 0, axis=1)
+    # Coordinates in [pivots[i], ends[i]) are determined by a_0, ..., a_i
+    ends = np.append(pivots[1:], n)
+
+    def inside(X, start, end):
+        return np.all(
+            (lower[start:end] <= X[:, start:end]) & (X[:, start:end] <= upper[start:end]), axis=1
+        )
+
+    def expand(X, level):
+        if level == k:
+            yield X
+            return
+        p = pivots[level]
+        d = H[level, p]
+        c_lo = -((X[:, p] - lower[p]) // d)  # ceil((lower - x) / d)
+        c_hi = (upper[p] - X[:, p]) // d
+        counts = np.maximum(c_hi - c_lo + 1, 0)
+        offsets = np.cumsum(counts)
+        total = int(offsets[-1]) if len(offsets) > 0 else 0
+        # Children are generated in windows to keep memory bounded by chunk_size
+        for start in range(0, total, chunk_size):
+            index = np.arange(start, min(start + chunk_size, total))
+            parent = np.searchsorted(offsets, index, side="right")
+            coeffs = c_lo[parent] + index - (offsets[parent] - counts[parent])
+            children = X[parent] + coeffs[:, None] * H[level][None, :]
+            children = children[inside(children, p, ends[level])]
+            if len(children) > 0:
+                yield from expand(children, level + 1)
+
+    first = pivots[0] if k > 0 else n
+    if not inside(x0[None, :], 0, first)[0]:
+        return
+
+    buffer, buffered = [], 0
+    for X in expand(x0[None, :], 0):
+        buffer.append(X)
+        buffered += len(X)
+        while buffered >= chunk_size:
+            merged = np.concatenate(buffer, axis=0)
+            yield merged[:chunk_size]
+            buffer, buffered = [merged[chunk_size:]], len(merged) - chunk_size
+    if buffered > 0:
+        yield np.concatenate(buffer, axis=0)
+
+
 def solve_frobenius_congruent(
     A: NDArrayInt, b: NDArrayInt | None = None, denominator: int = 1000000
 ):
@@ -100,36 +192,117 @@ def solve_frobenius_congruent(
     x_special: array, (n, )
         (Return if `b` is specified) Special solution :math:`\mathbf{x}_{\mathrm{special}}`
     """
-    D, P, Q = smith_normal_form(A)
-    rank = get_triangular_rank(D)
+    solver = FrobeniusSolver(A)
+    if b is None:
+        return solver.basis_Z, solver.basis_R
 
-    D_pinv = np.zeros((Q.shape[1], rank))
-    D_pinv[np.diag_indices(rank)] = 1 / D.diagonal()[:rank]
-    # basis_Z[i, :] is the i-th general Z-solution of x
-    basis_Z = np.dot(Q, D_pinv).T
+    numerators = np.around(np.asarray(b) * denominator).astype(int)
+    x_numerators, x_denominator, solvable = solver.solve(numerators, denominator)
+    if not solvable:
+        return solver.basis_Z, solver.basis_R, None
+    return solver.basis_Z, solver.basis_R, x_numerators / x_denominator
 
-    if rank < Q.shape[1]:
-        y_R = np.zeros((Q.shape[1], Q.shape[1] - rank))
-        for i in range(Q.shape[1] - rank):
-            y_R[rank + i, i] = 1
-        basis_R = np.dot(Q, y_R).T
-    else:
-        basis_R = None
 
-    if b is None:
-        return basis_Z, basis_R
-    else:
-        v = remainder1_with_denominator(np.dot(P, b), denominator)  # for avoiding numerical error
-        if np.count_nonzero(v[rank:]) != 0:
-            return basis_Z, basis_R, None
+class FrobeniusSolver:
+    r"""
+    Prepared solver of Frobenius congruent :math:`\mathbf{Ax} \equiv \mathbf{b} \, (\mathrm{mod}\, \mathbb{R}/\mathbb{Z})` for many offsets.
 
-        y_special = np.zeros(A.shape[1])
-        y_special[:rank] = v[:rank] / D.diagonal()[:rank]
-        x_special = np.dot(Q, y_special)
-        return basis_Z, basis_R, x_special
+    Smith normal form :math:`\mathbf{D} = \mathbf{PAQ}` is computed once,
+    and rational offsets given as integer numerators over a common denominator are solved exactly in integers.
 
+    Parameters
+    ----------
+    A: array, (m, n)
+        Integer coefficient matrix
+
+    Attributes
+    ----------
+    basis_Z: array, (rank, n)
+        ``basis_Z[i, :]`` is a solution of :math:`\mathbf{Ax} \equiv \mathbf{0} \, (\mathrm{mod} \, \mathbb{Z})`
+    basis_R: array, (n - rank, n) or None
+        ``basis_R[i, :]`` is a solution of :math:`\mathbf{Ax} \equiv \mathbf{0} \, (\mathrm{mod}\, \mathbb{R}/\mathbb{Z})`
+    """
 
-def solve_modular_integer_linear_system(A: NDArrayInt, b: NDArrayInt, q: int):
+    def __init__(self, A: NDArrayInt):
+        D, P, Q = smith_normal_form(A)
+        self._rank = get_triangular_rank(D)
+        self._diagonal = D.diagonal()[: self._rank]
+        self._P = P
+        self._Q = Q
+        # Maximum absolute row sums to bound entries of products a priori
+        self._P_bound = int(np.max(np.sum(np.abs(P).astype(object), axis=1), initial=0))
+        self._Q_bound = int(
+            np.max(np.sum(np.abs(Q[:, : self._rank]).astype(object), axis=1), initial=0)
+        )
+
+        # basis_Z[i, :] is the i-th general Z-solution of x
+        self.basis_Z = (Q[:, : self._rank] / self._diagonal[None, :]).T
+        self.basis_R: np.ndarray | None
+        if self._rank < Q.shape[1]:
+            self.basis_R = Q[:, self._rank :].T.astype(float)
+        else:
+            self.basis_R = None
+
+    @property
+    def rank(self) -> int:
+        return self._rank
+
+    def solve(self, numerators: NDArrayInt, denominator: int = 1):
+        r"""
+        Solve :math:`\mathbf{Ax} \equiv \mathbf{b} \, (\mathrm{mod}\, \mathbb{R}/\mathbb{Z})` for ``b = numerators / denominator``.
+
+        Parameters
+        ----------
+        numerators: array, (k, m) or (m, )
+            Integer numerators of offsets
+        denominator: int
+            Common positive denominator of offsets
+
+        Returns
+        -------
+        x_numerators: array, (k, n) or (n, )
+            Integer numerators of special solutions. Rows without solution are filled with zeros.
+            Computed in object dtype of Python integers if intermediate entries may exceed int64.
+        x_denominator: int
+            Common denominator of special solutions
+        solvable: array of bool, (k, ) or scalar
+            ``solvable[i]`` is true if and only if the i-th offsets have solutions
+        """
+        if denominator <= 0:
+            raise ValueError("denominator should be positive.")
+        numerators = np.asarray(numerators, dtype=int)
+        single = numerators.ndim == 1
+        numerators = np.atleast_2d(numerators)
+
+        # y[i] = v[i] / (denominator * d[i]) and d[rank - 1] is a multiple of all d[i]
+        lcm = int(self._diagonal[-1]) if self._rank > 0 else 1
+        max_numerator = int(np.max(np.abs(numerators), initial=0))
+        bound = max(max_numerator * self._P_bound, (denominator - 1) * lcm * self._Q_bound)
+        dtype = int if bound <= np.iinfo(np.int64).max else object
+
+        # D y = P b (mod Z) with y = Q^-1 x
+        v = np.mod(numerators.astype(dtype) @ self._P.T.astype(dtype), denominator)
+        solvable = ~np.any(v[:, self._rank :] != 0, axis=1)
+
+        y_numerators = np.zeros((numerators.shape[0], self._Q.shape[0]), dtype=dtype)
+        scale = (lcm // self._diagonal).astype(dtype)
+        y_numerators[:, : self._rank] = v[:, : self._rank] * scale[None, :]
+        y_numerators[~solvable] = 0
+        x_numerators = y_numerators @ self._Q.T.astype(dtype)
+        x_denominator = denominator * lcm
+
+        g = reduce(gcd, np.unique(np.abs(x_numerators)).tolist(), x_denominator)
+        x_numerators //= g
+        x_denominator //= g
+
+        if single:
+            return x_numerators[0], x_denominator, bool(solvable[0])
+        return x_numerators, x_denominator, solvable
+
+
+def solve_modular_integer_linear_system(
+    A: NDArrayInt, b: NDArrayInt, q: int, algorithm: str = "smith"
+):
     r"""
     For given :math:`\mathbf{A} \in \mathbb{Z}^{m \times n}` and :math:`\mathbf{b} \in \mathbb{Z}^{m}`, solve modular integer linear system :math:`\mathbf{Ax} \equiv \mathbf{b} \, (\mathrm{mod} \, q)` in :math:`\mathbf{x} \in \mathbb{Z}^{n}`.
     General solutions are written as
@@ -151,6 +324,10 @@ def solve_modular_integer_linear_system(A: NDArrayInt, b: NDArrayInt, q: int):
         Integer offsets
     q: int
         Modulo
+    algorithm: str
+        - ``"smith"``: lift the system to integers, calculate its Smith normal form, and combine solutions modulo prime powers of `q`
+        - ``"howell"``: eliminate modulo `q` with Howell form, see :func:`hsnf.howell.howell_form`.
+          Entries never exceed `q` and stay within int64 if `q` is at most 2^31.
 
     Returns
     -------
@@ -159,6 +336,14 @@ def solve_modular_integer_linear_system(A: NDArrayInt, b: NDArrayInt, q: int):
     x_special: array, (n, )
         Special solution :math:`\mathbf{x}_{\mathrm{special}}`
     """
+    if algorithm == "howell":
+        basis, x_special = solve_howell(A, b, q)
+        if x_special is None:
+            return None
+        return basis, x_special
+    elif algorithm != "smith":
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
     D, L, R = smith_normal_form(A)
     rank = get_triangular_rank(D)
     Lb = np.dot(L, b)
@@ -169,38 +354,27 @@ def solve_modular_integer_linear_system(A: NDArrayInt, b: NDArrayInt, q: int):
     assert np.allclose(np.mod(np.dot(A, x_special) - b, q), 0)
 
     # General solution of Ax=0 (mod q)
-    basis = _solve_modular_integer_linear_system_general(A, q)
+    basis = _solve_modular_integer_linear_system_general(D, R, q, rank)
     assert np.allclose(np.mod(np.dot(basis, A.T), q), 0)
 
     return basis, x_special
 
 
-def _solve_modular_integer_linear_system_general(A: NDArrayInt, q: int):
+def _solve_modular_integer_linear_system_general(D: NDArrayInt, R: NDArrayInt, q: int, rank: int):
     """
-    Calculate general solutions of Ax=0 (mod q)
+    Calculate general solutions of Ax=0 (mod q) from Smith normal form D = LAR
 
     Implementation Note
     -------------------
-    A: (m, n)
-
-    Consider q-ary lattices
-        Lambda_{q}^T := { x | Ax=0 (mod q) }
-        Lambda_{q}   := { x | x = A^T s (mod q) for some s }
-    They are dual each other:
-        Lambda_{q}^T = q * dual(Lambda_{q}).
-    A base of Lambda_{q} can be taken as A[i, :] (i=1...m) and q I[j, :] (j=1...n)
-
-    Ref: https://cseweb.ucsd.edu/classes/wi12/cse206A-a/lec4.pdf
+    Since L is invertible modulo q, Ax=0 (mod q) is equivalent to Dy=0 (mod q) with x = Ry.
+    The i-th equation d_i y_i = 0 (mod q) holds iff y_i is a multiple of q / gcd(d_i, q),
+    and y_i is free for i >= rank. Thus columns of R scaled by these factors generate solutions.
     """
-    redundant_compliment = np.concatenate([A, q * np.eye(A.shape[1]).astype(int)], axis=0)
-
-    # Choose independent vectors by HNF
-    compliment, _ = row_style_hermite_normal_form(redundant_compliment)
-    rank = get_triangular_rank(compliment)
-    compliment = compliment[:rank, :]
-
-    basis = q * compute_dual(compliment, row_wise=True)
-    basis = np.mod(np.around(basis).astype(int), q)
+    n = R.shape[1]
+    scales = np.ones(n, dtype=int)
+    for i in range(rank):
+        scales[i] = q // gcd(int(D[i, i]), q)
+    basis = np.mod(R * scales[None, :], q).T
 
     # Remove zero vectors
     used = np.count_nonzero(basis, axis=1) > 0
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import os
+from functools import partial
+from typing import Callable, Union
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from hsnf.batch import (
+    batch_column_style_hermite_normal_form,
+    batch_row_style_hermite_normal_form,
+    batch_smith_normal_form,
+    pack_diagonal,
+    pack_triangle,
+)
+
+PathLike = Union[str, os.PathLike]
+
+_INTEGER_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def _log2_hadamard_bound(X, chunk_size: int) -> float:
+    """
+    Upper bound of log2 of absolute values of all minors of matrices in stack `X`, read chunk by chunk
+    """
+    bits = 0.0
+    for start in range(0, X.shape[0], chunk_size):
+        A = np.asarray(X[start : start + chunk_size], dtype=float)
+        if A.size == 0:
+            continue
+        # Both products of row norms and of column norms bound minors
+        rows = np.sum(np.log2(np.maximum(np.linalg.norm(A, axis=2), 1.0)), axis=1)
+        cols = np.sum(np.log2(np.maximum(np.linalg.norm(A, axis=1), 1.0)), axis=1)
+        bits = max(bits, float(np.max(np.minimum(rows, cols))))
+    return bits
+
+
+def _fits(log2_bound: float | None, dtype) -> bool:
+    # Margin for rounding errors of floating-point norms
+    return log2_bound is not None and log2_bound + 1e-6 < np.log2(float(np.iinfo(dtype).max))
+
+
+def _dtype_for_bound(log2_bound: float | None):
+    for dtype in _INTEGER_DTYPES:
+        if _fits(log2_bound, dtype):
+            return dtype
+    return np.int64
+
+
+def _decompose_npy(
+    func: Callable,
+    input_path: PathLike,
+    output_paths: list[PathLike | None],
+    output_shapes: Callable[[int, int], list[tuple[int, ...]]],
+    output_bounds: Callable[[float, int, int], list[float | None]],
+    chunk_size: int,
+    dtype=int,
+    packers: list[Callable | None] | None = None,
+):
+    """
+    Decompose a stack of matrices in `input_path` chunk by chunk and write results to memory-mapped `output_paths`.
+
+    `output_bounds` returns log2 of a priori bounds of entries of outputs from the Hadamard bound of inputs,
+    or None if unknown. They choose dtypes if ``dtype="auto"``, and skip checks of outputs which always fit.
+    Other outputs are checked before each chunk is written, and all outputs are removed if one does not fit.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size should be positive.")
+
+    X = np.load(input_path, mmap_mode="r")
+    if X.ndim != 3:
+        raise ValueError("Input array should have shape (k, m, n).")
+    num_batch, m, n = X.shape
+
+    # Decide dtypes before allocating any output
+    bounds = output_bounds(_log2_hadamard_bound(X, chunk_size), m, n)
+    if isinstance(dtype, str) and dtype == "auto":
+        dtypes = [_dtype_for_bound(bound) for bound in bounds]
+    else:
+        dtypes = [np.dtype(dtype).type] * len(bounds)
+    # Results are computed in int64, so only narrower dtypes without bounds are checked
+    checked = [
+        not _fits(bound, dt) and np.iinfo(dt).bits < 64 for bound, dt in zip(bounds, dtypes)
+    ]
+
+    outputs: list[np.memmap | None] = []
+    created: list[PathLike] = []
+    try:
+        for path, shape, dt in zip(output_paths, output_shapes(m, n), dtypes):
+            if path is None:
+                outputs.append(None)
+            else:
+                outputs.append(open_memmap(path, mode="w+", dtype=dt, shape=(num_batch,) + shape))
+                created.append(path)
+
+        for start in range(0, num_batch, chunk_size):
+            stop = min(start + chunk_size, num_batch)
+            results = func(np.asarray(X[start:stop]))
+            if packers is not None:
+                results = [
+                    res if pack is None else pack(res) for pack, res in zip(packers, results)
+                ]
+            for out, res, dt, check in zip(outputs, results, dtypes, checked):
+                if out is None or not check or res.size == 0:
+                    continue
+                info = np.iinfo(dt)
+                if res.min() < info.min or res.max() > info.max:
+                    raise OverflowError(
+                        f"Results of matrices {start}-{stop - 1} do not fit in {np.dtype(dt)}."
+                    )
+            for out, res in zip(outputs, results):
+                if out is not None:
+                    out[start:stop] = res
+
+        for out in outputs:
+            if out is not None:
+                out.flush()
+    except BaseException:
+        # Do not leave partially written outputs
+        outputs.clear()
+        for path in created:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+
+def _log2_hermite_bound(bits: float, m: int, n: int) -> float:
+    """
+    log2 of a bound of entries of Hermite normal forms.
+    Pivots and entries in their columns are below a minor, and other entries are sums of
+    at most min(m, n) products of such entries and ratios of minors by Cramer's rule.
+    """
+    return np.log2(max(min(m, n), 1)) + 2 * bits
+
+
+def smith_normal_form_npy(
+    input_path: PathLike,
+    D_path: PathLike | None,
+    L_path: PathLike | None = None,
+    R_path: PathLike | None = None,
+    chunk_size: int = 65536,
+    dtype=int,
+    packed: bool = False,
+):
+    """
+    Calculate Smith normal forms of matrices stored in a .npy file with shape (k, m, n).
+
+    The input is read with ``np.load(mmap_mode="r")`` and decomposed by :func:`hsnf.batch.batch_smith_normal_form` chunk by chunk.
+    Results are written into preallocated memory-mapped .npy files,
+    so peak memory is bounded by `chunk_size` regardless of k.
+
+    Parameters
+    ----------
+    input_path:
+        Path to .npy file of integer array with shape (k, m, n)
+    D_path:
+        Output path of Smith normal forms with shape (k, m, n). Skipped if None.
+    L_path:
+        Output path of unimodular matrices with shape (k, m, m). Skipped if None.
+    R_path:
+        Output path of unimodular matrices with shape (k, n, n). Skipped if None.
+    chunk_size: int
+        Number of matrices decomposed at once
+    dtype:
+        Integer dtype of outputs, such as ``np.int8`` for small matrices.
+        If ``"auto"``, normal forms take the smallest dtype holding Hadamard's bound of inputs,
+        computed before any output is allocated, and transformations take int64.
+        Otherwise, outputs not guaranteed to fit by the bound are checked before each chunk is written,
+        and OverflowError is raised after removing all outputs if an entry does not fit.
+    packed: bool
+        If true, write only diagonals of Smith normal forms with shape (k, min(m, n)),
+        see :func:`hsnf.batch.pack_diagonal`
+    """
+    _decompose_npy(
+        batch_smith_normal_form,
+        input_path,
+        [D_path, L_path, R_path],
+        lambda m, n: [(min(m, n),) if packed else (m, n), (m, m), (n, n)],
+        # Each invariant factor divides a nonzero minor
+        lambda bits, m, n: [bits, None, None],
+        chunk_size,
+        dtype=dtype,
+        packers=[pack_diagonal, None, None] if packed else None,
+    )
+
+
+def row_style_hermite_normal_form_npy(
+    input_path: PathLike,
+    H_path: PathLike | None,
+    L_path: PathLike | None = None,
+    chunk_size: int = 65536,
+    dtype=int,
+    packed: bool = False,
+):
+    """
+    Calculate row-style Hermite normal forms of matrices stored in a .npy file with shape (k, m, n).
+    See :func:`smith_normal_form_npy` for streaming.
+
+    Parameters
+    ----------
+    input_path:
+        Path to .npy file of integer array with shape (k, m, n)
+    H_path:
+        Output path of Hermite normal forms with shape (k, m, n). Skipped if None.
+    L_path:
+        Output path of unimodular matrices with shape (k, m, m). Skipped if None.
+    chunk_size: int
+        Number of matrices decomposed at once
+    dtype:
+        Integer dtype of outputs, see :func:`smith_normal_form_npy`
+    packed: bool
+        If true, write only upper triangles of Hermite normal forms, see :func:`hsnf.batch.pack_triangle`
+    """
+    _decompose_npy(
+        batch_row_style_hermite_normal_form,
+        input_path,
+        [H_path, L_path],
+        lambda m, n: [(len(np.triu_indices(m, 0, n)[0]),) if packed else (m, n), (m, m)],
+        lambda bits, m, n: [_log2_hermite_bound(bits, m, n), None],
+        chunk_size,
+        dtype=dtype,
+        packers=[pack_triangle, None] if packed else None,
+    )
+
+
+def column_style_hermite_normal_form_npy(
+    input_path: PathLike,
+    H_path: PathLike | None,
+    R_path: PathLike | None = None,
+    chunk_size: int = 65536,
+    dtype=int,
+    packed: bool = False,
+):
+    """
+    Calculate column-style Hermite normal forms of matrices stored in a .npy file with shape (k, m, n).
+    See :func:`smith_normal_form_npy` for streaming.
+
+    Parameters
+    ----------
+    input_path:
+        Path to .npy file of integer array with shape (k, m, n)
+    H_path:
+        Output path of Hermite normal forms with shape (k, m, n). Skipped if None.
+    R_path:
+        Output path of unimodular matrices with shape (k, n, n). Skipped if None.
+    chunk_size: int
+        Number of matrices decomposed at once
+    dtype:
+        Integer dtype of outputs, see :func:`smith_normal_form_npy`
+    packed: bool
+        If true, write only lower triangles of Hermite normal forms,
+        see :func:`hsnf.batch.pack_triangle` with ``lower=True``
+    """
+    _decompose_npy(
+        batch_column_style_hermite_normal_form,
+        input_path,
+        [H_path, R_path],
+        lambda m, n: [(len(np.tril_indices(m, 0, n)[0]),) if packed else (m, n), (n, n)],
+        lambda bits, m, n: [_log2_hermite_bound(bits, m, n), None],
+        chunk_size,
+        dtype=dtype,
+        packers=[partial(pack_triangle, lower=True), None] if packed else None,
+    )
@@ -1,9 +1,14 @@
+from __future__ import annotations
+
+from functools import reduce
 from math import gcd
 
 import numpy as np
 
-from hsnf import row_style_hermite_normal_form
-from hsnf.utils import NDArrayInt, get_triangular_rank
+from hsnf import row_style_hermite_normal_form, smith_normal_form
+from hsnf.fraction_free import integer_adjugate, integer_determinant
+from hsnf.lll import lll_reduction
+from hsnf.utils import NDArrayInt, get_triangular_rank, parallel_map
 
 
 def to_row_wise(lattice, row_wise: bool):
@@ -42,7 +47,22 @@ def equivalent(lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: bool = True
     return np.allclose(H1, H2)
 
 
-def compute_union(lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: bool = True):
+def _reduce_basis(basis: NDArrayInt, row_wise: bool):
+    """
+    Return LLL-reduced basis, its Gram matrix, and inverse of the change of basis
+    """
+    reduced, U = lll_reduction(basis)
+    # HNF of unimodular U is the identity, so its transformation is the exact inverse of U
+    _, V = row_style_hermite_normal_form(U)
+    gram = reduced @ reduced.T
+    if not row_wise:
+        return reduced.T, gram, V.T
+    return reduced, gram, V
+
+
+def compute_union(
+    lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: bool = True, reduced: bool = False
+):
     r"""
     Return the smallest lattice containing both lattice1 and lattice2
 
@@ -58,6 +78,15 @@ def compute_union(lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: bool = T
         Otherwise ``lattice2[:, i]`` is.
     row_wise:
         If true, basis vectors are aligned in row wise, otherwise in column wise.
+    reduced: bool
+        If true, also LLL-reduce the returned basis, see Returns.
+
+    Returns
+    -------
+    basis: array, (rank, n)
+        If ``reduced=True``, returns a tuple ``(basis, gram, V)`` instead, where `basis` is LLL-reduced,
+        ``gram = basis @ basis.T`` is its Gram matrix, and unimodular `V` gives back the Hermite normal form
+        by ``V @ basis`` (``basis @ V`` if ``row_wise=False``).
     """
     l1 = to_row_wise(lattice1, row_wise)
     l2 = to_row_wise(lattice2, row_wise)
@@ -67,13 +96,15 @@ def compute_union(lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: bool = T
 
     union = H[:rank, :]
 
+    if reduced:
+        return _reduce_basis(union, row_wise)
     if not row_wise:
         union = union.T
 
     return union
 
 
-def compute_dual(lattice, row_wise: bool = True):
+def compute_dual(lattice, row_wise: bool = True, reduced: bool = False):
     r"""
     Return basis of a dual lattice.
 
@@ -89,15 +120,31 @@ def compute_dual(lattice, row_wise: bool = True):
         Otherwise ``lattice[:, i]`` is.
     row_wise:
         If true, basis vectors are aligned in row wise, otherwise in column wise.
+    reduced: bool
+        If true, returns a tuple ``(basis, gram, V)`` of the dual lattice as :func:`compute_union`,
+        where ``V @ basis`` (``basis @ V`` if ``row_wise=False``) is the dual basis returned without reduction.
+        The dual basis is computed exactly as ``adj(G) @ lattice / det(G)`` with Gram matrix `G` of `lattice`,
+        and its integer numerators are reduced.
     """
     lat = to_row_wise(lattice, row_wise)
+    if reduced:
+        lat_int = np.array(lat, dtype=object)
+        adj, det = integer_adjugate(lat_int @ lat_int.T)
+        numerators = adj @ lat_int
+        g = reduce(gcd, numerators.ravel().tolist(), det)
+        basis, gram, V = _reduce_basis(numerators // g, row_wise)
+        denom = det // g
+        return basis / denom, gram / denom**2, V
+
     d = np.linalg.inv(lat @ lat.T) @ lat
     if not row_wise:
         d = d.T
     return d
 
 
-def compute_intersection(lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: bool = True):
+def compute_intersection(
+    lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: bool = True, reduced: bool = False
+):
     """
     Return intersection lattice of lattice1 and lattice2.
 
@@ -117,12 +164,19 @@ def compute_intersection(lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: b
         Otherwise ``lattice2[:, i]`` is.
     row_wise:
         If true, basis vectors are aligned in row wise, otherwise in column wise.
+    reduced: bool
+        If true, returns a tuple ``(basis, gram, V)`` as :func:`compute_union`,
+        where ``V @ basis`` (``basis @ V`` if ``row_wise=False``) is the Hermite normal form of the intersection.
+        It is computed exactly from the integer kernel as :func:`compute_intersection_all`.
     """
     l1 = to_row_wise(lattice1, row_wise)
     l2 = to_row_wise(lattice2, row_wise)
+    if reduced:
+        bases = (_hnf_basis(np.array(l1, dtype=int)), _hnf_basis(np.array(l2, dtype=int)))
+        return _reduce_basis(_intersect_pair(bases), row_wise)
 
-    denom1 = int(np.around(np.linalg.det(l1))) ** 2
-    denom2 = int(np.around(np.linalg.det(l2))) ** 2
+    denom1 = integer_determinant(l1) ** 2
+    denom2 = integer_determinant(l2) ** 2
     denom = denom1 * denom2 // gcd(denom1, denom2)
 
     # dual(intersection(l1, l2)) = union(dual(l1), dual(l2))
@@ -135,3 +189,414 @@ def compute_intersection(lattice1: NDArrayInt, lattice2: NDArrayInt, row_wise: b
         ret = ret.T
 
     return ret
+
+
+def _hnf_basis(generators: NDArrayInt) -> NDArrayInt:
+    """
+    Return nonzero rows of the row-style Hermite normal form of generators
+    """
+    if generators.shape[0] == 0:
+        return generators
+    H, _ = row_style_hermite_normal_form(generators)
+    return H[np.any(H != 0, axis=1)]
+
+
+def _union_pair(pair: tuple[NDArrayInt, NDArrayInt]) -> NDArrayInt:
+    return _hnf_basis(np.concatenate(pair, axis=0))
+
+
+def _intersect_pair(pair: tuple[NDArrayInt, NDArrayInt]) -> NDArrayInt:
+    """
+    Intersection of lattices with bases ``A[i, :]`` and ``B[j, :]`` from the left kernel of ``[A; -B]``
+    """
+    A, B = pair
+    # x = u @ A = v @ B if and only if [u, v] @ [A; -B] = 0
+    H, L = row_style_hermite_normal_form(np.concatenate([A, -B], axis=0))
+    rank = np.count_nonzero(np.any(H != 0, axis=1))
+    return _hnf_basis(L[rank:, : A.shape[0]] @ A)
+
+
+def _reduce_tree(func, lattices: list, row_wise: bool, max_workers: int) -> NDArrayInt:
+    """
+    Merge lattices by `func` in a balanced binary tree, keeping intermediates in Hermite normal form
+    """
+    if len(lattices) == 0:
+        raise ValueError("At least one lattice is required.")
+    generators = [to_row_wise(np.array(lattice, dtype=int), row_wise) for lattice in lattices]
+    bases = parallel_map(_hnf_basis, generators, max_workers)
+    while len(bases) > 1:
+        # Pairs in the same level are independent
+        merged = parallel_map(func, list(zip(bases[0::2], bases[1::2])), max_workers)
+        if len(bases) % 2 == 1:
+            merged.append(bases[-1])
+        bases = merged
+
+    ret = bases[0]
+    if not row_wise:
+        ret = ret.T
+    return ret
+
+
+def compute_union_all(
+    lattices: list[NDArrayInt], row_wise: bool = True, max_workers: int = 1
+) -> NDArrayInt:
+    """
+    Return the smallest lattice containing all of `lattices`.
+
+    Lattices are merged pairwise in a balanced binary tree, so that each of intermediate bases is
+    a Hermite normal form of at most twice its rank rows.
+
+    Parameters
+    ----------
+    lattices: list of array, (k_i, n)
+        If ``row_wise=True``, ``lattices[l][i, :]`` is the i-th basis vector of the l-th lattice.
+        Otherwise ``lattices[l][:, i]`` is.
+    row_wise:
+        If true, basis vectors are aligned in row wise, otherwise in column wise.
+    max_workers: int
+        Number of processes to merge pairs in the same level of the tree
+
+    Returns
+    -------
+    union: array, (rank, n)
+        Nonzero rows of the row-style Hermite normal form (transposed if ``row_wise=False``)
+    """
+    return _reduce_tree(_union_pair, lattices, row_wise, max_workers)
+
+
+def compute_intersection_all(
+    lattices: list[NDArrayInt], row_wise: bool = True, max_workers: int = 1
+) -> NDArrayInt:
+    """
+    Return intersection lattice of all of `lattices`.
+
+    Lattices are intersected pairwise in a balanced binary tree.
+    Unlike :func:`compute_intersection`, each pair is intersected exactly from the integer kernel of
+    the stacked bases, so no denominators accumulate and lattices need not be full rank.
+
+    Parameters
+    ----------
+    lattices: list of array, (k_i, n)
+        If ``row_wise=True``, ``lattices[l][i, :]`` is the i-th basis vector of the l-th lattice.
+        Otherwise ``lattices[l][:, i]`` is.
+    row_wise:
+        If true, basis vectors are aligned in row wise, otherwise in column wise.
+    max_workers: int
+        Number of processes to intersect pairs in the same level of the tree
+
+    Returns
+    -------
+    intersection: array, (rank, n)
+        Nonzero rows of the row-style Hermite normal form (transposed if ``row_wise=False``)
+    """
+    return _reduce_tree(_intersect_pair, lattices, row_wise, max_workers)
+
+
+class Lattice:
+    """
+    Integer lattice with its Hermite normal form computed once.
+
+    Parameters
+    ----------
+    basis: array, (k, n)
+        If ``row_wise=True``, ``basis[i, :]`` is the i-th generator of the lattice.
+        Otherwise ``basis[:, i]`` is. Generators may be linearly dependent.
+    row_wise:
+        If true, generators are aligned in row wise, otherwise in column wise.
+
+    Attributes
+    ----------
+    hnf: array, (rank, n)
+        Nonzero rows of the row-style Hermite normal form of generators, which form a basis of the lattice
+    pivots: array, (rank, )
+        ``pivots[i]`` is the column index of the leading entry of ``hnf[i, :]``
+    """
+
+    def __init__(self, basis: NDArrayInt, row_wise: bool = True):
+        generators = to_row_wise(np.array(basis, dtype=int), row_wise)
+        H, _ = row_style_hermite_normal_form(generators)
+        nonzero = np.any(H != 0, axis=1)
+        self._hnf = H[nonzero]
+        self._pivots = np.argmax(self._hnf != 0, axis=1)
+
+    @property
+    def hnf(self) -> NDArrayInt:
+        return self._hnf
+
+    @property
+    def pivots(self) -> NDArrayInt:
+        return self._pivots
+
+    @property
+    def rank(self) -> int:
+        return self._hnf.shape[0]
+
+    @property
+    def dim(self) -> int:
+        """
+        Dimension of the ambient space
+        """
+        return self._hnf.shape[1]
+
+    def contains(self, points: NDArrayInt) -> np.ndarray:
+        """
+        Test if each of points belongs to the lattice.
+
+        Rows of the Hermite normal form are subtracted from all points at once in one pass,
+        and a point belongs to the lattice if and only if nothing remains.
+
+        Parameters
+        ----------
+        points: array, (N, n) or (n, )
+            ``points[i, :]`` is the i-th point
+
+        Returns
+        -------
+        mask: array of bool, (N, ) or scalar
+        """
+        points = np.asarray(points)
+        single = points.ndim == 1
+        residual = np.array(np.atleast_2d(points), dtype=int)
+        if residual.shape[1] != self.dim:
+            raise ValueError(f"Points should have {self.dim} components.")
+
+        for row, pivot in zip(self._hnf, self._pivots):
+            residual -= (residual[:, pivot] // row[pivot])[:, None] * row[None, :]
+        mask = ~np.any(residual != 0, axis=1)
+
+        if single:
+            return mask[0]
+        return mask
+
+    def reduce(
+        self,
+        points: NDArrayInt,
+        return_index: bool = False,
+        chunk_size: int | None = None,
+        out: NDArrayInt | None = None,
+        index_out: NDArrayInt | None = None,
+    ):
+        r"""
+        Reduce points modulo the lattice to canonical representatives.
+        The lattice should be full rank.
+
+        Let the diagonal of the Hermite normal form be :math:`(h_{0}, \dots, h_{n-1})`.
+        A representative :math:`\mathbf{x}` satisfies :math:`0 \leq x_{j} < h_{j}`, and is unique in each coset of :math:`\mathbb{Z}^{n}/L`.
+        The coset index is the mixed-radix number :math:`\sum_{j} x_{j} \prod_{k > j} h_{k}` in :math:`[0, \det L)`.
+
+        Parameters
+        ----------
+        points: array, (N, n)
+            ``points[i, :]`` is the i-th point. Memory-mapped arrays are read chunk by chunk.
+        return_index:
+            If true, also return coset indices
+        chunk_size:
+            Number of points reduced at once. If None, all points are reduced at once.
+        out: array, (N, n), optional
+            Output array of representatives, which may be the same as `points`
+        index_out: array, (N, ), optional
+            Output array of coset indices
+
+        Returns
+        -------
+        reps: array, (N, n)
+            ``reps[i, :]`` is the representative of ``points[i, :]``
+        index: array, (N, ), only if ``return_index=True``
+            ``index[i]`` is the coset index of ``points[i, :]``
+        """
+        if self.rank != self.dim:
+            raise ValueError("Lattice should be full rank.")
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] != self.dim:
+            raise ValueError(f"Points should have shape (N, {self.dim}).")
+        num_points = points.shape[0]
+        if out is None:
+            out = np.empty((num_points, self.dim), dtype=int)
+        if not return_index:
+            index_out = None
+        elif index_out is None:
+            index_out = np.empty(num_points, dtype=int)
+        if chunk_size is None:
+            chunk_size = max(num_points, 1)
+        if chunk_size <= 0:
+            raise ValueError("chunk_size should be positive.")
+
+        diagonal = np.diagonal(self._hnf)
+        for start in range(0, num_points, chunk_size):
+            stop = min(start + chunk_size, num_points)
+            reps = np.array(points[start:stop], dtype=int)
+            # The i-th row of HNF only changes the j-th components with j >= i
+            for i, row in enumerate(self._hnf):
+                reps -= (reps[:, i] // diagonal[i])[:, None] * row[None, :]
+            out[start:stop] = reps
+
+            if index_out is not None:
+                index = np.zeros(stop - start, dtype=int)
+                for j in range(self.dim):
+                    index = index * diagonal[j] + reps[:, j]
+                index_out[start:stop] = index
+
+        if index_out is not None:
+            return out, index_out
+        return out
+
+    def __contains__(self, point) -> bool:
+        return bool(self.contains(np.asarray(point).reshape(-1)))
+
+    def __repr__(self) -> str:
+        return f"Lattice(rank={self.rank}, dim={self.dim})"
+
+
+def reduce_modulo_lattice(
+    lattice: NDArrayInt,
+    points: NDArrayInt,
+    row_wise: bool = True,
+    return_index: bool = False,
+    chunk_size: int | None = None,
+    out: NDArrayInt | None = None,
+    index_out: NDArrayInt | None = None,
+):
+    """
+    Reduce points modulo a full-rank lattice to canonical representatives in the fundamental domain of its Hermite normal form.
+    See :meth:`Lattice.reduce` for details.
+
+    Parameters
+    ----------
+    lattice: array, (n, n)
+        If ``row_wise=True``, ``lattice[i, :]`` is the i-th basis vector of the lattice.
+        Otherwise ``lattice[:, i]`` is.
+    points: array, (N, n)
+        ``points[i, :]`` is the i-th point
+    row_wise:
+        If true, basis vectors are aligned in row wise, otherwise in column wise.
+    return_index:
+        If true, also return coset indices
+    chunk_size:
+        Number of points reduced at once. If None, all points are reduced at once.
+    out: array, (N, n), optional
+        Output array of representatives
+    index_out: array, (N, ), optional
+        Output array of coset indices
+
+    Returns
+    -------
+    reps: array, (N, n)
+    index: array, (N, ), only if ``return_index=True``
+    """
+    return Lattice(lattice, row_wise=row_wise).reduce(
+        points, return_index=return_index, chunk_size=chunk_size, out=out, index_out=index_out
+    )
+
+
+class QuotientGroup:
+    r"""
+    Finite quotient group :math:`\mathbb{Z}^{n}/L` of a full-rank lattice :math:`L`.
+
+    Let Smith normal form of basis vectors be :math:`\mathbf{D} = \mathbf{PBQ}`.
+    A point :math:`\mathbf{p}` is mapped to :math:`\mathbf{pQ} \, \mathrm{mod} \, (d_{0}, \dots, d_{n-1})`,
+    which gives an isomorphism :math:`\mathbb{Z}^{n}/L \simeq \bigoplus_{i} \mathbb{Z}/d_{i}\mathbb{Z}`.
+    Elements are indexed by mixed-radix numbers over invariant factors larger than one.
+
+    Parameters
+    ----------
+    basis: array, (n, n)
+        If ``row_wise=True``, ``basis[i, :]`` is the i-th basis vector of the lattice.
+        Otherwise ``basis[:, i]`` is.
+    row_wise:
+        If true, basis vectors are aligned in row wise, otherwise in column wise.
+
+    Attributes
+    ----------
+    invariant_factors: array, (k, )
+        Invariant factors larger than one
+    order: int
+        Number of elements, which is equal to :math:`|\det L|`
+    """
+
+    def __init__(self, basis: NDArrayInt, row_wise: bool = True):
+        B = to_row_wise(np.array(basis, dtype=int), row_wise)
+        if B.ndim != 2 or B.shape[0] != B.shape[1]:
+            raise ValueError("Basis should be a square matrix.")
+        D, _, R = smith_normal_form(B)  # D = P @ B @ R
+        diag = np.diagonal(D)
+        if np.any(diag == 0):
+            raise ValueError("Lattice should be full rank.")
+
+        # Inverse of unimodular R from its Hermite normal form: H = R_inv @ R is identity
+        _, R_inv = row_style_hermite_normal_form(R)
+
+        nontrivial = diag > 1
+        self._factors = diag[nontrivial]
+        self._R = R[:, nontrivial]
+        self._R_inv = R_inv[nontrivial, :]
+        self._dim = B.shape[0]
+
+    @property
+    def invariant_factors(self) -> NDArrayInt:
+        return self._factors
+
+    @property
+    def order(self) -> int:
+        return int(np.prod(self._factors))
+
+    def index_of(self, points: NDArrayInt) -> NDArrayInt:
+        """
+        Return indices of cosets containing points.
+
+        Parameters
+        ----------
+        points: array, (N, n)
+            ``points[i, :]`` is the i-th point
+
+        Returns
+        -------
+        indices: array, (N, )
+            ``indices[i]`` is in ``[0, order)``
+        """
+        points = np.asarray(points, dtype=int)
+        if points.ndim != 2 or points.shape[1] != self._dim:
+            raise ValueError(f"Points should have shape (N, {self._dim}).")
+        digits = np.mod(points @ self._R, self._factors[None, :])
+        indices = np.zeros(points.shape[0], dtype=int)
+        for i, factor in enumerate(self._factors):
+            indices = indices * factor + digits[:, i]
+        return indices
+
+    def point_of(self, indices: NDArrayInt) -> NDArrayInt:
+        """
+        Return representative points of cosets with given indices.
+
+        Parameters
+        ----------
+        indices: array, (N, )
+
+        Returns
+        -------
+        points: array, (N, n)
+            ``points[i, :]`` satisfies ``index_of(points)[i] == indices[i]``
+        """
+        indices = np.asarray(indices, dtype=int)
+        if np.any((indices < 0) | (indices >= self.order)):
+            raise ValueError(f"Indices should be in [0, {self.order}).")
+        digits = np.empty((indices.shape[0], len(self._factors)), dtype=int)
+        rest = indices.copy()
+        for i in reversed(range(len(self._factors))):
+            rest, digits[:, i] = np.divmod(rest, self._factors[i])
+        return digits @ self._R_inv
+
+    def representatives(self) -> NDArrayInt:
+        """
+        Return representative points of all cosets
+
+        Returns
+        -------
+        points: array, (order, n)
+            ``points[i, :]`` is the representative of the i-th coset
+        """
+        return self.point_of(np.arange(self.order))
+
+    def __len__(self) -> int:
+        return self.order
+
+    def __repr__(self) -> str:
+        return f"QuotientGroup(invariant_factors={self._factors.tolist()})"
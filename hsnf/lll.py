@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from fractions import Fraction
+
+import numpy as np
+
+from hsnf.utils import NDArrayInt
+
+
+def _to_int_rows(basis) -> list[list[int]]:
+    return [[int(v) for v in row] for row in np.asarray(basis)]
+
+
+def _to_array(rows: list[list[int]], num_column: int) -> NDArrayInt:
+    if len(rows) == 0:
+        return np.zeros((0, num_column), dtype=int)
+    return np.array(rows, dtype=int)
+
+
+def _dot(v1: list[int], v2: list[int]) -> int:
+    return sum(a * b for a, b in zip(v1, v2))
+
+
+def _integral_gram_schmidt(basis: list[list[int]]):
+    """
+    Return integral Gram-Schmidt data (d, lam) of linearly independent vectors.
+    d[i] is the Gram determinant of the first i vectors and ``lam[k][j] = d[j + 1] * mu[k][j]``.
+    """
+    n = len(basis)
+    d = [1] + [0] * n
+    lam = [[0] * n for _ in range(n)]
+    for k in range(n):
+        for j in range(k + 1):
+            u = _dot(basis[k], basis[j])
+            for i in range(j):
+                u = (d[i + 1] * u - lam[k][i] * lam[j][i]) // d[i]
+            if j < k:
+                lam[k][j] = u
+            else:
+                if u == 0:
+                    raise ValueError("Basis vectors should be linearly independent.")
+                d[k + 1] = u
+    return d, lam
+
+
+def lll_reduction(basis: NDArrayInt, delta: Fraction = Fraction(3, 4)):
+    """
+    LLL-reduce basis vectors ``basis[i, :]`` with exact integer arithmetic (Cohen, Algorithm 2.6.7).
+
+    Parameters
+    ----------
+    basis: array, (k, n)
+        Linearly independent integer vectors
+    delta:
+        Parameter of Lovasz condition, 1/4 < delta <= 1
+
+    Returns
+    -------
+    reduced: array, (k, n)
+        LLL-reduced basis
+    U: array, (k, k)
+        Unimodular matrix s.t. ``reduced = U @ basis``
+    """
+    delta = Fraction(delta)
+    p, q = delta.numerator, delta.denominator
+
+    b = _to_int_rows(basis)
+    n = len(b)
+    num_column = np.shape(basis)[1]
+    U = [[int(i == j) for j in range(n)] for i in range(n)]
+    if n == 0:
+        return _to_array(b, num_column), np.zeros((0, 0), dtype=int)
+
+    # 1-based indices follow the reference
+    d = [1] + [0] * n
+    lam = [[0] * (n + 1) for _ in range(n + 1)]
+
+    def red(k, h):
+        if 2 * abs(lam[k][h]) > d[h]:
+            r = (2 * lam[k][h] + d[h]) // (2 * d[h])
+            b[k - 1] = [x - r * y for x, y in zip(b[k - 1], b[h - 1])]
+            U[k - 1] = [x - r * y for x, y in zip(U[k - 1], U[h - 1])]
+            lam[k][h] -= r * d[h]
+            for i in range(1, h):
+                lam[k][i] -= r * lam[h][i]
+
+    def swap(k, kmax):
+        b[k - 1], b[k - 2] = b[k - 2], b[k - 1]
+        U[k - 1], U[k - 2] = U[k - 2], U[k - 1]
+        for j in range(1, k - 1):
+            lam[k][j], lam[k - 1][j] = lam[k - 1][j], lam[k][j]
+        lmd = lam[k][k - 1]
+        B = (d[k - 2] * d[k] + lmd * lmd) // d[k - 1]
+        for i in range(k + 1, kmax + 1):
+            t = lam[i][k]
+            lam[i][k] = (d[k] * lam[i][k - 1] - lmd * t) // d[k - 1]
+            lam[i][k - 1] = (B * t + lmd * lam[i][k]) // d[k]
+        d[k - 1] = B
+
+    d[1] = _dot(b[0], b[0])
+    if d[1] == 0:
+        raise ValueError("Basis vectors should be linearly independent.")
+    k, kmax = 2, 1
+    while k <= n:
+        if k > kmax:
+            kmax = k
+            for j in range(1, k + 1):
+                u = _dot(b[k - 1], b[j - 1])
+                for i in range(1, j):
+                    u = (d[i] * u - lam[k][i] * lam[j][i]) // d[i - 1]
+                if j < k:
+                    lam[k][j] = u
+                else:
+                    if u == 0:
+                        raise ValueError("Basis vectors should be linearly independent.")
+                    d[k] = u
+
+        red(k, k - 1)
+        if q * d[k] * d[k - 2] < p * d[k - 1] ** 2 - q * lam[k][k - 1] ** 2:
+            swap(k, kmax)
+            k = max(2, k - 1)
+        else:
+            for h in range(k - 2, 0, -1):
+                red(k, h)
+            k += 1
+
+    return _to_array(b, num_column), _to_array(U, n)
+
+
+def size_reduction(vectors: NDArrayInt, basis: NDArrayInt):
+    """
+    Size-reduce ``vectors[i, :]`` against lattice basis ``basis[j, :]`` by Babai's nearest plane algorithm.
+
+    Parameters
+    ----------
+    vectors: array, (m, n)
+        Integer vectors to be reduced
+    basis: array, (k, n)
+        Linearly independent integer vectors, preferably LLL-reduced
+
+    Returns
+    -------
+    reduced: array, (m, n)
+        Reduced vectors
+    C: array, (m, k)
+        Integer coefficients s.t. ``reduced = vectors - C @ basis``
+    """
+    b = _to_int_rows(basis)
+    n = len(b)
+    d, lam = _integral_gram_schmidt(b)
+
+    reduced = []
+    coeffs = []
+    for v in _to_int_rows(vectors):
+        # lam_v[j] = d[j + 1] * mu_j, where mu_j is the projection coefficient on the j-th Gram-Schmidt vector
+        lam_v = [0] * n
+        for j in range(n):
+            u = _dot(v, b[j])
+            for i in range(j):
+                u = (d[i + 1] * u - lam_v[i] * lam[j][i]) // d[i]
+            lam_v[j] = u
+
+        c = [0] * n
+        for h in range(n - 1, -1, -1):
+            if 2 * abs(lam_v[h]) > d[h + 1]:
+                r = (2 * lam_v[h] + d[h + 1]) // (2 * d[h + 1])
+                v = [x - r * y for x, y in zip(v, b[h])]
+                c[h] += r
+                lam_v[h] -= r * d[h + 1]
+                for i in range(h):
+                    lam_v[i] -= r * lam[h][i]
+        reduced.append(v)
+        coeffs.append(c)
+
+    num_column = np.shape(vectors)[1]
+    return _to_array(reduced, num_column), _to_array(coeffs, n)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from math import ceil, gcd
+
+import numpy as np
+
+from hsnf.utils import (
+    NDArrayInt,
+    extgcd,
+    get_divisibility_chain_operations,
+    parallel_map,
+)
+
+# Primes below 2^31 keep products of two residues within int64
+_WORD_SIZE = 2**31
+
+
+def _is_prime(n: int) -> bool:
+    """
+    Deterministic Miller-Rabin test for n < 3215031751
+    """
+    if n < 2:
+        return False
+    for p in (2, 3, 5, 7):
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in (2, 3, 5, 7):
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def word_size_primes(count: int) -> list[int]:
+    """
+    Return the `count` largest primes below 2^31 in descending order
+    """
+    primes: list[int] = []
+    n = _WORD_SIZE - 1
+    while len(primes) < count:
+        if _is_prime(n):
+            primes.append(n)
+        n -= 2
+    return primes
+
+
+def _log2_hadamard_bound(A: NDArrayInt) -> float:
+    """
+    Upper bound of log2 of absolute values of all minors of `A`
+    """
+    norms = np.linalg.norm(A.astype(float), axis=1)
+    return float(np.sum(np.log2(np.maximum(norms, 1.0))))
+
+
+def _eliminate_mod_p(args):
+    """
+    Gaussian elimination of A modulo prime p with int64 arithmetic.
+
+    Returns
+    -------
+    rows: list of int
+        Original indices of pivot rows
+    cols: list of int
+        Indices of pivot columns
+    det: int
+        Determinant of A modulo p if A is square, otherwise meaningless
+    """
+    A, p = args
+    A = np.mod(A, p).astype(np.int64)
+    m, n = A.shape
+    perm = list(range(m))
+    rows, cols = [], []
+    det = 1
+    r = 0
+    for j in range(n):
+        if r == m:
+            break
+        nonzero = np.flatnonzero(A[r:, j])
+        if nonzero.size == 0:
+            continue
+        i = r + int(nonzero[0])
+        if i != r:
+            A[[r, i]] = A[[i, r]]
+            perm[r], perm[i] = perm[i], perm[r]
+            det = -det
+
+        pivot = int(A[r, j])
+        det = det * pivot % p
+        A[r] = A[r] * pow(pivot, -1, p) % p
+        A[r + 1 :] = (A[r + 1 :] - np.outer(A[r + 1 :, j], A[r])) % p
+
+        rows.append(perm[r])
+        cols.append(j)
+        r += 1
+
+    if r < min(m, n) or m != n:
+        det = 0
+    return rows, cols, det % p
+
+
+def _crt_symmetric(residues: list[int], primes: list[int]) -> int:
+    """
+    Reconstruct x from ``x mod primes[i]`` in the symmetric range of product of primes
+    """
+    x, modulus = 0, 1
+    for r, p in zip(residues, primes):
+        t = (r - x) * pow(modulus, -1, p) % p
+        x += modulus * t
+        modulus *= p
+    if 2 * x > modulus:
+        x -= modulus
+    return x
+
+
+def _combination(a: int, b: int):
+    """
+    Return (x, y, u, v) s.t. ``[[x, y], [-v, u]]`` is unimodular and maps (a, b) to (gcd(a, b), 0)
+    """
+    if a != 0 and b % a == 0:
+        # keep a as it is
+        return 1, 0, 1, b // a
+    g, x, y = extgcd(a, b)
+    return x, y, a // g, b // g
+
+
+def _invariant_factors_modulo(A: NDArrayInt, N: int, rank: int) -> list[int]:
+    """
+    Return the first `rank` invariant factors of `A`, which should divide `N`, by elimination over Z/NZ
+    """
+    B = np.mod(np.array(A, dtype=object), N)
+    m, n = B.shape
+
+    diag = []
+    for s in range(min(m, n)):
+        while True:
+            # eliminate the s-th column entries with unimodular 2x2 row operations
+            for i in range(s + 1, m):
+                if B[i, s] != 0:
+                    x, y, u, v = _combination(B[s, s], B[i, s])
+                    row_s, row_i = B[s].copy(), B[i].copy()
+                    B[s] = (x * row_s + y * row_i) % N
+                    B[i] = (u * row_i - v * row_s) % N
+            # eliminate the s-th row entries with unimodular 2x2 column operations
+            for j in range(s + 1, n):
+                if B[s, j] != 0:
+                    x, y, u, v = _combination(B[s, s], B[s, j])
+                    col_s, col_j = B[:, s].copy(), B[:, j].copy()
+                    B[:, s] = (x * col_s + y * col_j) % N
+                    B[:, j] = (u * col_j - v * col_s) % N
+            if not np.any(B[s + 1 :, s] != 0):
+                break
+        diag.append(gcd(int(B[s, s]), N))
+
+    get_divisibility_chain_operations(diag)
+    return diag[:rank]
+
+
+def multimodular_invariant_factors(M: NDArrayInt, max_workers: int = 1) -> list[int]:
+    """
+    Calculate nonzero invariant factors of integer matrix `M` without integer elimination.
+
+    1. Rank profiles of `M` modulo word-size primes give the rank and a nonsingular minor.
+       Enough primes are used so that at least one of them does not divide the determinantal divisor.
+    2. Determinant of the minor is computed modulo primes and reconstructed by Chinese remainder theorem
+       within Hadamard's bound.
+    3. Invariant factors divide the determinant, and are computed by elimination modulo the determinant.
+
+    Eliminations modulo different primes are independent and run in parallel with `max_workers` processes.
+    The last step runs serially on object arrays of Python integers because the determinant may exceed int64.
+    It takes O(min(m, n) * m * n) operations on integers below the determinant, and may dominate the running time.
+
+    Parameters
+    ----------
+    M: array, (m, n)
+        Integer matrix
+    max_workers: int
+        Number of worker processes. If one, run serially.
+
+    Returns
+    -------
+    diag: list of int
+        diag[i] divides diag[i + 1]
+    """
+    A = np.array(M, dtype=int)
+    if A.ndim != 2:
+        raise ValueError("matrix representation must be 2d")
+    if A.size == 0 or not np.any(A):
+        return []
+
+    # Every nonzero minor is below 2^bits
+    bits = _log2_hadamard_bound(A)
+    primes = word_size_primes(ceil((bits + 1) / 30) + 1)
+
+    # 1. rank profile
+    profiles = [_eliminate_mod_p((A, primes[0]))]
+    if len(profiles[0][0]) < min(A.shape):
+        profiles += parallel_map(_eliminate_mod_p, [(A, p) for p in primes[1:]], max_workers)
+    rows, cols, _ = max(profiles, key=lambda profile: len(profile[0]))
+    rank = len(rows)
+
+    # 2. determinant of nonsingular minor
+    minor = A[np.ix_(sorted(rows), sorted(cols))]
+    num_primes = ceil((_log2_hadamard_bound(minor) + 1) / 30) + 1
+    results = parallel_map(
+        _eliminate_mod_p, [(minor, p) for p in primes[:num_primes]], max_workers
+    )
+    delta = abs(_crt_symmetric([det for _, _, det in results], primes[:num_primes]))
+
+    # 3. elimination modulo determinant
+    return _invariant_factors_modulo(A, delta, rank)
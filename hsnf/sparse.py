@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import heapq
+import warnings
+
+import numpy as np
+import scipy.sparse
+
+from hsnf.utils import get_divisibility_chain_operations
+
+
+class SparseZmoduleHomomorphism:
+    """
+    homomorphism between Z-modules with a sparse matrix representation
+
+    Rows of the matrix are stored as dictionaries ``{column: value}`` together with the nonzero pattern of each column,
+    so that memory scales with the number of nonzero entries.
+    Entries are kept as Python integers and never overflow during elimination.
+
+    Parameters
+    ----------
+    A: sparse matrix, (m, n)
+        matrix representation of homomorhism: Z^m -> Z^n
+    transforms: bool
+        If true, keep track of unimodular transformations as sparse rows and columns
+    """
+
+    def __init__(self, A, transforms: bool = True):
+        A = scipy.sparse.coo_matrix(A)
+        if not np.issubdtype(A.dtype, np.integer):
+            warnings.warn("Decomposed matrix should be integer.")
+        A.sum_duplicates()
+
+        m, n = A.shape
+        self._shape = (m, n)
+        self._rows: list[dict[int, int]] = [{} for _ in range(m)]
+        self._cols: list[set[int]] = [set() for _ in range(n)]
+        for i, j, v in zip(A.row.tolist(), A.col.tolist(), A.data.tolist()):
+            if int(v) == 0:
+                continue
+            self._rows[i][j] = int(v)
+            self._cols[j].add(i)
+
+        # Rows of L and columns of R
+        self._basis_from: list[dict[int, int]] | None = None
+        self._basis_to: list[dict[int, int]] | None = None
+        if transforms:
+            self._basis_from = [{i: 1} for i in range(m)]
+            self._basis_to = [{j: 1} for j in range(n)]
+
+        self._active_rows = [True] * m
+        self._heap = [(len(row), i) for i, row in enumerate(self._rows)]
+        heapq.heapify(self._heap)
+        # Rows without unit entries popped while choosing unit pivots.
+        # They need not be revisited for unit pivots until modified, which pushes them to the heap again.
+        self._deferred: list[tuple[int, int]] = []
+
+    @property
+    def num_row(self):
+        return self._shape[0]
+
+    @property
+    def num_column(self):
+        return self._shape[1]
+
+    @property
+    def nnz(self):
+        return sum(len(row) for row in self._rows)
+
+    def _add_from(self, axis1, axis2, k):
+        """
+        add k times axis2 to axis1
+        """
+        row1 = self._rows[axis1]
+        for j, v in self._rows[axis2].items():
+            w = row1.get(j, 0) + k * v
+            if w != 0:
+                if j not in row1:
+                    self._cols[j].add(axis1)
+                row1[j] = w
+            else:
+                del row1[j]
+                self._cols[j].discard(axis1)
+        heapq.heappush(self._heap, (len(row1), axis1))
+
+        if self._basis_from is not None:
+            _add_sparse_vector(self._basis_from[axis1], self._basis_from[axis2], k)
+
+    def _add_to(self, axis1, axis2, k):
+        """
+        add k times axis2 to axis1
+        """
+        col1 = self._cols[axis1]
+        for i in list(self._cols[axis2]):
+            row = self._rows[i]
+            w = row.get(axis1, 0) + k * row[axis2]
+            if w != 0:
+                if axis1 not in row:
+                    col1.add(i)
+                    heapq.heappush(self._heap, (len(row) + 1, i))
+                row[axis1] = w
+            else:
+                del row[axis1]
+                col1.discard(i)
+                heapq.heappush(self._heap, (len(row), i))
+
+        if self._basis_to is not None:
+            _add_sparse_vector(self._basis_to[axis1], self._basis_to[axis2], k)
+
+    def _remove_pivot(self, row, col):
+        """
+        remove a lone pivot from the active submatrix
+        """
+        del self._rows[row][col]
+        self._cols[col].discard(row)
+        self._active_rows[row] = False
+
+    def _delete_row(self, axis):
+        """
+        remove the axis-th row from the matrix
+        """
+        for j in self._rows[axis]:
+            self._cols[j].discard(axis)
+        self._rows[axis] = {}
+        self._active_rows[axis] = False
+
+    def _delete_column(self, axis):
+        """
+        remove the axis-th column from the matrix
+        """
+        for i in self._cols[axis]:
+            row = self._rows[i]
+            del row[axis]
+            heapq.heappush(self._heap, (len(row), i))
+        self._cols[axis] = set()
+
+    def _choose_pivot(self, unit: bool = False):
+        """
+        return a pivot among active rows with the fewest nonzero entries.
+        Within the row, unit entries are preferred, then the lowest Markowitz cost (r - 1) * (c - 1).
+        If unit=True, only entries with absolute value one are chosen.
+        if failed, return None
+        """
+        if not unit:
+            # Fall back to all rows once no unit pivots are needed
+            for item in self._deferred:
+                heapq.heappush(self._heap, item)
+            self._deferred = []
+
+        while self._heap:
+            count, i = heapq.heappop(self._heap)
+            if not self._active_rows[i] or count != len(self._rows[i]):
+                # outdated entry
+                continue
+            if count == 0:
+                # zero rows never change by later operations
+                self._active_rows[i] = False
+                continue
+
+            def cost(item):
+                j, v = item
+                return (abs(v) != 1, (count - 1) * (len(self._cols[j]) - 1), abs(v), j)
+
+            j, v = min(self._rows[i].items(), key=cost)
+            if unit and abs(v) != 1:
+                self._deferred.append((count, i))
+                continue
+            return (i, j)
+
+        return None
+
+    def _eliminate(self, row, col):
+        """
+        eliminate the row-th row and the col-th column entries except for a pivot.
+        the pivot may move within the row and column while remainders are left.
+        """
+        while True:
+            a = self._rows[row][col]
+            # eliminate the col-th column entries
+            for i in list(self._cols[col]):
+                if i != row:
+                    k = self._rows[i][col] // a
+                    if k != 0:
+                        self._add_from(i, row, -k)
+
+            # eliminate the row-th row entries
+            for j in list(self._rows[row]):
+                if j != col:
+                    k = self._rows[row][j] // a
+                    if k != 0:
+                        self._add_to(j, col, -k)
+
+            if len(self._rows[row]) == 1 and len(self._cols[col]) == 1:
+                return row, col
+
+            # remainders are smaller than the current pivot
+            candidates = [(abs(self._rows[i][col]), i, col) for i in self._cols[col] if i != row]
+            candidates += [(abs(v), row, j) for j, v in self._rows[row].items() if j != col]
+            _, row, col = min(candidates)
+
+    def _diagonalize(self, unit: bool = False):
+        """
+        return pivots (row, column, value) which diagonalize the matrix up to permutations.
+        If unit=True, only pivots with absolute value one are eliminated and the other entries are left.
+        """
+        pivots = []
+        while True:
+            res = self._choose_pivot(unit=unit)
+            if res is None:
+                break
+            row, col = self._eliminate(*res)
+            pivots.append((row, col, self._rows[row][col]))
+            self._remove_pivot(row, col)
+        return pivots
+
+    def invariant_factors(self):
+        """
+        calculate nonzero invariant factors without transformations
+
+        Returns
+        -------
+        diag: list of int
+            diag[i] divides diag[i + 1]
+        """
+        diag = [abs(a) for _, _, a in self._diagonalize()]
+        get_divisibility_chain_operations(diag)
+        return diag
+
+    def smith_normal_form(self):
+        """
+        calculate Smith normal form
+
+        Returns
+        -------
+        D: sparse matrix, (m, n)
+        L: sparse matrix, (m, m)
+            None if transforms are not tracked
+        R: sparse matrix, (n, n)
+            None if transforms are not tracked
+            D = L @ M @ R
+            L, R are unimodular.
+        """
+        m, n = self._shape
+        pivots = self._diagonalize()
+
+        pivot_rows = [row for row, _, _ in pivots]
+        pivot_cols = [col for _, col, _ in pivots]
+        row_order = pivot_rows + sorted(set(range(m)) - set(pivot_rows))
+        col_order = pivot_cols + sorted(set(range(n)) - set(pivot_cols))
+
+        diag = []
+        for row, _, a in pivots:
+            if a < 0 and self._basis_from is not None:
+                basis = self._basis_from[row]
+                for idx in basis:
+                    basis[idx] *= -1
+            diag.append(abs(a))
+
+        operations = get_divisibility_chain_operations(diag)
+
+        rank = len(diag)
+        D = scipy.sparse.csr_matrix(
+            (np.array(diag, dtype=int), (np.arange(rank), np.arange(rank))), shape=(m, n)
+        )
+        if self._basis_from is None or self._basis_to is None:
+            return D, None, None
+
+        L_rows = [self._basis_from[i] for i in row_order]
+        R_cols = [self._basis_to[j] for j in col_order]
+        for i, j, left, right in operations:
+            L_rows[i], L_rows[j] = (
+                _combine_sparse_vectors(L_rows[i], left[0][0], L_rows[j], left[0][1]),
+                _combine_sparse_vectors(L_rows[i], left[1][0], L_rows[j], left[1][1]),
+            )
+            R_cols[i], R_cols[j] = (
+                _combine_sparse_vectors(R_cols[i], right[0][0], R_cols[j], right[1][0]),
+                _combine_sparse_vectors(R_cols[i], right[0][1], R_cols[j], right[1][1]),
+            )
+
+        L = _to_csr(L_rows, (m, m), transpose=False)
+        R = _to_csr(R_cols, (n, n), transpose=True)
+        return D, L, R
+
+
+def _add_sparse_vector(v1: dict[int, int], v2: dict[int, int], k: int):
+    """
+    add k times v2 to v1 in place
+    """
+    for idx, val in list(v2.items()):
+        w = v1.get(idx, 0) + k * val
+        if w != 0:
+            v1[idx] = w
+        else:
+            del v1[idx]
+
+
+def _combine_sparse_vectors(v1: dict[int, int], k1: int, v2: dict[int, int], k2: int):
+    """
+    return k1 * v1 + k2 * v2
+    """
+    ret = {idx: k1 * val for idx, val in v1.items() if k1 != 0}
+    if k2 != 0:
+        _add_sparse_vector(ret, v2, k2)
+    return ret
+
+
+def _to_csr(vectors: list[dict[int, int]], shape, transpose: bool):
+    """
+    stack sparse vectors as rows (or columns if transpose=True)
+    """
+    indptr = [0]
+    indices = []
+    data = []
+    for vec in vectors:
+        for idx in sorted(vec):
+            indices.append(idx)
+            data.append(vec[idx])
+        indptr.append(len(indices))
+    mat = scipy.sparse.csr_matrix(
+        (np.array(data, dtype=int), np.array(indices, dtype=int), np.array(indptr)), shape=shape
+    )
+    if transpose:
+        return mat.T.tocsr()
+    return mat
+
+
+def sparse_smith_normal_form(M, transforms: bool = True):
+    """
+    Calculate Smith normal form of sparse integer matrix `M`.
+    Returned matrices `(D, L, R)` satisfy ``D = L @ M @ R``.
+
+    Pivots are chosen by a Markowitz-style rule to suppress fill-in,
+    and memory scales with the number of nonzero entries of `M` and its transformations.
+
+    Parameters
+    ----------
+    M: sparse matrix or array, (m, n)
+        Integer matrix
+    transforms: bool
+        If false, skip computing transformation matrices and return `None` for them
+
+    Returns
+    -------
+    D: sparse matrix, (m, n)
+        Smith normal form of `M`
+    L: sparse matrix, (m, m)
+        Unimodular matrix
+    R: sparse matrix, (n, n)
+        Unimodular matrix
+    """
+    zmh = SparseZmoduleHomomorphism(M, transforms=transforms)
+    return zmh.smith_normal_form()
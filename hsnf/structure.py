@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+
+from hsnf.utils import NDArrayInt, get_divisibility_chain_operations
+
+logger = logging.getLogger(__name__)
+
+# From the most specific structure
+STRUCTURES = ("zero", "diagonal", "monomial", "hnf", "upper_triangular", "general")
+
+
+def _is_diagonal(A) -> bool:
+    rows, cols = np.nonzero(A)
+    return bool(np.all(rows == cols))
+
+
+def _is_monomial(A) -> bool:
+    """
+    return True if each row and column has at most one nonzero entry
+    """
+    nonzero = A != 0
+    return bool(np.all(np.sum(nonzero, axis=0) <= 1) and np.all(np.sum(nonzero, axis=1) <= 1))
+
+
+def _is_row_hnf(A) -> bool:
+    """
+    return True if A is already row-style Hermite normal form
+    """
+    m, n = A.shape
+    nonzero = A != 0
+    is_zero_row = ~np.any(nonzero, axis=1)
+    rank = m - np.count_nonzero(is_zero_row)
+    # zero rows should be at the bottom
+    if np.any(is_zero_row[:rank]):
+        return False
+    if rank == 0:
+        return True
+
+    pivots = np.argmax(nonzero[:rank], axis=1)
+    if np.any(np.diff(pivots) <= 0):
+        return False
+    pivot_values = A[np.arange(rank), pivots]
+    if np.any(pivot_values <= 0):
+        return False
+    # entries above pivots should be reduced
+    for r in range(rank):
+        above = A[:r, pivots[r]]
+        if np.any((above < 0) | (above >= pivot_values[r])):
+            return False
+    return True
+
+
+def _is_upper_triangular(A) -> bool:
+    """
+    return True if A is upper triangular with nonzero diagonal entries
+    """
+    rows, cols = np.nonzero(A)
+    return bool(np.all(rows <= cols) and np.all(np.diagonal(A) != 0))
+
+
+def detect_structure(M: NDArrayInt) -> str:
+    """
+    Detect structure of integer matrix `M` which admits a fast path of normal forms.
+
+    Parameters
+    ----------
+    M: array, (m, n)
+
+    Returns
+    -------
+    structure: str
+        The most specific one of the following:
+
+        - ``"zero"``: all entries are zero
+        - ``"diagonal"``: nonzero entries are only on the diagonal
+        - ``"monomial"``: each row and column has at most one nonzero entry, such as a signed permutation matrix
+        - ``"hnf"``: already row-style Hermite normal form
+        - ``"upper_triangular"``: upper triangular with nonzero diagonal entries
+        - ``"general"``: otherwise
+    """
+    A = np.asarray(M)
+    if A.ndim != 2:
+        raise ValueError("matrix representation must be 2d")
+    if not np.any(A):
+        return "zero"
+    if _is_diagonal(A):
+        return "diagonal"
+    if _is_monomial(A):
+        return "monomial"
+    if _is_row_hnf(A):
+        return "hnf"
+    if _is_upper_triangular(A):
+        return "upper_triangular"
+    return "general"
+
+
+def monomial_smith_normal_form(
+    A: NDArrayInt, L0: NDArrayInt | None = None, R0: NDArrayInt | None = None
+) -> tuple[NDArrayInt, NDArrayInt, NDArrayInt]:
+    """
+    Smith normal form of a matrix with at most one nonzero entry in each row and column.
+    Nonzero entries are permuted onto the diagonal and made into a divisibility chain only by gcd/lcm operations.
+
+    If `A` is given as ``A = L0 @ M @ R0``, returned matrices satisfy ``D = L @ M @ R``.
+    Otherwise `L0` and `R0` are regarded as identity matrices.
+    """
+    m, n = A.shape
+    rows, cols = np.nonzero(A)
+    values = A[rows, cols]
+    order = np.argsort(np.abs(values), kind="stable")
+    rows, cols, values = rows[order], cols[order], values[order]
+    rank = len(values)
+
+    row_perm = np.concatenate([rows, np.setdiff1d(np.arange(m), rows)])
+    col_perm = np.concatenate([cols, np.setdiff1d(np.arange(n), cols)])
+    L = (np.eye(m, dtype=int) if L0 is None else L0)[row_perm]
+    R = (np.eye(n, dtype=int) if R0 is None else R0)[:, col_perm]
+    L[:rank] *= np.sign(values)[:, None]
+
+    diag = [abs(int(v)) for v in values]
+    for i, j, left, right in get_divisibility_chain_operations(diag):
+        L[[i, j]] = np.array(left, dtype=int) @ L[[i, j]]
+        R[:, [i, j]] = R[:, [i, j]] @ np.array(right, dtype=int)
+
+    D = np.zeros((m, n), dtype=int)
+    D[np.arange(rank), np.arange(rank)] = diag
+    return D, L, R
+
+
+def _upper_triangular_hermite_normal_form(A) -> tuple[NDArrayInt, NDArrayInt]:
+    """
+    Row-style Hermite normal form of an upper triangular matrix with nonzero diagonal entries.
+    Only signs of pivots are fixed and entries above pivots are reduced.
+    """
+    m, n = A.shape
+    H = np.array(A, dtype=int)
+    L = np.eye(m, dtype=int)
+    for j in range(min(m, n)):
+        if H[j, j] < 0:
+            H[j] *= -1
+            L[j] *= -1
+        for i in range(j):
+            k = H[i, j] // H[j, j]
+            if k != 0:
+                H[i] -= k * H[j]
+                L[i] -= k * L[j]
+    return H, L
+
+
+def smith_normal_form_fast_path(M: NDArrayInt):
+    """
+    Return Smith normal form `(D, L, R)` if `M` has a structure with a fast path, otherwise None
+    """
+    A = np.asarray(M)
+    if A.ndim != 2 or A.dtype.kind not in "iu":
+        return None
+    if not np.any(A):
+        structure = "zero"
+    elif _is_monomial(A):
+        structure = "diagonal" if _is_diagonal(A) else "monomial"
+    else:
+        return None
+    logger.debug("smith_normal_form: fast path for %s input", structure)
+    return monomial_smith_normal_form(A)
+
+
+def hermite_normal_form_fast_path(M: NDArrayInt):
+    """
+    Return row-style Hermite normal form `(H, L)` if `M` has a structure with a fast path, otherwise None
+    """
+    A = np.asarray(M)
+    if A.ndim != 2 or A.dtype.kind not in "iu":
+        return None
+    if _is_row_hnf(A):
+        logger.debug("hermite_normal_form: fast path for hnf input")
+        return np.array(A, dtype=int), np.eye(A.shape[0], dtype=int)
+    if _is_upper_triangular(A):
+        logger.debug("hermite_normal_form: fast path for upper_triangular input")
+        return _upper_triangular_hermite_normal_form(A)
+    return None
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import numpy as np
+
+from hsnf.utils import NDArrayInt
+
+# Kinds of elementary row operations
+SWAP = 0  # swap rows i and j
+NEGATE = 1  # multiply row i by -1
+ADD = 2  # add k times row j to row i
+
+
+class UnimodularTransform:
+    """
+    Unimodular matrix ``T = E_t ... E_2 E_1`` stored as a log of elementary row operations `E_1`, ..., `E_t`.
+
+    Each operation takes a constant size in the log, whereas a dense `T` takes ``size * size`` entries.
+    ``T @ X`` and ``T^-1 @ X`` are computed exactly by replaying the log on the rows of `X`,
+    so that inverses need neither floating-point arithmetic nor a dense `T`.
+
+    Parameters
+    ----------
+    size: int
+        `T` is a (size, size) matrix. Initially, `T` is the identity.
+    """
+
+    # Prevent numpy from converting this object in ``X @ T``
+    __array_ufunc__ = None
+
+    def __init__(self, size: int):
+        self._size = size
+        self._ops = np.zeros((16, 4), dtype=np.int64)  # (kind, i, j, k)
+        self._num_ops = 0
+        self._transposed = False
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self._size, self._size)
+
+    @property
+    def operations(self) -> NDArrayInt:
+        """
+        Recorded operations as rows of (kind, i, j, k) in order of application
+        """
+        return self._ops[: self._num_ops]
+
+    def __len__(self):
+        return self._num_ops
+
+    def __repr__(self):
+        transposed = ".T" if self._transposed else ""
+        return f"UnimodularTransform(size={self._size}, num_ops={self._num_ops}){transposed}"
+
+    @property
+    def T(self) -> UnimodularTransform:
+        """
+        Transposed matrix of operations recorded so far, without copying the log
+        """
+        other = UnimodularTransform.__new__(UnimodularTransform)
+        other._size = self._size
+        other._ops = self._ops
+        other._num_ops = self._num_ops
+        other._transposed = not self._transposed
+        return other
+
+    def copy(self) -> UnimodularTransform:
+        other = UnimodularTransform(self._size)
+        other._ops = self._ops.copy()
+        other._num_ops = self._num_ops
+        other._transposed = self._transposed
+        return other
+
+    def _record(self, kind: int, i: int, j: int, k: int):
+        if self._transposed:
+            raise ValueError("Cannot record operations on a transposed transform.")
+        if self._num_ops == len(self._ops):
+            self._ops = np.concatenate([self._ops, np.zeros_like(self._ops)], axis=0)
+        self._ops[self._num_ops] = (kind, i, j, k)
+        self._num_ops += 1
+
+    def swap(self, i: int, j: int):
+        """
+        Left-multiply the elementary matrix swapping rows `i` and `j`
+        """
+        self._record(SWAP, i, j, 0)
+
+    def negate(self, i: int):
+        """
+        Left-multiply the elementary matrix negating row `i`
+        """
+        self._record(NEGATE, i, i, 0)
+
+    def add(self, i: int, j: int, k: int):
+        """
+        Left-multiply the elementary matrix adding `k` times row `j` to row `i`
+        """
+        self._record(ADD, i, j, k)
+
+    def _replay(self, X, inverse: bool):
+        Y = np.array(X)
+        if Y.shape[:1] != (self._size,):
+            raise ValueError(f"Expected {self._size} rows, but got shape {Y.shape}.")
+
+        # (E_t ... E_1)^T = E_1^T ... E_t^T and (E_t ... E_1)^-1 = E_1^-1 ... E_t^-1 are replayed backward
+        ops = self.operations.tolist()
+        if self._transposed != inverse:
+            ops = ops[::-1]
+        for kind, i, j, k in ops:
+            if kind == SWAP:
+                Y[[i, j]] = Y[[j, i]]
+            elif kind == NEGATE:
+                Y[i] *= -1
+            else:
+                if inverse:
+                    k = -k
+                if self._transposed:
+                    Y[j] += k * Y[i]
+                else:
+                    Y[i] += k * Y[j]
+        return Y
+
+    def apply(self, X: NDArrayInt) -> NDArrayInt:
+        """
+        Return ``T @ X``
+
+        Parameters
+        ----------
+        X: array, (size, ...)
+            Vector or stack of column vectors
+
+        Returns
+        -------
+        Y: array, (size, ...)
+        """
+        return self._replay(X, inverse=False)
+
+    def apply_inverse(self, X: NDArrayInt) -> NDArrayInt:
+        """
+        Return ``T^-1 @ X`` exactly
+
+        Parameters
+        ----------
+        X: array, (size, ...)
+            Vector or stack of column vectors
+
+        Returns
+        -------
+        Y: array, (size, ...)
+        """
+        return self._replay(X, inverse=True)
+
+    def to_dense(self) -> NDArrayInt:
+        """
+        Return `T` as a dense integer matrix
+        """
+        return self.apply(np.eye(self._size, dtype=int))
+
+    def inverse_to_dense(self) -> NDArrayInt:
+        """
+        Return the inverse of `T` as a dense integer matrix
+        """
+        return self.apply_inverse(np.eye(self._size, dtype=int))
+
+    def __matmul__(self, X):
+        return self.apply(X)
+
+    def __rmatmul__(self, X):
+        # X @ T = (T^T @ X^T)^T
+        return np.transpose(self.T.apply(np.transpose(X)))
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import numpy.typing as npt
 from typing_extensions import TypeAlias  # for Python<3.10
@@ -49,6 +51,102 @@ def get_nonzero_min_abs_column(A, i1, j1):
     return get_nonzero_min_abs(A, i1, i1 + 1, j1, A.shape[1])
 
 
+PIVOT_STRATEGIES = ("min_abs", "min_count", "min_norm")
+
+
+def get_nonzero_min_abs_cross(A, s):
+    """
+    return idx = argmin_{i, j} abs(A[i, j]) s.t. ((i == s and j >= s) or (i >= s and j == s)) and A[i, j] != 0
+    if failed, return (None, None)
+    """
+    idx = get_nonzero_min_abs(A, s, A.shape[0], s, s + 1)
+    idx2 = get_nonzero_min_abs(A, s, s + 1, s + 1, A.shape[1])
+    if idx[0] is None or (idx2[0] is not None and np.abs(A[idx2]) < np.abs(A[idx])):
+        return idx2
+    return idx
+
+
+def _argmin_nonzero(key, nonzero):
+    """
+    return the first index of minimum key among nonzero entries
+    """
+    flat = np.flatnonzero(nonzero)
+    if flat.size == 0:
+        return None
+    return np.unravel_index(flat[np.argmin(key.ravel()[flat])], key.shape)
+
+
+def get_pivot_full(A, s, strategy: str = "min_abs"):
+    """
+    return a pivot idx in A[s:, s:] chosen by `strategy`
+        "min_abs": entry with the minimum absolute value
+        "min_count": entry with the minimum absolute value in the row or column with the fewest nonzero entries
+        "min_norm": entry with the minimum absolute value, ties are broken by the smallest product of row and column norms (Havas-Majewski)
+    if failed, return (None, None)
+    """
+    if strategy == "min_abs":
+        return get_nonzero_min_abs_full(A, s)
+
+    sub = A[s:, s:]
+    nonzero = sub != 0
+    if not np.any(nonzero):
+        return (None, None)
+    absval = np.abs(sub)
+
+    if strategy == "min_count":
+        row_counts = np.where(np.any(nonzero, axis=1), np.count_nonzero(sub, axis=1), sub.size + 1)
+        col_counts = np.where(np.any(nonzero, axis=0), np.count_nonzero(sub, axis=0), sub.size + 1)
+        i = np.argmin(row_counts)
+        j = np.argmin(col_counts)
+        if row_counts[i] <= col_counts[j]:
+            (jj,) = _argmin_nonzero(absval[i], nonzero[i])
+            return (s + i, s + jj)
+        else:
+            (ii,) = _argmin_nonzero(absval[:, j], nonzero[:, j])
+            return (s + ii, s + j)
+    elif strategy == "min_norm":
+        fsub = sub.astype(float)
+        row_norms = np.linalg.norm(fsub, axis=1)
+        col_norms = np.linalg.norm(fsub, axis=0)
+        valmin = np.min(absval[nonzero])
+        key = np.outer(row_norms, col_norms)
+        i, j = _argmin_nonzero(key, nonzero & (absval == valmin))
+        return (s + i, s + j)
+    else:
+        raise ValueError(f"Unknown pivot strategy: {strategy}")
+
+
+def get_pivot_row(A, i1, j1, strategy: str = "min_abs"):
+    """
+    return a pivot idx in A[i1:, j1] chosen by `strategy`
+        "min_abs": entry with the minimum absolute value
+        "min_count": entry in the row with the fewest nonzero entries in A[i1:, j1:], ties are broken by the absolute value
+        "min_norm": entry with the minimum absolute value, ties are broken by the smallest row norm in A[i1:, j1:] (Havas-Majewski)
+    if failed, return (None, None)
+    """
+    if strategy == "min_abs":
+        return get_nonzero_min_abs_row(A, i1, j1)
+
+    sub = A[i1:, j1:]
+    nonzero = sub[:, 0] != 0
+    if not np.any(nonzero):
+        return (None, None)
+    absval = np.abs(sub[:, 0])
+
+    if strategy == "min_count":
+        rows = np.flatnonzero(nonzero)
+        counts = np.count_nonzero(sub[rows], axis=1)
+        i = rows[np.lexsort((absval[rows], counts))[0]]
+    elif strategy == "min_norm":
+        valmin = np.min(absval[nonzero])
+        (i,) = _argmin_nonzero(
+            np.linalg.norm(sub.astype(float), axis=1), nonzero & (absval == valmin)
+        )
+    else:
+        raise ValueError(f"Unknown pivot strategy: {strategy}")
+    return (i1 + i, j1)
+
+
 def extgcd(a, b):
     """
     Extended Euclidean algorithm for ax + by = gcd(a, b)
@@ -63,6 +161,29 @@ def extgcd(a, b):
         return (g, x, y)
 
 
+def get_divisibility_chain_operations(diag: list[int]):
+    """
+    Return 2x2 unimodular operations which turn positive diagonal entries into a divisibility chain.
+    `diag` is overwritten with the resulting chain, ``diag[i]`` divides ``diag[i + 1]``.
+
+    Each operation is ``(i, j, left, right)``.
+    With ``a, b = diag[i], diag[j]`` before the operation,
+    ``left @ [[a, 0], [0, b]] @ right == [[gcd(a, b), 0], [0, lcm(a, b)]]``,
+    where ``left`` acts on the i-th and j-th rows and ``right`` acts on the i-th and j-th columns.
+    """
+    operations = []
+    for i in range(len(diag)):
+        for j in range(i + 1, len(diag)):
+            a, b = diag[i], diag[j]
+            if b % a == 0:
+                continue
+            g, x, y = extgcd(a, b)  # a * x + b * y == g
+            u, v = a // g, b // g
+            diag[i], diag[j] = g, u * b
+            operations.append((i, j, ((x, y), (-v, u)), ((1, -y * v), (1, x * u))))
+    return operations
+
+
 def eratosthenes(n: int) -> dict[int, int]:
     sieve = [1 for _ in range(n + 1)]
     for d in range(2, n + 1):
@@ -112,3 +233,13 @@ def get_triangular_rank(A):
     Return rank of triangular integer matrix
     """
     return np.count_nonzero(np.diagonal(A))
+
+
+def parallel_map(func, args: list, max_workers: int = 1) -> list:
+    """
+    Return ``[func(arg) for arg in args]``, computed with `max_workers` processes if it is larger than one
+    """
+    if max_workers == 1:
+        return [func(arg) for arg in args]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, args))
@@ -72,9 +72,9 @@ setup(
     },
     # If your package is a single module, use this instead of 'packages':
     # py_modules=['mypackage'],
-    # entry_points={
-    #     'console_scripts': ['mycli=mymodule:cli'],
-    # },
+    entry_points={
+        "console_scripts": ["hsnf=hsnf.cli:main"],
+    },
     # numpy: https://github.com/numpy/numpy/issues/2434
     setup_requires=["setuptools_scm", "numpy"],
     install_requires=REQUIRED,
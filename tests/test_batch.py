@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from hsnf import (
+    column_style_hermite_normal_form,
+    row_style_hermite_normal_form,
+    smith_normal_form,
+)
+from hsnf.batch import (
+    batch_column_style_hermite_normal_form,
+    batch_row_style_hermite_normal_form,
+    batch_smith_normal_form,
+    pack_diagonal,
+    pack_triangle,
+    smallest_integer_dtype,
+    unpack_diagonal,
+    unpack_triangle,
+)
+
+
+@pytest.mark.parametrize("size", [(50, 3, 7), (50, 6, 4), (50, 5, 5), (3, 1, 1), (2, 0, 3)])
+def test_batch_identical_to_single(size):
+    rng = np.random.default_rng(0)
+    X = rng.integers(-3, 4, size=size) * (rng.random(size=size) < 0.7)
+
+    D, L, R = batch_smith_normal_form(X)
+    H_row, L_row = batch_row_style_hermite_normal_form(X)
+    H_col, R_col = batch_column_style_hermite_normal_form(X)
+    for i in range(size[0]):
+        for actual, expect in zip((D[i], L[i], R[i]), smith_normal_form(X[i])):
+            assert np.array_equal(actual, expect)
+        for actual, expect in zip((H_row[i], L_row[i]), row_style_hermite_normal_form(X[i])):
+            assert np.array_equal(actual, expect)
+        for actual, expect in zip((H_col[i], R_col[i]), column_style_hermite_normal_form(X[i])):
+            assert np.array_equal(actual, expect)
+
+
+def test_compact_and_packed():
+    rng = np.random.default_rng(0)
+    X = rng.integers(-3, 4, size=(20, 3, 4))
+
+    D, L, R = batch_smith_normal_form(X)
+    D_c, L_c, R_c = batch_smith_normal_form(X, compact=True)
+    for actual, expect in zip((D_c, L_c, R_c), (D, L, R)):
+        assert actual.dtype == smallest_integer_dtype(expect)
+        assert np.array_equal(actual, expect)
+    assert smallest_integer_dtype(np.array([0, 127])) == np.int8
+    assert smallest_integer_dtype(np.array([-129])) == np.int16
+    with pytest.raises(OverflowError):
+        smallest_integer_dtype(np.array([2**70], dtype=object))
+
+    assert np.array_equal(unpack_diagonal(pack_diagonal(D), D.shape[1:]), D)
+    H_row, _ = batch_row_style_hermite_normal_form(X)
+    packed = pack_triangle(H_row)
+    assert packed.shape == (20, 9)
+    assert np.array_equal(unpack_triangle(packed, H_row.shape[1:]), H_row)
+    H_col, _ = batch_column_style_hermite_normal_form(X)
+    packed = pack_triangle(H_col, lower=True)
+    assert np.array_equal(unpack_triangle(packed, H_col.shape[1:], lower=True), H_col)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from scipy.linalg import block_diag
+
+from hsnf import (
+    column_style_hermite_normal_form,
+    row_style_hermite_normal_form,
+    smith_normal_form,
+)
+from hsnf.block import connected_blocks
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+def permuted_block_matrix(rng, shapes):
+    M = block_diag(*[rng.integers(-3, 4, size=shape) for shape in shapes]).astype(int)
+    rows = rng.permutation(M.shape[0])
+    cols = rng.permutation(M.shape[1])
+    return M[np.ix_(rows, cols)]
+
+
+def test_connected_blocks():
+    M = np.array(
+        [
+            [0, 2, 0, 0],
+            [1, 0, 0, 3],
+            [0, 0, 0, 0],
+            [4, 0, 0, 0],
+        ]
+    )
+    blocks = connected_blocks(M)
+    assert len(blocks) == 4
+    got = sorted((tuple(rows), tuple(cols)) for rows, cols in blocks)
+    assert got == [((), (2,)), ((0,), (1,)), ((1, 3), (0, 3)), ((2,), ())]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_block_smith_normal_form(rng, max_workers):
+    for shapes in [[(3, 2), (2, 4)], [(2, 2), (1, 3), (3, 1)], [(4, 4)]]:
+        M = permuted_block_matrix(rng, shapes)
+        # Append zero row and column
+        M = np.pad(M, ((0, 1), (1, 0)))
+        D, L, R = smith_normal_form(M, block_decomposition=True, max_workers=max_workers)
+        assert np.array_equal(L @ M @ R, D)
+        assert abs(round(np.linalg.det(L))) == 1
+        assert abs(round(np.linalg.det(R))) == 1
+
+        D_expect, _, _ = smith_normal_form(M)
+        assert np.array_equal(D, D_expect)
+
+
+def test_block_hermite_normal_form(rng):
+    for shapes in [[(3, 2), (2, 4)], [(2, 2), (1, 3), (3, 1)], [(4, 4)]]:
+        M = permuted_block_matrix(rng, shapes)
+        M = np.pad(M, ((1, 0), (0, 1)))
+
+        H, L = row_style_hermite_normal_form(M, block_decomposition=True)
+        assert np.array_equal(L @ M, H)
+        assert abs(round(np.linalg.det(L))) == 1
+        H_expect, _ = row_style_hermite_normal_form(M)
+        assert np.array_equal(H, H_expect)
+
+        H, R = column_style_hermite_normal_form(M, block_decomposition=True, max_workers=2)
+        assert np.array_equal(M @ R, H)
+        assert abs(round(np.linalg.det(R))) == 1
+        H_expect, _ = column_style_hermite_normal_form(M)
+        assert np.array_equal(H, H_expect)
@@ -0,0 +1,89 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from hsnf import column_style_hermite_normal_form, smith_normal_form
+from hsnf.cache import DecompositionCache, disable_cache, enable_cache, get_cache
+from hsnf.lattice import QuotientGroup
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = enable_cache(tmp_path / "cache")
+    yield cache
+    disable_cache()
+
+
+def _invariant_factors(seed):
+    M = np.random.default_rng(seed % 3).integers(-5, 6, size=(6, 5))
+    D, _, _ = smith_normal_form(M)
+    return np.diagonal(D).tolist()
+
+
+def test_cache_hit(cache):
+    M = np.array([[2, 4, 4], [-6, 6, 12], [10, -4, -16]])
+    D, L, R = smith_normal_form(M)
+    assert len(list(cache.directory.glob("*/*.npz"))) == 1
+
+    # Looked up without computing
+    D2, L2, R2 = smith_normal_form(M.copy())
+    assert np.array_equal(D, D2) and np.array_equal(L, L2) and np.array_equal(R, R2)
+
+    # Different options or inputs are different entries
+    smith_normal_form(M, reduce_transforms=True)
+    column_style_hermite_normal_form(M)
+    smith_normal_form(M.astype(np.int32))
+    assert len(list(cache.directory.glob("*/*.npz"))) == 4
+
+    # Cached results are written into buffers
+    out = (np.zeros((3, 3), dtype=int), None, np.zeros((3, 3), dtype=int))
+    D3, _, R3 = smith_normal_form(M, out=out)
+    assert D3 is out[0] and R3 is out[2]
+    assert np.array_equal(D3, D) and np.array_equal(R3, R)
+
+    # Lattice helpers consult the cache through normal forms
+    QuotientGroup(M)
+    assert len(list(cache.directory.glob("*/*.npz"))) > 4
+
+
+def test_cache_eviction(cache):
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        smith_normal_form(rng.integers(-3, 4, size=(4, 4)))
+    size = cache.size
+    assert size > 0
+
+    cache.evict(max_bytes=size // 2)
+    assert 0 < cache.size <= size // 2
+    cache.clear()
+    assert cache.size == 0
+
+
+def test_cache_concurrent_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv("HSNF_CACHE_DIR", str(tmp_path / "shared"))
+    expect = [_invariant_factors(seed) for seed in range(3)]
+    try:
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            got = list(executor.map(_invariant_factors, range(24)))
+        assert got == [expect[seed % 3] for seed in range(24)]
+        assert len(list(get_cache().directory.glob("*/*.npz"))) == 3
+        assert not list(get_cache().directory.glob("*/*.tmp"))
+    finally:
+        disable_cache()
+
+
+def test_cache_tracks_size(tmp_path, monkeypatch):
+    cache = DecompositionCache(tmp_path / "cache", max_bytes=4000)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    rng = np.random.default_rng(0)
+    for i in range(20):
+        arrays = (rng.integers(-3, 4, size=(4, 4)),)
+        cache.put(cache.key("smith", arrays[0]), arrays)
+        assert cache._tracked_bytes <= cache.max_bytes
+    # The directory is scanned on the first write and on evictions only
+    assert len(scans) < 20
+    assert cache._tracked_bytes == cache.size <= cache.max_bytes
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+from hsnf import smith_normal_form
+from hsnf.cli import main
+from hsnf.integer_system import solve_integer_linear_system
+
+
+def test_cli_smith_npy(tmp_path, capsys):
+    rng = np.random.default_rng(0)
+    X = rng.integers(-3, 4, size=(11, 3, 4))
+    np.save(tmp_path / "X.npy", X)
+
+    assert (
+        main(
+            [
+                "smith",
+                str(tmp_path / "X.npy"),
+                "-o",
+                str(tmp_path / "out.npz"),
+                "-j",
+                "2",
+                "--chunk-size",
+                "3",
+            ]
+        )
+        == 0
+    )
+    assert "matrices/s" in capsys.readouterr().err
+
+    with np.load(tmp_path / "out.npz") as out:
+        for i in range(len(X)):
+            D, L, R = smith_normal_form(X[i])
+            assert np.array_equal(out["D"][i], D)
+            assert np.array_equal(out["L"][i], L)
+            assert np.array_equal(out["R"][i], R)
+
+    main(["hnf-row", str(tmp_path / "X.npy"), "-o", str(tmp_path / "out.npy"), "-j", "1", "-q"])
+    H, L = np.load(tmp_path / "out_H.npy"), np.load(tmp_path / "out_L.npy")
+    assert np.array_equal(H, np.einsum("kij,kjl->kil", L, X))
+
+
+def test_cli_solve_jsonl(tmp_path):
+    problems = [
+        {"A": [[2, 0], [0, 3]], "b": [4, 6]},
+        {"A": [[2, 4]], "b": [1]},
+        {"A": [[1, 1]], "b": [3]},
+    ]
+    with open(tmp_path / "in.jsonl", "w") as f:
+        for problem in problems:
+            f.write(json.dumps(problem) + "\n")
+
+    main(["solve", str(tmp_path / "in.jsonl"), "-o", str(tmp_path / "out.jsonl"), "-j", "1", "-q"])
+    with open(tmp_path / "out.jsonl") as f:
+        outputs = [json.loads(line) for line in f]
+
+    assert len(outputs) == len(problems)
+    for problem, output in zip(problems, outputs):
+        expected = solve_integer_linear_system(np.array(problem["A"]), np.array(problem["b"]))
+        if expected is None:
+            assert output["x_special"] is None
+        else:
+            assert np.array_equal(output["x_special"], expected[1])
+            assert np.array_equal(np.array(output["basis"]).reshape(-1, 2), expected[0])
+
+
+def test_cli_ragged_jsonl(tmp_path):
+    matrices = [[[2, 4], [6, 8]], [[1, 2, 3]], [[0, 3], [5, 0], [1, 1]]]
+    with open(tmp_path / "in.jsonl", "w") as f:
+        for M in matrices:
+            f.write(json.dumps(M) + "\n")
+
+    main(["smith", str(tmp_path / "in.jsonl"), "-o", str(tmp_path / "out.npz"), "-j", "1", "-q"])
+    with np.load(tmp_path / "out.npz") as out:
+        for i, M in enumerate(matrices):
+            for name, expect in zip(["D", "L", "R"], smith_normal_form(np.array(M))):
+                assert np.array_equal(out[f"{name}_{i}"], expect)
+
+    with pytest.raises(ValueError):
+        main(["smith", str(tmp_path / "in.jsonl"), "-o", str(tmp_path / "out.npy"), "-j", "1"])
@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from hsnf.batch import batch_row_style_hermite_normal_form, batch_smith_normal_form
+from hsnf.executor import BATCH_FUNCTIONS, BatchingExecutor
+
+
+def test_batching_executor():
+    rng = np.random.default_rng(0)
+    X = rng.integers(-5, 6, size=(200, 3, 3))
+    D_expect, L_expect, R_expect = batch_smith_normal_form(X)
+
+    with BatchingExecutor(max_batch_size=64, max_latency=0.05) as executor:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = list(pool.map(executor.submit, X))
+        for i, future in enumerate(futures):
+            D, L, R = future.result()
+            assert np.array_equal(D, D_expect[i])
+            assert np.array_equal(L, L_expect[i])
+            assert np.array_equal(R, R_expect[i])
+
+        # Requests of different kinds and shapes are batched separately
+        H, L = executor.submit(X[0, :2], kind="hnf-row").result()
+        H_expect, L_expect = batch_row_style_hermite_normal_form(X[:1, :2])
+        assert np.array_equal(H, H_expect[0]) and np.array_equal(L, L_expect[0])
+
+        metrics = executor.metrics()
+        assert metrics["num_requests"] == 201
+        assert metrics["num_batches"] < metrics["num_requests"]
+        assert 1 < metrics["max_batch_size"] <= 64
+        assert metrics["queue_depth"] == 0
+        assert 0 < metrics["latency_mean"] <= metrics["latency_max"]
+
+    with pytest.raises(RuntimeError):
+        executor.submit(X[0])
+    with BatchingExecutor() as executor, pytest.raises(ValueError):
+        executor.submit(X[0], kind="unknown")
+
+
+def test_batching_executor_async():
+    X = np.random.default_rng(1).integers(-5, 6, size=(50, 2, 3))
+    H_expect, _ = batch_row_style_hermite_normal_form(X)
+
+    async def main(executor):
+        return await asyncio.gather(*[executor.submit_async(A, kind="hnf-row") for A in X])
+
+    with BatchingExecutor(max_latency=0.01) as executor:
+        results = asyncio.run(main(executor))
+    assert all(np.array_equal(H, H_expect[i]) for i, (H, _) in enumerate(results))
+
+
+class _Abort(Exception):
+    pass
+
+
+def test_batching_executor_failures(monkeypatch):
+    def abort(X):
+        raise _Abort()
+
+    def malformed(X):
+        return (np.zeros((0,)),)
+
+    with BatchingExecutor(max_latency=0.01) as executor:
+        # Every future is resolved even if batched calls or bookkeeping fail
+        monkeypatch.setitem(BATCH_FUNCTIONS, "smith", abort)
+        with pytest.raises(_Abort):
+            executor.submit(np.eye(2, dtype=int)).result(timeout=5)
+        monkeypatch.setitem(BATCH_FUNCTIONS, "smith", malformed)
+        with pytest.raises(IndexError):
+            executor.submit(np.eye(2, dtype=int)).result(timeout=5)
+
+        # The worker thread keeps running
+        monkeypatch.undo()
+        D, _, _ = executor.submit(np.eye(2, dtype=int)).result(timeout=5)
+        assert np.array_equal(D, np.eye(2))
+
+
+def test_batching_executor_isolates_groups(monkeypatch):
+    def malformed(X):
+        return (np.zeros((0,)),)
+
+    monkeypatch.setitem(BATCH_FUNCTIONS, "smith", malformed)
+    # Both requests are collected into one batch, and decomposed in separate groups
+    with BatchingExecutor(max_batch_size=2, max_latency=5) as executor:
+        failed = executor.submit(np.eye(2, dtype=int))
+        succeeded = executor.submit(np.eye(3, dtype=int), kind="hnf-row")
+        with pytest.raises(IndexError):
+            failed.result(timeout=5)
+        H, L = succeeded.result(timeout=5)
+        assert np.array_equal(H, np.eye(3))
+        assert np.array_equal(L, np.eye(3))
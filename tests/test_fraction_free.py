@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from hsnf import column_style_hermite_normal_form
+from hsnf.fraction_free import integer_determinant, integer_kernel, integer_rank
+from hsnf.lattice import Lattice
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+def test_rank_and_determinant(rng):
+    X = rng.integers(-3, 4, size=(200, 4, 4))
+    X[::3, 3] = X[::3, 0] - 2 * X[::3, 1]
+    assert np.array_equal(integer_rank(X), np.linalg.matrix_rank(X))
+    assert np.array_equal(integer_determinant(X), np.around(np.linalg.det(X)).astype(int))
+    assert integer_rank(X[1]) == np.linalg.matrix_rank(X[1])
+    assert integer_rank(np.zeros((2, 3), dtype=int)) == 0
+
+    # Entries too large for float
+    U = np.array([[1, 2, 0], [0, 1, 3], [0, 0, 1]])
+    diag = np.diag([10**10 + 1, 10**10 + 3, 7])
+    M = U @ diag @ U.T
+    assert integer_determinant(M) == (10**10 + 1) * (10**10 + 3) * 7
+
+    with pytest.raises(ValueError):
+        integer_determinant(np.zeros((2, 3), dtype=int))
+
+
+def test_kernel(rng):
+    X = rng.integers(-3, 4, size=(30, 3, 6))
+    X[::2, 2] = X[::2, 0] + X[::2, 1]
+    for M, basis in zip(X, integer_kernel(X)):
+        rank = np.linalg.matrix_rank(M)
+        assert basis.shape == (6 - rank, 6)
+        assert np.all(M @ basis.T == 0)
+
+        # Same lattice as kernel from Hermite normal form of the whole matrix
+        _, R = column_style_hermite_normal_form(M)
+        assert np.array_equal(Lattice(basis).hnf, Lattice(R[:, rank:].T).hnf)
@@ -0,0 +1,82 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from hsnf import smith_normal_form
+from hsnf.homology import integer_homology
+
+
+def simplicial_boundaries(facets):
+    """
+    Return boundary matrices of a simplicial complex generated by `facets`
+    """
+    dim = max(len(facet) for facet in facets) - 1
+    simplices = [set() for _ in range(dim + 1)]
+    for facet in facets:
+        for k in range(len(facet)):
+            simplices[k].update(combinations(sorted(facet), k + 1))
+    simplices = [sorted(s) for s in simplices]
+    index = [{s: i for i, s in enumerate(ss)} for ss in simplices]
+
+    boundaries = []
+    for k in range(1, dim + 1):
+        boundary = np.zeros((len(simplices[k - 1]), len(simplices[k])), dtype=int)
+        for j, simplex in enumerate(simplices[k]):
+            for i in range(k + 1):
+                face = simplex[:i] + simplex[i + 1 :]
+                boundary[index[k - 1][face], j] = (-1) ** i
+        boundaries.append(boundary)
+    return boundaries
+
+
+# fmt: off
+RP2 = [
+    (1, 2, 4), (1, 2, 6), (1, 3, 5), (1, 3, 6), (1, 4, 5),
+    (2, 3, 4), (2, 3, 5), (2, 5, 6), (3, 4, 6), (4, 5, 6),
+]
+TORUS = [
+    (1, 2, 4), (2, 4, 5), (2, 3, 5), (3, 5, 6), (1, 3, 6), (1, 4, 6),
+    (4, 5, 7), (5, 7, 8), (5, 6, 8), (6, 8, 9), (4, 6, 9), (4, 7, 9),
+    (1, 7, 8), (1, 2, 8), (2, 8, 9), (2, 3, 9), (3, 7, 9), (1, 3, 7),
+]
+# fmt: on
+
+
+@pytest.mark.parametrize(
+    "facets,betti_expect,torsion_expect",
+    [
+        (RP2, [1, 0, 0], [[], [2], []]),
+        (TORUS, [1, 2, 1], [[], [], []]),
+        ([(0, 1, 2, 3)], [1, 0, 0, 0], [[], [], [], []]),
+    ],
+)
+def test_integer_homology(facets, betti_expect, torsion_expect):
+    boundaries = simplicial_boundaries(facets)
+    for k in range(len(boundaries) - 1):
+        assert np.all(boundaries[k] @ boundaries[k + 1] == 0)
+
+    betti, torsion = integer_homology(boundaries)
+    assert betti == betti_expect
+    assert torsion == torsion_expect
+
+
+def test_integer_homology_matches_snf():
+    rng = np.random.default_rng(0)
+    facets = [tuple(rng.choice(12, size=3, replace=False)) for _ in range(25)]
+    boundaries = simplicial_boundaries(facets)
+    betti, torsion = integer_homology(boundaries)
+
+    ranks = [0]
+    torsion_expect = []
+    for boundary in boundaries:
+        D, _, _ = smith_normal_form(boundary)
+        diag = np.diagonal(D)
+        ranks.append(np.count_nonzero(diag))
+        torsion_expect.append([d for d in diag.tolist() if d > 1])
+    ranks.append(0)
+    torsion_expect.append([])
+
+    dims = [boundaries[0].shape[0]] + [b.shape[1] for b in boundaries]
+    assert betti == [dims[k] - ranks[k] - ranks[k + 1] for k in range(len(dims))]
+    assert torsion == torsion_expect
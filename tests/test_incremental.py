@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from hsnf import row_style_hermite_normal_form, smith_normal_form
+from hsnf.incremental import (
+    append_row_style_hermite_normal_form,
+    append_smith_normal_form,
+    warm_row_style_hermite_normal_form,
+    warm_smith_normal_form,
+)
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+def is_unimodular(T):
+    return abs(round(np.linalg.det(T))) == 1
+
+
+def test_warm_start(rng):
+    M = rng.integers(-5, 6, size=(5, 5))
+    D_prev, L_prev, R_prev = smith_normal_form(M)
+    H_prev, L_prev_hnf = row_style_hermite_normal_form(M)
+
+    # Slightly changed matrix
+    M2 = M.copy()
+    M2[0, 1] += 1
+
+    D, L, R, stats = warm_smith_normal_form(M2, L_prev, R_prev)
+    assert np.array_equal(L @ M2 @ R, D)
+    assert is_unimodular(L) and is_unimodular(R)
+    assert np.array_equal(D, smith_normal_form(M2)[0])
+    assert stats["rank"] == 5
+
+    H, L, stats = warm_row_style_hermite_normal_form(M2, L_prev_hnf)
+    assert np.array_equal(L @ M2, H)
+    assert np.array_equal(H, row_style_hermite_normal_form(M2)[0])
+    assert stats["reused_pivots"] >= 1
+
+    # Nothing changed: all pivots are reused
+    _, _, _, stats = warm_smith_normal_form(M, L_prev, R_prev)
+    assert stats["num_operations"] == 0
+    assert stats["reused_pivots"] == np.count_nonzero(np.diagonal(D_prev))
+    _, _, stats = warm_row_style_hermite_normal_form(M, L_prev_hnf)
+    assert stats["num_operations"] == 0
+
+
+def test_append(rng):
+    M = rng.integers(-5, 6, size=(4, 3))
+    columns = rng.integers(-5, 6, size=(4, 2))
+    rows = rng.integers(-5, 6, size=(2, 5))
+    M_new = np.concatenate([np.concatenate([M, columns], axis=1), rows], axis=0)
+
+    D, L, R = smith_normal_form(M)
+    D, L, R, stats = append_smith_normal_form(D, L, R, rows=rows, columns=columns)
+    assert np.array_equal(L @ M_new @ R, D)
+    assert is_unimodular(L) and is_unimodular(R)
+    assert np.array_equal(D, smith_normal_form(M_new)[0])
+
+    H, L = row_style_hermite_normal_form(M)
+    H, L, stats = append_row_style_hermite_normal_form(H, L, rows=rows, columns=columns)
+    assert np.array_equal(L @ M_new, H)
+    assert is_unimodular(L)
+    assert np.array_equal(H, row_style_hermite_normal_form(M_new)[0])
+
+    # Appending a row to full-column-rank HNF keeps its pivots
+    H, L = row_style_hermite_normal_form(M)
+    _, _, stats = append_row_style_hermite_normal_form(H, L, rows=rows[:, :3])
+    assert stats["reused_pivots"] > 0
@@ -2,6 +2,8 @@ import numpy as np
 import pytest
 
 from hsnf.integer_system import (
+    FrobeniusSolver,
+    enumerate_solutions_in_box,
     solve_frobenius_congruent,
     solve_integer_linear_system,
     solve_modular_integer_linear_system,
@@ -40,3 +42,96 @@ def test_modular_integer_linear_system():
     basis, x_special = solve_modular_integer_linear_system(A, b, q)
     assert np.allclose(x_special, np.array([7, 8]))
     assert np.allclose(basis, np.array([[0, 10]]))
+
+
+def test_frobenius_solver():
+    A = np.array([[6, 4, 10], [-1, 1, -5], [5, 5, 5]])
+    solver = FrobeniusSolver(A)
+
+    rng = np.random.default_rng(0)
+    denominator = 10**9 + 7
+    numerators = rng.integers(-(10**9), 10**9, size=(50, 3))
+    x_numerators, x_denominator, solvable = solver.solve(numerators, denominator)
+
+    # Check exactly: A x - b is integer, i.e. (A x_num * denominator - b_num * x_denominator) is divisible
+    lhs = (x_numerators[solvable] @ A.T).astype(object) * denominator
+    rhs = numerators[solvable].astype(object) * x_denominator
+    assert np.all((lhs - rhs) % (x_denominator * denominator) == 0)
+
+    # Offsets in the image of A are always solvable
+    x = rng.integers(-5, 6, size=(10, 3))
+    _, _, solvable = solver.solve(x @ A.T * 3 + 21 * rng.integers(-5, 6, size=(10, 3)), 21)
+    assert np.all(solvable)
+
+    x_single, _, solvable_single = solver.solve(numerators[0], denominator)
+    assert np.array_equal(x_single, x_numerators[0] if solvable_single else 0 * x_single)
+
+    # Entries beyond int64 are computed with Python integers
+    A = np.array([[10**6, 3], [0, 7]])
+    numerators = rng.integers(-(10**15), 10**15, size=(5, 2))
+    x_numerators, x_denominator, solvable = FrobeniusSolver(A).solve(numerators, 10**15 + 37)
+    assert x_numerators.dtype == object and np.all(solvable)
+    lhs = (x_numerators @ A.T.astype(object)) * (10**15 + 37)
+    rhs = numerators.astype(object) * x_denominator
+    assert np.all((lhs - rhs) % (x_denominator * (10**15 + 37)) == 0)
+
+
+def test_modular_integer_linear_system_howell():
+    A = np.array([[4, -10], [7, 2]])
+    b = np.array([8, 5])
+    basis, x_special = solve_modular_integer_linear_system(A, b, 20, algorithm="howell")
+    assert np.array_equal(np.mod(A @ x_special - b, 20), [0, 0])
+    assert np.array_equal(basis, [[0, 10]])
+    assert solve_modular_integer_linear_system(A, [1, 0], 20, algorithm="howell") is None
+
+
+@pytest.mark.parametrize("algorithm", ["smith", "howell"])
+def test_modular_integer_linear_system_kernel(algorithm):
+    # Compare kernels with brute force
+    rng = np.random.default_rng(0)
+    q = 12
+    xs = np.stack(np.meshgrid(*[np.arange(q)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+    for _ in range(10):
+        A = rng.integers(-20, 20, size=(2, 3))
+        basis, x_special = solve_modular_integer_linear_system(
+            A, np.zeros(2, dtype=int), q, algorithm
+        )
+        assert np.all((0 <= basis) & (basis < q))
+        expect = {tuple(x) for x in xs[np.all(np.mod(xs @ A.T, q) == 0, axis=1)]}
+        span = {(0, 0, 0)}
+        while True:
+            grown = span | {tuple(np.mod(np.add(x, g), q)) for x in span for g in basis}
+            if grown == span:
+                break
+            span = grown
+        assert span == expect
+
+        b = A @ rng.integers(0, q, size=3)
+        _, x_special = solve_modular_integer_linear_system(A, b, q, algorithm)
+        assert np.array_equal(np.mod(A @ x_special - b, q), [0, 0])
+
+
+def test_enumerate_solutions_in_box():
+    A = np.array([[1, 2, -1, 3], [2, 0, 1, 1]])
+    b = np.array([3, 4])
+    basis, x_special = solve_integer_linear_system(A, b)
+    lower, upper = np.array([-4, -3, -5, -2]), np.array([5, 4, 6, 3])
+
+    chunks = list(enumerate_solutions_in_box(basis, x_special, lower, upper, chunk_size=7))
+    assert all(1 <= len(chunk) <= 7 for chunk in chunks)
+    got = np.concatenate(chunks, axis=0)
+
+    grid = np.stack(
+        np.meshgrid(*[np.arange(lo, hi + 1) for lo, hi in zip(lower, upper)], indexing="ij"),
+        axis=-1,
+    ).reshape(-1, 4)
+    expect = grid[np.all(grid @ A.T == b, axis=1)]
+    assert len(got) == len(expect) > 0
+    assert {tuple(x) for x in got} == {tuple(x) for x in expect}
+
+    # Unique solution and empty box
+    basis, x_special = solve_integer_linear_system(np.eye(2, dtype=int), np.array([1, 2]))
+    assert np.array_equal(
+        np.concatenate(list(enumerate_solutions_in_box(basis, x_special, 0, 2))), [[1, 2]]
+    )
+    assert list(enumerate_solutions_in_box(basis, x_special, 3, 5)) == []
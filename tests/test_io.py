@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from hsnf import (
+    column_style_hermite_normal_form,
+    row_style_hermite_normal_form,
+    smith_normal_form,
+)
+from hsnf.batch import pack_diagonal, unpack_diagonal, unpack_triangle
+from hsnf.io import (
+    column_style_hermite_normal_form_npy,
+    row_style_hermite_normal_form_npy,
+    smith_normal_form_npy,
+)
+
+
+def test_npy_streaming(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.integers(-3, 4, size=(23, 3, 4))
+    np.save(tmp_path / "X.npy", X)
+
+    smith_normal_form_npy(
+        tmp_path / "X.npy",
+        tmp_path / "D.npy",
+        tmp_path / "L.npy",
+        tmp_path / "R.npy",
+        chunk_size=5,
+    )
+    row_style_hermite_normal_form_npy(
+        tmp_path / "X.npy", tmp_path / "H_row.npy", None, chunk_size=7
+    )
+    column_style_hermite_normal_form_npy(
+        tmp_path / "X.npy", tmp_path / "H_col.npy", tmp_path / "R_col.npy", chunk_size=100
+    )
+    assert not (tmp_path / "L_row.npy").exists()
+
+    D, L, R = (np.load(tmp_path / f"{name}.npy") for name in ["D", "L", "R"])
+    H_row = np.load(tmp_path / "H_row.npy")
+    H_col, R_col = np.load(tmp_path / "H_col.npy"), np.load(tmp_path / "R_col.npy")
+    assert D.shape == (23, 3, 4)
+    assert L.shape == (23, 3, 3)
+    assert R.shape == (23, 4, 4)
+    for i in range(len(X)):
+        for actual, expect in zip((D[i], L[i], R[i]), smith_normal_form(X[i])):
+            assert np.array_equal(actual, expect)
+        assert np.array_equal(H_row[i], row_style_hermite_normal_form(X[i])[0])
+        for actual, expect in zip((H_col[i], R_col[i]), column_style_hermite_normal_form(X[i])):
+            assert np.array_equal(actual, expect)
+
+
+def test_npy_compact_output(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.integers(-3, 4, size=(11, 3, 4))
+    np.save(tmp_path / "X.npy", X)
+
+    smith_normal_form_npy(
+        tmp_path / "X.npy", tmp_path / "D.npy", chunk_size=4, dtype=np.int16, packed=True
+    )
+    row_style_hermite_normal_form_npy(
+        tmp_path / "X.npy", tmp_path / "H_row.npy", chunk_size=4, dtype=np.int16, packed=True
+    )
+    column_style_hermite_normal_form_npy(
+        tmp_path / "X.npy", tmp_path / "H_col.npy", chunk_size=4, dtype=np.int16, packed=True
+    )
+    D, H_row, H_col = (np.load(tmp_path / f"{name}.npy") for name in ["D", "H_row", "H_col"])
+    assert D.dtype == np.int16 and D.shape == (11, 3)
+    D = unpack_diagonal(D, (3, 4))
+    H_row = unpack_triangle(H_row, (3, 4))
+    H_col = unpack_triangle(H_col, (3, 4), lower=True)
+    for i in range(len(X)):
+        assert np.array_equal(D[i], smith_normal_form(X[i])[0])
+        assert np.array_equal(H_row[i], row_style_hermite_normal_form(X[i])[0])
+        assert np.array_equal(H_col[i], column_style_hermite_normal_form(X[i])[0])
+
+    # Normal forms take the smallest dtype holding Hadamard's bound
+    smith_normal_form_npy(
+        tmp_path / "X.npy", tmp_path / "D.npy", tmp_path / "L.npy", dtype="auto", packed=True
+    )
+    D_auto, L_auto = np.load(tmp_path / "D.npy"), np.load(tmp_path / "L.npy")
+    assert D_auto.dtype == np.int8 and L_auto.dtype == np.int64
+    assert np.array_equal(D_auto, pack_diagonal(D))
+
+    # Entries of transformations do not fit in int8, and no output is left
+    X = np.array([[[1000, 999]]] * 3)
+    np.save(tmp_path / "X2.npy", X)
+    with pytest.raises(OverflowError):
+        smith_normal_form_npy(
+            tmp_path / "X2.npy",
+            tmp_path / "D2.npy",
+            R_path=tmp_path / "R2.npy",
+            chunk_size=1,
+            dtype=np.int8,
+        )
+    assert not (tmp_path / "D2.npy").exists() and not (tmp_path / "R2.npy").exists()
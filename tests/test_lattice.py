@@ -1,6 +1,17 @@
 import numpy as np
 
-from hsnf.lattice import compute_dual, compute_intersection, compute_union, equivalent
+from hsnf.integer_system import solve_integer_linear_system
+from hsnf.lattice import (
+    Lattice,
+    QuotientGroup,
+    compute_dual,
+    compute_intersection,
+    compute_intersection_all,
+    compute_union,
+    compute_union_all,
+    equivalent,
+    reduce_modulo_lattice,
+)
 
 
 def test_equivalence():
@@ -64,3 +75,158 @@ def test_intersection():
         ]
     )
     assert np.allclose(actual, expect)
+
+
+def test_k_way_union_and_intersection():
+    lattices = [
+        np.diag([2, 1, 1]),
+        np.diag([1, 3, 1]),
+        np.array([[-3, 4, 0], [-4, -3, 0], [0, 0, 5]]),
+        np.array([[1, 1, 0], [0, 2, 0], [0, 0, 1]]),
+        np.diag([1, 1, 7]),
+    ]
+
+    expect = lattices[0]
+    for lattice in lattices[1:]:
+        expect = compute_intersection(expect, lattice)
+    for max_workers in [1, 2]:
+        actual = compute_intersection_all(lattices, max_workers=max_workers)
+        assert equivalent(actual, expect)
+    actual = compute_intersection_all([lattice.T for lattice in lattices], row_wise=False)
+    assert equivalent(actual.T, expect)
+
+    expect = lattices[0]
+    for lattice in lattices[1:]:
+        expect = compute_union(expect, lattice)
+    assert equivalent(compute_union_all(lattices, max_workers=2), expect)
+
+    # Lattices need not be full rank
+    actual = compute_intersection_all([np.array([[2, 2, 0]]), np.array([[3, 3, 0], [0, 0, 1]])])
+    assert np.array_equal(actual, [[6, 6, 0]])
+    assert compute_intersection_all([np.array([[1, 0]]), np.array([[0, 1]])]).shape == (0, 2)
+
+
+def test_reduced_basis():
+    lattice1 = np.array([[1, 0, 0], [1, 1, 0], [0, 0, 1]])
+    lattice2 = np.array([[1, 0, 2], [1, 2, 1], [0, 3, 4]])
+    for func in [compute_union, compute_intersection]:
+        # Change of basis maps back to the Hermite normal form
+        basis = Lattice(func(lattice1, lattice2)).hnf
+        reduced, gram, V = func(lattice1, lattice2, reduced=True)
+        assert np.array_equal(V @ reduced, basis)
+        assert np.array_equal(gram, reduced @ reduced.T)
+        assert abs(round(np.linalg.det(V))) == 1
+        assert np.max(np.abs(reduced)) <= np.max(np.abs(basis))
+
+        reduced_col, gram_col, V_col = func(lattice1.T, lattice2.T, row_wise=False, reduced=True)
+        assert np.array_equal(reduced_col, reduced.T)
+        assert np.array_equal(reduced_col @ V_col, basis.T)
+
+    A = np.array([[6, 4, 10], [-1, 1, -5]])
+    reduced, gram, V = compute_dual(A, reduced=True)
+    assert np.allclose(V @ reduced, compute_dual(A))
+    assert np.allclose(V @ reduced @ A.T, np.eye(2))
+    assert np.allclose(gram, reduced @ reduced.T)
+
+    # Exact for ill-conditioned Gram matrices, whose floating-point inverse is inaccurate
+    A = np.array([[10**8, 10**8 + 1, 0], [10**8 + 1, 10**8 + 2, 1]])
+    reduced, _, V = compute_dual(A, reduced=True)
+    assert np.allclose(V @ reduced @ A.T, np.eye(2), atol=1e-6)
+
+
+def test_lattice_contains():
+    generators = np.array(
+        [
+            [2, 1, 0, 4],
+            [0, 3, 3, 0],
+            [2, 4, 3, 4],
+        ]
+    )
+    lattice = Lattice(generators)
+    assert lattice.rank == 2
+    assert lattice.dim == 4
+
+    rng = np.random.default_rng(0)
+    members = rng.integers(-5, 6, size=(100, 2)) @ lattice.hnf
+    assert np.all(lattice.contains(members))
+    assert members[0] in lattice
+
+    points = rng.integers(-5, 6, size=(1000, 4))
+    expect = []
+    for p in points:
+        res = solve_integer_linear_system(generators.T, p)
+        expect.append(res is not None and np.allclose(generators.T @ res[1], p))
+    assert np.array_equal(lattice.contains(points), expect)
+
+    lattice_col = Lattice(generators.T, row_wise=False)
+    assert np.array_equal(lattice_col.hnf, lattice.hnf)
+
+
+def test_reduce_modulo_lattice(tmp_path):
+    basis = np.array(
+        [
+            [2, 1, 0],
+            [-1, 3, 1],
+            [0, 1, 4],
+        ]
+    )
+    lattice = Lattice(basis)
+    diagonal = np.diagonal(lattice.hnf)
+    det = int(np.prod(diagonal))
+
+    rng = np.random.default_rng(0)
+    points = rng.integers(-20, 21, size=(1000, 3))
+    reps, index = reduce_modulo_lattice(basis, points, return_index=True)
+    assert np.all((reps >= 0) & (reps < diagonal))
+    assert np.all(lattice.contains(points - reps))
+    assert np.all((index >= 0) & (index < det))
+
+    # Translation by lattice vectors keeps representatives
+    shifted = points + rng.integers(-3, 4, size=(1000, 3)) @ basis
+    assert np.array_equal(lattice.reduce(shifted), reps)
+
+    # Same index if and only if same coset
+    diff = (points[:100, None] - points[None, :100]).reshape(-1, 3)
+    assert np.array_equal(
+        (index[:100, None] == index[None, :100]).reshape(-1), lattice.contains(diff)
+    )
+
+    # Chunked and memory-mapped arrays
+    np.save(tmp_path / "points.npy", points)
+    points_mmap = np.load(tmp_path / "points.npy", mmap_mode="r")
+    out = np.empty_like(reps)
+    index_out = np.empty_like(index)
+    lattice.reduce(points_mmap, return_index=True, chunk_size=7, out=out, index_out=index_out)
+    assert np.array_equal(out, reps)
+    assert np.array_equal(index_out, index)
+
+
+def test_quotient_group():
+    basis = np.array(
+        [
+            [2, 1, 0],
+            [-1, 3, 1],
+            [0, 2, 4],
+        ]
+    )
+    group = QuotientGroup(basis)
+    order = abs(round(np.linalg.det(basis)))
+    assert group.order == order
+    assert len(group) == order
+    assert np.prod(group.invariant_factors) == order
+
+    reps = group.representatives()
+    assert reps.shape == (order, 3)
+    assert np.array_equal(group.index_of(reps), np.arange(order))
+    # Representatives are in distinct cosets
+    assert len(np.unique(reduce_modulo_lattice(basis, reps), axis=0)) == order
+
+    rng = np.random.default_rng(0)
+    points = rng.integers(-20, 21, size=(500, 3))
+    indices = group.index_of(points)
+    assert np.all(Lattice(basis).contains(points - group.point_of(indices)))
+
+    # Trivial group
+    trivial = QuotientGroup(np.array([[1, 2], [0, 1]]), row_wise=False)
+    assert trivial.order == 1
+    assert np.array_equal(trivial.representatives(), np.zeros((1, 2)))
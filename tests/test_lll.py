@@ -0,0 +1,61 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from hsnf.lll import lll_reduction, size_reduction
+
+
+def gram_schmidt(basis):
+    basis = [[Fraction(int(v)) for v in row] for row in basis]
+    ortho = []
+    mu = [[Fraction(0)] * len(basis) for _ in basis]
+    for i, b in enumerate(basis):
+        v = list(b)
+        for j, o in enumerate(ortho):
+            mu[i][j] = sum(x * y for x, y in zip(b, o)) / sum(y * y for y in o)
+            v = [x - mu[i][j] * y for x, y in zip(v, o)]
+        ortho.append(v)
+    norms = [sum(x * x for x in o) for o in ortho]
+    return mu, norms
+
+
+def test_lll_reduction():
+    # Example from Cohen, A Course in Computational Algebraic Number Theory
+    basis = np.array([[1, 0, 0, 31], [0, 1, 0, 59], [0, 0, 1, 26]])
+    reduced, U = lll_reduction(basis)
+    assert np.array_equal(U @ basis, reduced)
+    assert np.isclose(abs(np.linalg.det(U)), 1)
+    assert np.max(np.abs(reduced)) < np.max(np.abs(basis))
+
+
+@pytest.mark.parametrize("size", [(3, 3), (4, 6), (6, 8)])
+def test_lll_reduction_random(size):
+    rng = np.random.default_rng(0)
+    basis = rng.integers(-100, 101, size=size)
+    reduced, U = lll_reduction(basis)
+    assert np.array_equal(U @ basis, reduced)
+    assert np.isclose(abs(np.linalg.det(U)), 1)
+
+    mu, norms = gram_schmidt(reduced)
+    for i in range(len(reduced)):
+        for j in range(i):
+            assert abs(mu[i][j]) <= Fraction(1, 2)
+    for k in range(1, len(reduced)):
+        assert norms[k] >= (Fraction(3, 4) - mu[k][k - 1] ** 2) * norms[k - 1]
+
+
+def test_lll_reduction_dependent():
+    with pytest.raises(ValueError):
+        lll_reduction(np.array([[1, 2], [2, 4]]))
+
+
+def test_size_reduction():
+    basis = np.array([[1, 1, 0], [0, 1, 1]])
+    vectors = np.array([[100, 203, 97], [5, 4, 3]])
+    reduced, C = size_reduction(vectors, basis)
+    assert np.array_equal(vectors - C @ basis, reduced)
+    mu, _ = gram_schmidt(np.concatenate([basis, reduced]))
+    for i in range(len(basis), len(basis) + len(reduced)):
+        for j in range(len(basis)):
+            assert abs(mu[i][j]) <= Fraction(1, 2)
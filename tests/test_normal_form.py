@@ -5,6 +5,7 @@ import pytest
 
 from hsnf import (
     column_style_hermite_normal_form,
+    invariant_factors,
     row_style_hermite_normal_form,
     smith_normal_form,
 )
@@ -157,3 +158,121 @@ def test_hnf_uniqueness():
     H3_row_exp = np.array([[1, 0, 50, -11], [0, 3, 28, -2], [0, 0, 61, -13]])
     H3_row_act, _ = row_style_hermite_normal_form(A3)
     assert np.allclose(H3_row_act, H3_row_exp)
+
+
+@pytest.mark.parametrize("pivot_strategy", ["min_abs", "min_count", "min_norm"])
+def test_pivot_strategy(rng, pivot_strategy):
+    for size in [(30, 4, 6), (30, 6, 4), (30, 5, 5)]:
+        X = rng.integers(-2, 3, size=size)
+        for i in range(size[0]):
+            D, L, R = smith_normal_form(X[i], pivot_strategy=pivot_strategy)
+            verify_snf(X[i], D, L, R)
+
+            H, L = row_style_hermite_normal_form(X[i], pivot_strategy=pivot_strategy)
+            verify_row_style_hnf(X[i], H, L)
+
+            H, R = column_style_hermite_normal_form(X[i], pivot_strategy=pivot_strategy)
+            verify_column_style_hnf(X[i], H, R)
+
+
+def test_unknown_pivot_strategy():
+    with pytest.raises(ValueError):
+        smith_normal_form(np.eye(2, dtype=int), pivot_strategy="unknown")
+
+
+def test_reduce_transforms(rng):
+    X = rng.integers(-5, 6, size=(20, 7, 5))
+    for M in X:
+        D, L, R = smith_normal_form(M)
+        D2, L2, R2 = smith_normal_form(M, reduce_transforms=True)
+        assert np.array_equal(D, D2)
+        assert np.array_equal(L2 @ M @ R2, D2)
+        assert np.isclose(abs(np.linalg.det(L2)), 1)
+        assert np.isclose(abs(np.linalg.det(R2)), 1)
+
+        H, _ = row_style_hermite_normal_form(M)
+        H2, L2 = row_style_hermite_normal_form(M, reduce_transforms=True)
+        assert np.array_equal(H, H2)
+        assert np.array_equal(L2 @ M, H2)
+
+        H, R = column_style_hermite_normal_form(M.T, reduce_transforms=True)
+        verify_column_style_hnf(M.T, H, R)
+
+    # Rank-deficient inputs have large kernel rows, which the reduction has to shorten
+    shortened = False
+    for _ in range(20):
+        M = rng.integers(-3, 4, size=(7, 2)) @ rng.integers(-3, 4, size=(2, 5))
+        _, L, R = smith_normal_form(M)
+        _, L2, R2 = smith_normal_form(M, reduce_transforms=True)
+        _, L_row = row_style_hermite_normal_form(M)
+        _, L_row2 = row_style_hermite_normal_form(M, reduce_transforms=True)
+        _, R_col = column_style_hermite_normal_form(M.T)
+        _, R_col2 = column_style_hermite_normal_form(M.T, reduce_transforms=True)
+        for T, T2 in [(L, L2), (R, R2), (L_row, L_row2), (R_col, R_col2)]:
+            assert np.max(np.abs(T2)) <= np.max(np.abs(T))
+            shortened |= np.max(np.abs(T2)) < np.max(np.abs(T))
+    assert shortened
+
+
+def test_overwrite_and_out(rng):
+    M = rng.integers(-5, 6, size=(4, 6))
+    D_expect, L_expect, R_expect = smith_normal_form(M)
+
+    A = M.copy()
+    D, L, R = smith_normal_form(A, overwrite_a=True)
+    assert np.shares_memory(D, A)
+    assert np.array_equal(D, D_expect)
+    assert np.array_equal(L, L_expect)
+    assert np.array_equal(R, R_expect)
+
+    out = (np.empty((4, 6), dtype=int), np.empty((4, 4), dtype=int), np.empty((6, 6), dtype=int))
+    D, L, R = smith_normal_form(M, out=out)
+    assert all(res is buf for res, buf in zip((D, L, R), out))
+    assert np.array_equal(D, D_expect)
+    assert np.array_equal(R, R_expect)
+
+    H_expect, L_expect = row_style_hermite_normal_form(M)
+    out = (np.empty((4, 6), dtype=int), np.empty((4, 4), dtype=int))
+    H, L = row_style_hermite_normal_form(M, out=out)
+    assert H is out[0] and L is out[1]
+    assert np.array_equal(H, H_expect)
+    assert np.array_equal(L, L_expect)
+
+    H_expect, R_expect = column_style_hermite_normal_form(M)
+    A = M.copy()
+    out = (np.empty((4, 6), dtype=int), np.empty((6, 6), dtype=int))
+    H, R = column_style_hermite_normal_form(A, overwrite_a=True, out=(None, out[1]))
+    assert np.shares_memory(H, A)
+    assert np.shares_memory(R, out[1])
+    assert np.array_equal(H, H_expect)
+    assert np.array_equal(R, R_expect)
+
+    # Inputs are kept without overwrite_a
+    A = M.copy()
+    smith_normal_form(A)
+    assert np.array_equal(A, M)
+
+    with pytest.raises(ValueError):
+        smith_normal_form(M, out=(np.empty((3, 6), dtype=int), None, None))
+
+
+@pytest.mark.parametrize("algorithm", ["elimination", "multimodular"])
+def test_invariant_factors(rng, algorithm):
+    for _ in range(50):
+        m, n = rng.integers(1, 7, size=2)
+        M = rng.integers(-4, 5, size=(m, n))
+        M[-1] = 2 * M[0]
+        D, _, _ = smith_normal_form(M)
+        expect = [d for d in np.diagonal(D) if d != 0]
+        assert invariant_factors(M, algorithm=algorithm) == expect
+
+    with pytest.raises(ValueError):
+        invariant_factors(M, algorithm="unknown")
+
+
+def test_multimodular_invariant_factors(rng):
+    # Product of invariant factors exceeds int64
+    diag = [1, 1, 2, 2, 6, 30, 30 * 10**8, 210 * 10**8]
+    U = np.triu(rng.integers(-2, 3, size=(8, 8)), k=1) + np.eye(8, dtype=int)
+    M = U @ np.diag(diag) @ U.T
+    assert invariant_factors(M, algorithm="multimodular", max_workers=2) == diag
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+import scipy.sparse
+
+from hsnf import smith_normal_form
+from hsnf.sparse import sparse_smith_normal_form
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+def test_sparse_snf_random(rng):
+    for size in [(7, 11), (12, 5), (10, 10)]:
+        for _ in range(20):
+            M = scipy.sparse.random(
+                *size,
+                density=0.3,
+                format="csr",
+                random_state=rng,
+                data_rvs=lambda k: rng.integers(-3, 4, size=k),
+            ).astype(int)
+            D, L, R = smith_normal_form(M)
+            assert scipy.sparse.issparse(D)
+
+            M_dense = M.toarray()
+            D_dense, L_dense, R_dense = D.toarray(), L.toarray(), R.toarray()
+            assert np.array_equal(L_dense @ M_dense @ R_dense, D_dense)
+            assert np.isclose(abs(np.linalg.det(L_dense)), 1)
+            assert np.isclose(abs(np.linalg.det(R_dense)), 1)
+
+            D_expect, _, _ = smith_normal_form(M_dense)
+            assert np.array_equal(D_dense, D_expect)
+
+
+def test_sparse_snf_without_transforms():
+    M = scipy.sparse.csr_matrix(np.array([[2, 4, 4], [-6, 6, 12], [10, 4, 16]]))
+    D, L, R = sparse_smith_normal_form(M, transforms=False)
+    assert L is None
+    assert R is None
+    assert np.array_equal(D.toarray(), np.diag([2, 2, 156]))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"pivot_strategy": "bogus"},
+        {"pivot_strategy": "min_count"},
+        {"reduce_transforms": True},
+        {"overwrite_a": True},
+        {"out": (np.zeros((3, 3), dtype=int),) * 3},
+        {"block_decomposition": True},
+        {"max_workers": 2},
+        {"lazy_transforms": True},
+    ],
+)
+def test_sparse_snf_unsupported_options(kwargs):
+    M = scipy.sparse.csr_matrix(np.array([[2, 4, 4], [-6, 6, 12], [10, 4, 16]]))
+    with pytest.raises(ValueError):
+        smith_normal_form(M, **kwargs)
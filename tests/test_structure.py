@@ -0,0 +1,70 @@
+import logging
+
+import numpy as np
+import pytest
+
+from hsnf import (
+    column_style_hermite_normal_form,
+    row_style_hermite_normal_form,
+    smith_normal_form,
+)
+from hsnf.structure import detect_structure
+from hsnf.Z_module import ZmoduleHomomorphism
+
+
+@pytest.mark.parametrize(
+    "M,expect",
+    [
+        (np.zeros((2, 3), dtype=int), "zero"),
+        (np.diag([6, -4, 0]), "diagonal"),
+        (np.array([[0, -1, 0], [0, 0, 3], [2, 0, 0]]), "monomial"),
+        (np.array([[2, 1, 5], [0, 3, 4], [0, 0, 0]]), "hnf"),
+        (np.array([[-2, 7, 5], [0, 3, -4], [0, 0, 9]]), "upper_triangular"),
+        (np.array([[1, 2], [3, 4]]), "general"),
+    ],
+)
+def test_detect_structure(M, expect):
+    assert detect_structure(M) == expect
+
+
+@pytest.mark.parametrize(
+    "M",
+    [
+        np.zeros((2, 3), dtype=int),
+        np.diag([6, -4, 10, 0]),
+        np.array([[0, -1, 0, 0], [0, 0, 0, 12], [-8, 0, 0, 0]]),
+        np.array([[0, 0, 9], [0, 0, 0], [-6, 0, 0], [0, 4, 0]]),
+    ],
+)
+def test_smith_normal_form_fast_path(M, caplog):
+    with caplog.at_level(logging.DEBUG, logger="hsnf.structure"):
+        D, L, R = smith_normal_form(M)
+    assert "fast path" in caplog.text
+
+    assert np.array_equal(L @ M @ R, D)
+    assert abs(round(np.linalg.det(L))) == 1
+    assert abs(round(np.linalg.det(R))) == 1
+    # Same normal form as elimination
+    D_expect, _, _ = ZmoduleHomomorphism.with_standard_basis(M).smith_normal_form()
+    assert np.array_equal(D, D_expect)
+
+
+@pytest.mark.parametrize(
+    "M",
+    [
+        np.array([[2, 1, 5], [0, 3, 4], [0, 0, 0]]),
+        np.array([[-2, 7, 5, 1], [0, 3, -4, 2], [0, 0, 9, -7]]),
+        np.array([[-2, 7], [0, 3], [0, 0]]),
+    ],
+)
+def test_hermite_normal_form_fast_path(M, caplog):
+    with caplog.at_level(logging.DEBUG, logger="hsnf.structure"):
+        H, L = row_style_hermite_normal_form(M)
+        H_col, R = column_style_hermite_normal_form(M.T)
+    assert "fast path" in caplog.text
+
+    assert np.array_equal(L @ M, H)
+    assert np.array_equal(M.T @ R, H_col)
+    assert np.array_equal(H_col, H.T)
+    H_expect, _ = ZmoduleHomomorphism.with_standard_basis(M).hermite_normal_form()
+    assert np.array_equal(H, H_expect)
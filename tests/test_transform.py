@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from hsnf import (
+    column_style_hermite_normal_form,
+    row_style_hermite_normal_form,
+    smith_normal_form,
+)
+from hsnf.transform import UnimodularTransform
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+def test_unimodular_transform(rng):
+    T = UnimodularTransform(4)
+    for _ in range(50):
+        i, j = rng.choice(4, size=2, replace=False)
+        kind = rng.integers(3)
+        if kind == 0:
+            T.swap(i, j)
+        elif kind == 1:
+            T.negate(i)
+        else:
+            T.add(i, j, int(rng.integers(-3, 4)))
+    assert len(T) == 50
+
+    dense = T.to_dense()
+    assert abs(round(np.linalg.det(dense))) == 1
+    assert np.array_equal(T.inverse_to_dense() @ dense, np.eye(4, dtype=int))
+    assert np.array_equal(T.T.to_dense(), dense.T)
+    assert np.array_equal(T.T.inverse_to_dense(), T.inverse_to_dense().T)
+
+    X = rng.integers(-5, 6, size=(4, 3))
+    assert np.array_equal(T.apply(X), dense @ X)
+    assert np.array_equal(T.apply_inverse(dense @ X), X)
+    assert np.array_equal(T @ X[:, 0], dense @ X[:, 0])
+    assert np.array_equal(X.T @ T, X.T @ dense)
+
+
+def test_lazy_transforms(rng):
+    for _ in range(10):
+        M = rng.integers(-4, 5, size=(4, 6))
+        D, L, R = smith_normal_form(M, lazy_transforms=True)
+        assert isinstance(L, UnimodularTransform) and isinstance(R, UnimodularTransform)
+        assert np.array_equal(L @ M @ R, D)
+        D_dense, L_dense, R_dense = smith_normal_form(M)
+        assert np.array_equal(D, D_dense)
+        assert np.array_equal(L.to_dense(), L_dense)
+        assert np.array_equal(R.to_dense(), R_dense)
+        # M = L^-1 @ D @ R^-1
+        assert np.array_equal(L.apply_inverse(R.T.apply_inverse(D.T).T), M)
+
+        H, L = row_style_hermite_normal_form(M, lazy_transforms=True)
+        assert np.array_equal(L @ M, H)
+        assert np.array_equal(L.apply_inverse(H), M)
+
+        H, R = column_style_hermite_normal_form(M, lazy_transforms=True)
+        assert np.array_equal(M @ R, H)
+        assert np.array_equal(R.T.apply_inverse(H.T).T, M)
+
+    with pytest.raises(ValueError):
+        smith_normal_form(M, lazy_transforms=True, reduce_transforms=True)
+    with pytest.raises(ValueError):
+        row_style_hermite_normal_form(M, lazy_transforms=True, block_decomposition=True)